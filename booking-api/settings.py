@@ -1,6 +1,7 @@
 import datetime
 import os
 import re
+import tempfile
 
 import environ
 
@@ -48,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "booking.metrics.MetricsMiddleware",
+    "booking.shedding.LoadSheddingMiddleware",
+    "booking.profiling.ProfilingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -77,33 +81,110 @@ TEMPLATES = [
 
 ROOT_URLCONF = "booking-api.urls"
 WSGI_APPLICATION = "booking-api.wsgi.application"
+ASGI_APPLICATION = "booking-api.asgi.application"
+
+# serve the event listing and booking by async views, only pays off with ASGI
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
 
 
 # Database
-# https://docs.djangoproject.com/en/1.11/ref/settings/#databases
+# https://docs.djangoproject.com/en/4.1/ref/settings/#databases
+
+DATABASE_ENGINE = env.str("DATABASE_ENGINE", default="django.db.backends.sqlite3")
+SQLITE = DATABASE_ENGINE == "django.db.backends.sqlite3"
 
 DATABASES = {
-    # we are usegin sqlite just for test
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    "default": {
+        "ENGINE": DATABASE_ENGINE,
+        "NAME": env.str(
+            "DATABASE_NAME",
+            default=os.path.join(BASE_DIR, "db.sqlite3") if SQLITE else "booking-api",
+        ),
+        "USER": env.str("DATABASE_USER", default="booking-api"),
+        "PASSWORD": env.str(
+            "DATABASE_PASSWORD",
+            default=default("booking-api", "" if SQLITE else env.NOTSET),
+        ),
+        "HOST": env.str("DATABASE_HOST", default="localhost"),
+        "PORT": env.str("DATABASE_PORT", default=""),
+        "OPTIONS": env.dict("DATABASE_OPTIONS", default={}),
+        # every uwsgi process keeps one connection open between requests
+        "CONN_MAX_AGE": env.int("DATABASE_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("DATABASE_CONN_HEALTH_CHECKS", default=True),
+        # required behind pgbouncer in transaction mode
+        "DISABLE_SERVER_SIDE_CURSORS": env.bool(
+            "DATABASE_DISABLE_SERVER_SIDE_CURSORS", default=False
+        ),
+        # a file, so concurrent tests share the SQLite database and wait on
+        # its locks like the api does, an in-memory one is per connection
+        "TEST": {
+            "NAME": env.str(
+                "DATABASE_TEST_NAME",
+                default=os.path.join(tempfile.gettempdir(), "booking-api-test.sqlite3")
+                if SQLITE
+                else None,
+            )
+        },
     }
-    # TODO: in future we can use postgres database engine 
-    # "default": {
-    #     "ENGINE": env.str(
-    #         "DATABASE_ENGINE", default="django.db.backends.postgresql_psycopg2"
-    #     ),
-    #     "NAME": env.str("DATABASE_NAME", default="booking-api"),
-    #     "USER": env.str("DATABASE_USER", default="booking-api"),
-    #     "PASSWORD": env.str(
-    #         "DATABASE_PASSWORD", default=default("booking-api")
-    #     ),
-    #     "HOST": env.str("DATABASE_HOST", default="localhost"),
-    #     "PORT": env.str("DATABASE_PORT", default=""),
-    #     "OPTIONS": env.dict("DATABASE_OPTIONS", default={}),
-    # }
 }
 
+# applied on every new SQLite connection, see `booking.signals`
+# WAL lets readers proceed while a writer holds the lock
+SQLITE_PRAGMAS = env.dict(
+    "SQLITE_PRAGMAS",
+    default={
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": "5000",
+        "mmap_size": str(256 * 1024 * 1024),
+    },
+)
+
+# worker processes serving the api, each has its own `locmemcache://`
+try:
+    import uwsgi
+except ImportError:
+    uwsgi = None
+WORKER_PROCESSES = env.int(
+    "WORKER_PROCESSES", default=uwsgi.numproc if uwsgi is not None else 1
+)
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# e.g. CACHE_URL=filecache:///var/tmp/booking-api to share across uwsgi workers
+
+CACHE_URL = env.str("CACHE_URL", default="locmemcache://")
+CACHES = {
+    "default": env.cache_url_config(CACHE_URL),
+    # token buckets of booking.throttling, has to be shared by all workers
+    "throttle": env.cache(
+        "THROTTLE_CACHE_URL",
+        default=f"filecache://{tempfile.gettempdir()}/booking-api-throttle",
+    ),
+}
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", default=300)
+
+# rows fetched and sent at once by the exports
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2000)
+
+# tables with more rows are counted from the planner statistics by the admin
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "ADMIN_ESTIMATED_COUNT_THRESHOLD", default=100000
+)
+
+# processes hashing passwords of provisioned users, 0 uses all cores
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=0)
+# users created by one request, the import command has no limit
+PROVISION_MAX_USERS = env.int("PROVISION_MAX_USERS", default=100)
+
+# seconds a seat is held before it is given back, see booking.models.HoldManager
+HOLD_TTL = env.int("HOLD_TTL", default=600)
+# unexpired holds of one customer per event
+HOLD_MAX_SEATS = env.int("HOLD_MAX_SEATS", default=10)
+# shards of the seats held per event and seats they take at once, 0 disables
+HOLD_SHARDS = env.int("HOLD_SHARDS", default=0)
+HOLD_SHARD_SEATS = env.int("HOLD_SHARD_SEATS", default=10)
+
 # Password validation
 # https://docs.djangoproject.com/en/1.11/ref/settings/#auth-password-validators
 
@@ -130,7 +211,7 @@ AUTH_USER_MODEL = "booking.User"
 
 REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "rest_framework_json_api.exceptions.exception_handler",
-    "DEFAULT_PAGINATION_CLASS": "rest_framework_json_api.pagination.JsonApiPageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "booking.pagination.JsonApiCursorPagination",
     "DEFAULT_PARSER_CLASSES": (
         "rest_framework_json_api.parsers.JSONParser",
         "rest_framework.parsers.JSONParser",
@@ -138,12 +219,12 @@ REST_FRAMEWORK = {
         "rest_framework.parsers.MultiPartParser",
     ),
     "DEFAULT_RENDERER_CLASSES": (
-        "rest_framework_json_api.renderers.JSONRenderer",
+        "booking.renderers.JSONRenderer",
         "rest_framework.renderers.JSONRenderer",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "booking.authentication.JWTClaimsAuthentication",
     ),
     "DEFAULT_METADATA_CLASS": "rest_framework_json_api.metadata.JSONAPIMetadata",
     "DEFAULT_FILTER_BACKENDS": (
@@ -152,6 +233,13 @@ REST_FRAMEWORK = {
         "rest_framework_json_api.django_filters.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
     ),
+    # token buckets per scope, see booking/throttling.py
+    "DEFAULT_THROTTLE_RATES": env.dict(
+        "THROTTLE_RATES",
+        default={"book": "30/min", "login": "10/min", "register": "5/min"},
+    ),
+    # trusted proxies setting X-Forwarded-For, 0 uses the address of the peer
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
     "ORDERING_PARAM": "sort",
     "TEST_REQUEST_RENDERER_CLASSES": (
         "rest_framework_json_api.renderers.JSONRenderer",
@@ -163,15 +251,32 @@ REST_FRAMEWORK = {
 JSON_API_FORMAT_FIELD_NAMES = "dasherize"
 JSON_API_FORMAT_TYPES = "dasherize"
 JSON_API_PLURALIZE_TYPES = True
+# serve the event, room and book listings from rows, see booking/renderers.py
+JSON_API_FAST_PATH = env.bool("JSON_API_FAST_PATH", default=True)
 
 
-SIMPLE_AUTH = {
+SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": datetime.timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": datetime.timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True
 }
 
+# requests rejected with 503 under overload, see booking/shedding.py
+SHED_MAX_QUEUE_TIME = env.int("SHED_MAX_QUEUE_TIME", default=2000)
+SHED_MAX_IN_FLIGHT = env.int("SHED_MAX_IN_FLIGHT", default=0)
+SHED_RETRY_AFTER = env.int("SHED_RETRY_AFTER", default=1)
+SHED_EXEMPT_PATHS = env.list("SHED_EXEMPT_PATHS", default=["/metrics"])
+
+# Bloom filter of blacklisted refresh tokens per worker, see booking/blacklist.py
+TOKEN_BLACKLIST_CAPACITY = env.int("TOKEN_BLACKLIST_CAPACITY", default=100000)
+TOKEN_BLACKLIST_ERROR_RATE = env.float("TOKEN_BLACKLIST_ERROR_RATE", default=0.001)
+TOKEN_BLACKLIST_SYNC_INTERVAL = env.int("TOKEN_BLACKLIST_SYNC_INTERVAL", default=5)
+
+# users are built from the token claims unless the user cache is enabled
+JWT_USER_CACHE_SIZE = env.int("JWT_USER_CACHE_SIZE", default=0)
+JWT_USER_CACHE_TTL = env.int("JWT_USER_CACHE_TTL", default=60)
+
 SWAGGER_SETTINGS = {
     'USE_SESSION_AUTH': False,
     'SECURITY_DEFINITIONS': {
@@ -205,4 +310,30 @@ def parse_admins(admins):
 
 ADMINS = parse_admins(env.list("ADMINS", default=[]))
 
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "booking": {
+            "handlers": ["console"],
+            "level": env.str("LOG_LEVEL", default="INFO"),
+        },
+    },
+}
+
+# requests slower than this many milliseconds are logged with their
+# slowest queries, see `booking.metrics`
+SLOW_REQUEST_THRESHOLD = env.int("SLOW_REQUEST_THRESHOLD", default=500)
+SLOW_REQUEST_QUERIES = env.int("SLOW_REQUEST_QUERIES", default=5)
+
+# profile a share of the requests or those of staff users sending
+# `X-Profile: 1`, see `booking.profiling`
+PROFILE_SAMPLE_RATE = env.float("PROFILE_SAMPLE_RATE", default=0.0)
+PROFILE_HEADER = env.bool("PROFILE_HEADER", default=False)
+PROFILE_DIR = env.str(
+    "PROFILE_DIR", default=os.path.join(tempfile.gettempdir(), "booking-api-profiles")
+)
+PROFILE_KEEP = env.int("PROFILE_KEEP", default=100)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
@@ -6,7 +6,11 @@ from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 from rest_framework_simplejwt.views import (TokenObtainPairView,
                                             TokenRefreshView)
-# from .api_booking.views import LogoutView, RegisterView
+
+from booking.metrics import metrics_view
+from booking.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from booking.throttling import LoginThrottle
+from booking.views import LogoutView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -20,9 +24,24 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("login/", TokenObtainPairView.as_view(), name="login"),
-    path("login/refresh", TokenRefreshView.as_view(), name="refresh"),
-    # path('logout/', LogoutView.as_view(), name='logout'),
+    path(
+        "login/",
+        TokenObtainPairView.as_view(
+            serializer_class=TokenObtainPairSerializer,
+            throttle_classes=(LoginThrottle,),
+        ),
+        name="login",
+    ),
+    path(
+        "login/refresh",
+        TokenRefreshView.as_view(
+            serializer_class=TokenRefreshSerializer,
+            throttle_classes=(LoginThrottle,),
+        ),
+        name="refresh",
+    ),
+    path("metrics", metrics_view, name="metrics"),
+    path("logout/", LogoutView.as_view(), name="logout"),
     # path('register/', RegisterView.as_view(), name='register'),
 
     path(
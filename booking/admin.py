@@ -4,8 +4,11 @@ from django.contrib.auth.models import Group
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
-from booking.models import User, Room, Event, Book
+from booking import filters
+from booking.models import User, Room, Event, Book, WaitlistEntry
+from booking.pagination import EstimatedCountPaginator
 
 
 class UserCreationForm(forms.ModelForm):
@@ -72,7 +75,91 @@ class UserAdmin(BaseUserAdmin):
     filter_horizontal = ()
 
 
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Admin of tables growing to millions of rows.
+
+    The changelist is counted with `EstimatedCountPaginator` and doesn't
+    count the unfiltered table a second time. Subclasses select the
+    relations shown in `list_display` and edit foreign keys with
+    autocomplete widgets, which load matching rows on demand instead of
+    rendering every row into a `<select>`.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 admin.site.register(User, UserAdmin)
-admin.site.register(Room)
-admin.site.register(Event)
-admin.site.register(Book)
+
+
+@admin.register(Room)
+class RoomAdmin(admin.ModelAdmin):
+    list_display = ('name', 'capacity')
+    search_fields = ('name',)
+    ordering = ('name',)
+
+
+@admin.register(Event)
+class EventAdmin(LargeTableAdmin):
+    list_display = ('name', 'date', 'room', 'event_type', 'seats_taken', 'has_free_seats')
+    list_select_related = ('room',)
+    # backed by the (event_type, has_free_seats, date) index
+    list_filter = ('event_type', 'has_free_seats')
+    date_hierarchy = 'date'
+    search_fields = ('name',)
+    autocomplete_fields = ('room',)
+    readonly_fields = ('seats_taken', 'has_free_seats')
+    ordering = ('-date', '-id')
+
+    def get_search_results(self, request, queryset, search_term):
+        # searched through the full-text index of the names instead of
+        # scanning them, also for the event autocomplete of other admins
+        return filters.search_events(queryset, search_term), False
+
+
+class BookAdminForm(forms.ModelForm):
+    """A form for booking events, refusing events without free seats."""
+
+    class Meta:
+        model = Book
+        fields = ('event', 'customer')
+
+    def clean_event(self):
+        event = self.cleaned_data["event"]
+        if self.instance._state.adding and not event.has_free_seats:
+            raise ValidationError("event room capacity is allocated")
+        return event
+
+
+@admin.register(Book)
+class BookAdmin(LargeTableAdmin):
+    list_display = ('id', 'event', 'customer')
+    list_select_related = ('event', 'customer')
+    # an exact lookup uses the unique email index
+    search_fields = ('=customer__email',)
+    autocomplete_fields = ('event', 'customer')
+    form = BookAdminForm
+
+    def get_readonly_fields(self, request, obj=None):
+        # moving a book to another event would skip the seat accounting
+        if obj is not None:
+            return ('event',)
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        # deleted books give their seat back through the post_delete signal
+        if change:
+            return super().save_model(request, obj, form, change)
+        with transaction.atomic():
+            if not Event.objects.take_seats(obj.event_id):
+                raise ValidationError("event room capacity is allocated")
+            super().save_model(request, obj, form, change)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(LargeTableAdmin):
+    list_display = ('id', 'event', 'customer', 'created')
+    list_select_related = ('event', 'customer')
+    search_fields = ('=customer__email',)
+    autocomplete_fields = ('event', 'customer')
+
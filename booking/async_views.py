@@ -0,0 +1,213 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework import exceptions, generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_json_api.parsers import JSONParser
+
+from booking import (
+    cache,
+    includes,
+    models,
+    pagination,
+    permissions,
+    renderers,
+    serializers,
+    views,
+)
+from booking.authentication import JWTClaimsAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of `GenericAPIView` for the hot paths.
+
+    Authentication, permissions, filter backends, serializers and the
+    JSON:API renderer are shared with the sync views, but rows are read
+    with the async ORM so waiting on the database or a slow client doesn't
+    block a worker. The ORM doesn't support transactions from async code
+    yet, so writes run in a thread with `sync_to_async`.
+    """
+
+    authentication = JWTClaimsAuthentication()
+    renderer_classes = (renderers.JSONRenderer,)
+    renderer = renderer_classes[0]()
+    parser_classes = (JSONParser,)
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = ()
+    filter_backends = api_settings.DEFAULT_FILTER_BACKENDS
+    serializer_class = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            parser_context={"view": self, "args": args, "kwargs": kwargs},
+        )
+        request.parser_context["request"] = request
+        request.accepted_renderer = self.renderer
+        request.accepted_media_type = self.renderer.media_type
+        try:
+            await self.initial(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    async def initial(self, request):
+        user_auth = await self.authentication.aauthenticate(request)
+        request.user = user_auth[0] if user_auth else AnonymousUser()
+        for permission in self.permission_classes:
+            if not permission().has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied()
+        if self.throttle_classes:
+            # the throttle state may live in a remote cache
+            await sync_to_async(self.check_throttles)(request)
+
+    def check_throttles(self, request):
+        waits = [
+            throttle.wait()
+            for throttle in (
+                throttle_class() for throttle_class in self.throttle_classes
+            )
+            if not throttle.allow_request(request, self)
+        ]
+        if waits:
+            raise exceptions.Throttled(
+                max((wait for wait in waits if wait is not None), default=None)
+            )
+
+    def get_exception_handler_context(self):
+        view = self
+        if self.serializer_class is not None:
+            # the JSON:API handler points errors at the fields of generic views
+            view = generics.GenericAPIView(
+                serializer_class=self.serializer_class,
+                request=self.request,
+                format_kwarg=None,
+                args=(),
+                kwargs={},
+            )
+        return {"view": view, "request": self.request}
+
+    def handle_exception(self, exc):
+        handler = api_settings.EXCEPTION_HANDLER
+        response = handler(exc, self.get_exception_handler_context())
+        if response is None:
+            raise exc
+        rendered = self.render(response.data, response.status_code)
+        if "Retry-After" in response:
+            rendered["Retry-After"] = response["Retry-After"]
+        if isinstance(exc, exceptions.NotAuthenticated):
+            rendered["WWW-Authenticate"] = self.authentication.authenticate_header(
+                self.request
+            )
+        return rendered
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        self.response = response = HttpResponse(
+            status=status_code, content_type=self.renderer.media_type
+        )
+        response.content = self.renderer.render(
+            data,
+            self.renderer.media_type,
+            {"view": self, "request": self.request, "response": response},
+        )
+        return response
+
+    def get_serializer_class(self):
+        return self.serializer_class
+
+    def get_serializer_context(self):
+        return {"request": self.request, "view": self}
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("context", self.get_serializer_context())
+        return self.get_serializer_class()(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+
+create_event = views.EventListCreateApiView.as_view()
+
+
+class EventListView(renderers.FastPathMixin, AsyncAPIView):
+    """Async variant of `EventListCreateApiView`, sharing its response cache."""
+
+    serializer_class = serializers.EventSerializer
+    pagination_class = pagination.EventCursorPagination
+    filterset_class = views.EventListCreateApiView.filterset_class
+
+    def get_queryset(self):
+        # included resources can't be loaded lazily from async code
+        return includes.optimize(
+            models.Event.objects.visible_to(self.request.user),
+            self.serializer_class,
+            self.request,
+            self.pagination_class.ordering,
+        )
+
+    async def get(self, request, *args, **kwargs):
+        # the cache backends are sync and may block on files or the network
+        key = await sync_to_async(cache.get_key)(
+            request, request.user.role, self.renderer.media_type
+        )
+        response = await sync_to_async(cache.get_cached_response)(request, key)
+        if response is not None:
+            return response
+
+        paginator = self.pagination_class()
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.use_fast_path(request):
+            queryset = paginator.get_page_queryset(
+                self.get_fast_queryset(queryset, paginator), request, self
+            )
+            page = paginator.set_page([row async for row in queryset])
+            response = self.render(self.get_document(page, paginator))
+        else:
+            queryset = paginator.get_page_queryset(queryset, request, self)
+            page = paginator.set_page([event async for event in queryset])
+            serializer = self.get_serializer(page, many=True)
+            response = self.render(
+                paginator.get_paginated_response(serializer.data).data
+            )
+        return await sync_to_async(cache.cache_response)(request, key, response)
+
+    async def post(self, request, *args, **kwargs):
+        # creating events isn't a hot path, leave it to the sync view
+        return await sync_to_async(create_event)(request._request, *args, **kwargs)
+
+
+class BookCreateView(AsyncAPIView):
+    """Async variant of `BookCreateApiView`."""
+
+    permission_classes = (permissions.IsCustomer,)
+    throttle_classes = views.BookCreateApiView.throttle_classes
+    serializer_class = serializers.BookSerializer
+
+    def create(self, request):
+        """Validate and book like `BookCreateApiView`, return the response."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        error = views.BookCreateApiView.book(serializer)
+        if error is not None:
+            return self.render(error, status.HTTP_400_BAD_REQUEST)
+        return self.render(serializer.data, status.HTTP_201_CREATED)
+
+    async def post(self, request, *args, **kwargs):
+        # validation looks the related objects up with the sync ORM
+        return await sync_to_async(self.create)(request)
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from booking.models import User
+
+
+class ClaimsUser(TokenUser):
+    """Stateless user built from the claims embedded by `booking.tokens`."""
+
+    BUSINESS = User.BUSINESS
+    CUSTOMER = User.CUSTOMER
+    ADMIN = User.ADMIN
+
+    def __str__(self):
+        return self.email
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", "")
+
+
+class UserCache:
+    """
+    Bounded in-process LRU cache of users with a time to live.
+
+    Entries are dropped on every change of a user, see `booking.signals`.
+    As the cache lives per process, other workers only see such a change
+    once their entry expired.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._users[user_id] = (user, time.monotonic() + self.ttl)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_TTL)
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    """
+    JWT authentication which doesn't load the user from the database.
+
+    Per default the user is built from the signed id, email and role claims
+    of the token, so a change of role or a deactivation only applies to
+    tokens issued afterwards. With `JWT_USER_CACHE_SIZE` set users are
+    instead looked up in `user_cache` and loaded from the database only on
+    a miss, which picks up changes of the user as soon as the entry is
+    invalidated. Tokens issued without the claims always hit the database.
+    """
+
+    def get_user(self, validated_token):
+        if user_cache.size:
+            user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+            user = user_cache.get(user_id)
+            if user is None:
+                user = super().get_user(validated_token)
+                user_cache.set(user_id, user)
+            return user
+
+        if "role" not in validated_token:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Authenticate from an async view.
+
+        Only a token without claims or a miss of `user_cache` needs the
+        database, which is then queried in a thread.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if not user_cache.size and "role" in validated_token:
+            return ClaimsUser(validated_token), validated_token
+        return await sync_to_async(self.get_user)(validated_token), validated_token
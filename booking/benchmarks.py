@@ -0,0 +1,197 @@
+"""
+Benchmark scenarios driving the booking flows through `APIClient`.
+
+Every scenario prepares its own users and events and issues the same
+request repeatedly, see the `benchmark` management command.
+"""
+import datetime
+import math
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking import models
+from booking.tokens import RefreshToken
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of `values`."""
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def relationship(resource_type, pk):
+    return {"data": {"type": resource_type, "id": str(pk)}}
+
+
+class Scenario:
+    name = None
+    role = None
+    status_code = status.HTTP_200_OK
+
+    def setup(self, requests):
+        self.user = models.User.objects.create_user(
+            f"benchmark-{self.name}@example.com", "benchmark", role=self.role
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def create_event(self, capacity):
+        room = models.Room.objects.create(
+            name=f"benchmark {self.name}", capacity=capacity
+        )
+        return models.Event.objects.create(
+            name=f"benchmark {self.name}",
+            room=room,
+            date=timezone.localdate() + datetime.timedelta(days=1),
+        )
+
+    def request(self, index):
+        raise NotImplementedError
+
+
+class CustomerEventList(Scenario):
+    name = "customer-event-list"
+    role = models.User.CUSTOMER
+
+    def request(self, index):
+        return self.client.get(reverse("event-list"))
+
+
+class BusinessEventCreate(Scenario):
+    name = "business-event-create"
+    role = models.User.BUSINESS
+    status_code = status.HTTP_201_CREATED
+
+    def setup(self, requests):
+        super().setup(requests)
+        self.room = models.Room.objects.create(name="benchmark", capacity=10)
+
+    def request(self, index):
+        date = timezone.localdate() + datetime.timedelta(days=index + 1)
+        data = {
+            "data": {
+                "type": "events",
+                "attributes": {"name": f"benchmark {index}", "date": date.isoformat()},
+                "relationships": {"room": relationship("rooms", self.room.pk)},
+            }
+        }
+        return self.client.post(reverse("event-list"), data)
+
+
+class Book(Scenario):
+    name = "book"
+    role = models.User.CUSTOMER
+    status_code = status.HTTP_201_CREATED
+
+    def setup(self, requests):
+        super().setup(requests)
+        self.event = self.create_event(capacity=requests)
+
+    def request(self, index):
+        data = {
+            "data": {
+                "type": "books",
+                "relationships": {
+                    "event": relationship("events", self.event.pk),
+                    "customer": relationship("users", self.user.pk),
+                },
+            }
+        }
+        return self.client.post(reverse("book-create"), data)
+
+
+class Cancel(Scenario):
+    name = "cancel"
+    role = models.User.CUSTOMER
+    status_code = status.HTTP_204_NO_CONTENT
+
+    def setup(self, requests):
+        super().setup(requests)
+        event = self.create_event(capacity=requests)
+        self.books = models.Book.objects.bulk_create(
+            models.Book(event=event, customer=self.user) for _ in range(requests)
+        )
+        models.Event.objects.take_seats(event.pk, requests)
+
+    def request(self, index):
+        return self.client.delete(reverse("book-cancel", args=[self.books[index].pk]))
+
+
+class BusinessRoomList(Scenario):
+    name = "business-room-list"
+    role = models.User.BUSINESS
+
+    def request(self, index):
+        return self.client.get(reverse("room-list"))
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        CustomerEventList,
+        BusinessEventCreate,
+        Book,
+        Cancel,
+        BusinessRoomList,
+    )
+}
+
+
+def run_scenario(scenario, requests):
+    """
+    Issue `requests` requests of given scenario and return the figures.
+
+    Latencies are measured per request, so throughput is that of a single
+    worker. Counting queries adds a little overhead to every request.
+    """
+    scenario.setup(requests)
+    durations, queries = [], []
+    for index in range(requests):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = scenario.request(index)
+            durations.append(time.perf_counter() - start)
+        if response.status_code != scenario.status_code:
+            raise ValueError(
+                f"{scenario.name} responded with {response.status_code}, "
+                f"expected {scenario.status_code}"
+            )
+        queries.append(len(context))
+
+    return {
+        "requests": requests,
+        "throughput": requests / sum(durations),
+        "p50": percentile(durations, 50) * 1000,
+        "p95": percentile(durations, 95) * 1000,
+        "p99": percentile(durations, 99) * 1000,
+        "queries": max(queries),
+    }
+
+
+def run(names, requests):
+    """
+    Run the named scenarios and return their figures by name.
+
+    All changes are rolled back afterwards, the response cache is bypassed,
+    so listings are rendered from the database every time, and requests
+    aren't throttled.
+    """
+    results = {}
+    rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
+    with override_settings(
+        RESPONSE_CACHE_TIMEOUT=0, REST_FRAMEWORK=rest_framework
+    ), transaction.atomic():
+        for name in names:
+            results[name] = run_scenario(SCENARIOS[name](), requests)
+        transaction.set_rollback(True)
+    return results
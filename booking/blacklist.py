@@ -0,0 +1,135 @@
+"""
+Per-process Bloom filter of blacklisted refresh tokens.
+
+Every refresh used to look its token up in the blacklist table. The
+filter answers most of these lookups in memory: a token it doesn't
+contain is definitely not blacklisted, a token it contains may be and is
+looked up in the database. Tokens blacklisted by other workers are synced
+every `TOKEN_BLACKLIST_SYNC_INTERVAL` seconds with one query for the new
+rows. Until then a refresh of such a token is still rejected, because the
+rotated token is blacklisted by an insert which fails if it already was,
+see `booking.tokens.RefreshToken`.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class BloomFilter:
+    """Set of strings with false positives at `error_rate` up to `capacity`."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(
+            math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8
+        )
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def _positions(self, key):
+        # double hashing, two 64 bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return (
+            (first + index * second) % self.size for index in range(self.hash_count)
+        )
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class TokenBlacklist:
+    """
+    Bloom filter of the jti of blacklisted tokens, loaded on first use.
+
+    The filter is rebuilt from the unexpired blacklisted tokens once it
+    holds more tokens than it was sized for, at least
+    `TOKEN_BLACKLIST_CAPACITY` or twice the tokens it was built from, or is
+    older than `rebuild_interval` seconds, which drops the expired ones.
+    """
+
+    rebuild_interval = 3600
+
+    def __init__(self):
+        self._filter = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_exact_on_refresh():
+        """Whether a refresh blacklists the token it rotates."""
+        return (
+            api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION
+        )
+
+    def _rebuild(self, now):
+        rows = list(
+            BlacklistedToken.objects.filter(
+                token__expires_at__gt=aware_utcnow()
+            ).values_list("id", "token__jti")
+        )
+        # room to grow, or every lookup would rebuild once it's exceeded
+        bloom = BloomFilter(
+            max(settings.TOKEN_BLACKLIST_CAPACITY, len(rows) * 2),
+            settings.TOKEN_BLACKLIST_ERROR_RATE,
+        )
+        last_id = 0
+        for blacklisted_id, jti in rows:
+            bloom.add(jti)
+            last_id = max(last_id, blacklisted_id)
+        self._filter, self._last_id = bloom, last_id
+        self._built = self._synced = now
+
+    def _sync(self, now):
+        # rows committed out of id order are only seen by the next rebuild
+        rows = BlacklistedToken.objects.filter(id__gt=self._last_id).values_list(
+            "id", "token__jti"
+        )
+        for blacklisted_id, jti in rows:
+            self._filter.add(jti)
+            self._last_id = max(self._last_id, blacklisted_id)
+        self._synced = now
+
+    def _refresh(self):
+        now = time.monotonic()
+        if (
+            self._filter is None
+            or self._filter.count > self._filter.capacity
+            or now - self._built > self.rebuild_interval
+        ):
+            self._rebuild(now)
+        elif now - self._synced > settings.TOKEN_BLACKLIST_SYNC_INTERVAL:
+            self._sync(now)
+
+    def __contains__(self, jti):
+        with self._lock:
+            self._refresh()
+            return jti in self._filter
+
+    def add(self, jti):
+        """Add a token blacklisted by this worker right away."""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def clear(self):
+        with self._lock:
+            self._filter = None
+
+
+token_blacklist = TokenBlacklist()
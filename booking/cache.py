@@ -0,0 +1,109 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+VERSION_KEY = "booking:response-version"
+
+
+def is_shared(alias="default"):
+    """Whether the cache `alias` is the same for all worker processes."""
+    return settings.WORKER_PROCESSES <= 1 or not isinstance(caches[alias], LocMemCache)
+
+
+def get_version():
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def bump_version():
+    """
+    Invalidate all cached responses.
+
+    The version is bumped right away and once more after the current
+    transaction commits, so responses cached by concurrent requests
+    before the commit aren't served afterwards.
+    """
+    _bump_version()
+    transaction.on_commit(_bump_version)
+
+
+def get_key(request, scope, media_type=None):
+    media_type = media_type or request.accepted_media_type
+    digest = hashlib.md5(f"{media_type}:{request.get_full_path()}".encode()).hexdigest()
+    return f"booking:response:{scope}:{get_version()}:{digest}"
+
+
+def _respond(request, content, content_type, etag):
+    response = get_conditional_response(request, etag=etag) or HttpResponse(
+        content, content_type=content_type
+    )
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def get_cached_response(request, key):
+    """Return the response cached under `key` or `None`."""
+    if not is_shared():
+        return None
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    return _respond(request, *cached)
+
+
+def cache_response(request, key, response):
+    """
+    Cache the rendered `response` under `key` if it succeeded.
+
+    Responses aren't cached when every worker has its own cache, as a
+    change only invalidates the responses cached by the worker making it.
+    """
+    if response.status_code != 200:
+        return response
+    cached = (
+        response.content,
+        response["Content-Type"],
+        quote_etag(hashlib.md5(response.content).hexdigest()),
+    )
+    if is_shared():
+        cache.set(key, cached, settings.RESPONSE_CACHE_TIMEOUT)
+    return _respond(request, *cached)
+
+
+class ResponseCacheMixin:
+    """
+    Cache rendered list responses and answer conditional requests.
+
+    Cached responses are keyed by the scope of the request user, by default
+    the role, as the listings only differ per role. Every change of events,
+    rooms or books bumps the version which is part of the key, see
+    `booking.signals`. Clients sending the ETag back in `If-None-Match` get
+    a `304 Not Modified` as long as nothing changed.
+    """
+
+    def get_cache_scope(self):
+        return self.request.user.role
+
+    def list(self, request, *args, **kwargs):
+        key = get_key(request, self.get_cache_scope())
+        response = get_cached_response(request, key)
+        if response is None:
+            response = self.finalize_response(
+                request, super().list(request, *args, **kwargs), *args, **kwargs
+            )
+            response.render()
+            response = cache_response(request, key, response)
+        return response
@@ -0,0 +1,93 @@
+import importlib
+import inspect
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache, caches
+from django.test import AsyncRequestFactory
+from factory.base import FactoryMetaClass
+from pytest_factoryboy import register
+from rest_framework.test import APIClient
+
+from booking import models
+from booking.blacklist import token_blacklist
+from booking.tokens import RefreshToken
+
+
+def module_factories(module):
+    for name, obj in inspect.getmembers(module):
+        if isinstance(obj, FactoryMetaClass) and not obj._meta.abstract:
+            # name needs to be compatible with
+            # `rest_framework.routers.SimpleRouter` naming for easier testing
+            base_name = obj._meta.model._meta.object_name.lower()
+            yield obj, base_name
+
+
+# `register` injects the fixtures into its caller's namespace, so it has
+# to be called on module level rather than from within a helper
+for factory, base_name in module_factories(
+    importlib.import_module("booking.factories", "booking-api")
+):
+    register(factory, base_name)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    caches["throttle"].clear()
+    token_blacklist.clear()
+
+
+@pytest.fixture
+def admin_client(db, admin_user):
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    return client
+
+
+@pytest.fixture
+def customer(db, user_factory):
+    return user_factory(role=models.User.CUSTOMER)
+
+
+@pytest.fixture
+def customer_client(customer):
+    client = APIClient()
+    client.force_authenticate(user=customer)
+    return client
+
+
+@pytest.fixture
+def business(db, user_factory):
+    return user_factory(role=models.User.BUSINESS)
+
+
+@pytest.fixture
+def business_client(business):
+    client = APIClient()
+    client.force_authenticate(user=business)
+    return client
+
+
+@pytest.fixture
+def call():
+    """Call an async view within the test transaction."""
+
+    def call(view, method, user=None, data=None, **extra):
+        if user is not None:
+            token = RefreshToken.for_user(user).access_token
+            extra["authorization"] = f"Bearer {token}"
+        factory = AsyncRequestFactory()
+        if data is None:
+            request = getattr(factory, method)("/api/v1/", **extra)
+        else:
+            request = getattr(factory, method)(
+                "/api/v1/",
+                json.dumps(data),
+                content_type="application/vnd.api+json",
+                **extra,
+            )
+        return async_to_sync(view.as_view())(request)
+
+    return call
@@ -0,0 +1,104 @@
+"""
+Streaming CSV and NDJSON exports of books and events.
+
+Rows are read as tuples with `values_list` in chunks, so the memory used
+doesn't grow with the number of exported rows and no model instances are
+built. The related event, room and customer columns are joined in the
+same query.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+BOOK_COLUMNS = (
+    ("id", "id"),
+    ("event", "event_id"),
+    ("event_name", "event__name"),
+    ("date", "event__date"),
+    ("room", "event__room_id"),
+    ("room_name", "event__room__name"),
+    ("customer", "customer_id"),
+    ("email", "customer__email"),
+    ("first_name", "customer__first_name"),
+    ("last_name", "customer__last_name"),
+)
+
+EVENT_COLUMNS = (
+    ("id", "id"),
+    ("name", "name"),
+    ("date", "date"),
+    ("event_type", "event_type"),
+    ("room", "room_id"),
+    ("room_name", "room__name"),
+    ("capacity", "room__capacity"),
+    ("seats_taken", "seats_taken"),
+)
+
+
+class Echo:
+    """File-like object returning what is written, for `csv.writer`."""
+
+    def write(self, value):
+        return value
+
+
+def _chunked(lines, chunk_size):
+    # one write per chunk instead of per row
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def _csv_lines(rows, names):
+    writer = csv.writer(Echo())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(rows, names):
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+FORMATS = {"csv": _csv_lines, "ndjson": _ndjson_lines}
+
+
+def export(queryset, columns, export_format, chunk_size):
+    """Yield given columns of all rows of `queryset` in chunks of text."""
+    rows = (
+        queryset.order_by("pk")
+        .values_list(*(path for _, path in columns))
+        .iterator(chunk_size=chunk_size)
+    )
+    lines = FORMATS[export_format](rows, [name for name, _ in columns])
+    return _chunked(lines, chunk_size)
+
+
+class CSVRenderer(BaseRenderer):
+    """Negotiates CSV exports, only renders errors itself."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        data = data if isinstance(data, dict) else {"detail": data}
+        lines = _csv_lines([[str(value) for value in data.values()]], list(data))
+        return "".join(lines).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Negotiates NDJSON exports, only renders errors itself."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data, cls=DjangoJSONEncoder) + "\n").encode(self.charset)
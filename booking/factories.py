@@ -1,4 +1,7 @@
-from factory import Faker
+import datetime
+
+from django.utils import timezone
+from factory import Faker, Sequence, SubFactory, post_generation
 from factory.django import DjangoModelFactory
 
 from . import models
@@ -7,8 +10,61 @@ from . import models
 class UserFactory(DjangoModelFactory):
     first_name = Faker("first_name")
     last_name = Faker("last_name")
-    username = Faker("uuid")
     email = Faker("safe_email")
 
     class Meta:
         model = models.User
+
+
+class RoomFactory(DjangoModelFactory):
+    name = Faker("company")
+    capacity = 10
+
+    class Meta:
+        model = models.Room
+
+
+class EventFactory(DjangoModelFactory):
+    name = Faker("catch_phrase")
+    # distinct upcoming dates, a room holds at most one event per date
+    date = Sequence(lambda n: timezone.localdate() + datetime.timedelta(days=n + 1))
+    room = SubFactory(RoomFactory)
+    event_type = models.Event.PUBLIC
+
+    class Meta:
+        model = models.Event
+
+
+class BookFactory(DjangoModelFactory):
+    event = SubFactory(EventFactory)
+    customer = SubFactory(UserFactory, role=models.User.CUSTOMER)
+
+    class Meta:
+        model = models.Book
+
+    @post_generation
+    def take_seats(obj, create, extracted, **kwargs):
+        if create:
+            models.Event.objects.take_seats(obj.event_id)
+
+
+class WaitlistEntryFactory(DjangoModelFactory):
+    event = SubFactory(EventFactory)
+    customer = SubFactory(UserFactory, role=models.User.CUSTOMER)
+
+    class Meta:
+        model = models.WaitlistEntry
+
+
+class HoldFactory(DjangoModelFactory):
+    event = SubFactory(EventFactory)
+    customer = SubFactory(UserFactory, role=models.User.CUSTOMER)
+    expires = Faker("future_datetime", tzinfo=datetime.timezone.utc)
+
+    class Meta:
+        model = models.Hold
+
+    @post_generation
+    def take_seats(obj, create, extracted, **kwargs):
+        if create:
+            models.Event.objects.take_seats(obj.event_id)
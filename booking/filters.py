@@ -1,3 +1,185 @@
-# from django_filters import Filter
+import re
 
-# Add your filters here
+from django.db import connections
+from django.db.models import Exists, OuterRef
+from django.db.models.expressions import RawSQL
+from django_filters import (
+    BooleanFilter,
+    CharFilter,
+    ChoiceFilter,
+    DateFilter,
+    FilterSet,
+    NumberFilter,
+)
+from rest_framework.exceptions import ValidationError
+
+from booking import models
+
+
+class RoomAvailabilityFilterSet(FilterSet):
+    """
+    Rooms with a minimum capacity which are free for a whole date range.
+
+    The range is checked with an anti join on the unique (room, date)
+    index of events, so only events within the range are looked at.
+    """
+
+    capacity = NumberFilter(lookup_expr="gte")
+    date_from = DateFilter(method="filter_date_range", required=True)
+    date_to = DateFilter(method="filter_date_range", required=True)
+
+    class Meta:
+        model = models.Room
+        fields = ["capacity", "date_from", "date_to"]
+
+    def filter_date_range(self, queryset, name, value):
+        # applied in `filter_queryset` once both bounds are known
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        date_from = self.form.cleaned_data["date_from"]
+        date_to = self.form.cleaned_data["date_to"]
+        if date_from > date_to:
+            raise ValidationError("date-from must not be after date-to")
+
+        events = models.Event.objects.filter(
+            room=OuterRef("pk"), date__range=(date_from, date_to)
+        )
+        return queryset.filter(~Exists(events))
+
+
+# keep the SQLite full-text index of event names in sync, dropped whenever a
+# migration rebuilds the events table, see `ensure_search_triggers`
+SEARCH_TRIGGERS = {
+    "booking_event_search_insert": (
+        "AFTER INSERT ON booking_event BEGIN "
+        "INSERT INTO booking_event_search(rowid, name) VALUES (new.id, new.name); END"
+    ),
+    "booking_event_search_delete": (
+        "AFTER DELETE ON booking_event BEGIN "
+        "INSERT INTO booking_event_search(booking_event_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); END"
+    ),
+    "booking_event_search_update": (
+        "AFTER UPDATE OF name ON booking_event BEGIN "
+        "INSERT INTO booking_event_search(booking_event_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO booking_event_search(rowid, name) VALUES (new.id, new.name); END"
+    ),
+}
+
+
+def ensure_search_triggers(connection):
+    """
+    Recreate missing triggers of the SQLite full-text index and rebuild it.
+
+    Return the names of the recreated triggers.
+    """
+    if connection.vendor != "sqlite":
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master WHERE name LIKE %s",
+            ["booking_event_search%"],
+        )
+        existing = {name: type_ for type_, name in cursor.fetchall()}
+        if existing.get("booking_event_search") != "table":
+            # not migrated yet
+            return []
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {name} {SEARCH_TRIGGERS[name]}")
+        if missing:
+            # names changed meanwhile are missing from the index
+            cursor.execute(
+                "INSERT INTO booking_event_search(booking_event_search) "
+                "VALUES ('rebuild')"
+            )
+    return missing
+
+
+def search_events(queryset, text):
+    """
+    Return the events of `queryset` with names containing words starting
+    with every word of `text`.
+
+    Searched through the full-text index of the names on SQLite and
+    PostgreSQL, other databases scan the names.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        # quoted as strings, the words can't be read as FTS5 operators
+        match = " ".join(f'"{word}"*' for word in words)
+        matching = RawSQL(
+            "SELECT rowid FROM booking_event_search WHERE booking_event_search MATCH %s",
+            [match],
+        )
+    elif vendor == "postgresql":
+        match = " & ".join(f"{word}:*" for word in words)
+        matching = RawSQL(
+            "SELECT id FROM booking_event "
+            "WHERE to_tsvector('simple', name) @@ to_tsquery('simple', %s)",
+            [match],
+        )
+    else:
+        for word in words:
+            queryset = queryset.filter(name__icontains=word)
+        return queryset
+    return queryset.filter(pk__in=matching)
+
+
+class EventFilterSet(FilterSet):
+    """
+    Events by date range, room, minimum room capacity, type, free seats and
+    name.
+
+    Every filter is served by an index of events, or rooms for the
+    capacity, see `search_events` for the name.
+    """
+
+    date_from = DateFilter(field_name="date", lookup_expr="gte")
+    date_to = DateFilter(field_name="date", lookup_expr="lte")
+    room = NumberFilter(field_name="room_id")
+    capacity = NumberFilter(field_name="room__capacity", lookup_expr="gte")
+    event_type = ChoiceFilter(choices=models.Event.EVENT_TYPE_CHOICES)
+    has_free_seats = BooleanFilter()
+    search = CharFilter(method="filter_search")
+
+    class Meta:
+        model = models.Event
+        fields = [
+            "date_from",
+            "date_to",
+            "room",
+            "capacity",
+            "event_type",
+            "has_free_seats",
+            "search",
+        ]
+
+    def filter_search(self, queryset, name, value):
+        return search_events(queryset, value)
+
+
+class BookExportFilterSet(FilterSet):
+    event = NumberFilter(field_name="event_id")
+    date_from = DateFilter(field_name="event__date", lookup_expr="gte")
+    date_to = DateFilter(field_name="event__date", lookup_expr="lte")
+
+    class Meta:
+        model = models.Book
+        fields = ["event", "date_from", "date_to"]
+
+
+class EventExportFilterSet(FilterSet):
+    room = NumberFilter(field_name="room_id")
+    date_from = DateFilter(field_name="date", lookup_expr="gte")
+    date_to = DateFilter(field_name="date", lookup_expr="lte")
+
+    class Meta:
+        model = models.Event
+        fields = ["room", "date_from", "date_to"]
@@ -0,0 +1,205 @@
+"""
+Batch validation and insertion of imported rooms, events and books.
+
+Every importer validates a whole batch of rows with a constant number of
+queries against the rules enforced by the API and inserts the valid rows
+with one `bulk_create`. Batches have to be imported in a transaction.
+"""
+import datetime
+import itertools
+
+from booking import models, provisioning
+
+
+class RowError(ValueError):
+    pass
+
+
+def batched(objects, size):
+    iterator = iter(objects)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _integer(row, field, minimum=None):
+    try:
+        value = int(row[field])
+    except (KeyError, TypeError, ValueError):
+        raise RowError(f"{field} must be an integer")
+    if minimum is not None and value < minimum:
+        raise RowError(f"{field} must be at least {minimum}")
+    return value
+
+
+def _name(row):
+    name = row.get("name")
+    if not name or len(name) > 64:
+        raise RowError("name must have 1 to 64 characters")
+    return name
+
+
+class Importer:
+    model = None
+
+    def parse(self, row):
+        """Return the model instance of a row or raise `RowError`."""
+        raise NotImplementedError
+
+    def validate(self, objects):
+        """Return the errors by position of the parsed objects of a batch."""
+        return {}
+
+    def import_batch(self, rows):
+        """
+        Import a batch of rows and return the errors by position.
+
+        Positions are relative to the start of the batch.
+        """
+        objects, errors = {}, {}
+        for position, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors[position] = "row must be an object"
+                continue
+            try:
+                objects[position] = self.parse(row)
+            except RowError as exc:
+                errors[position] = str(exc)
+
+        errors.update(self.validate(objects))
+        self.model.objects.bulk_create(
+            obj for position, obj in objects.items() if position not in errors
+        )
+        return errors
+
+
+class RoomImporter(Importer):
+    model = models.Room
+
+    def parse(self, row):
+        return models.Room(name=_name(row), capacity=_integer(row, "capacity", 0))
+
+
+class EventImporter(Importer):
+    model = models.Event
+
+    def parse(self, row):
+        try:
+            date = datetime.date.fromisoformat(row.get("date") or "")
+        except ValueError:
+            raise RowError("date must be formatted YYYY-MM-DD")
+        event_type = row.get("event_type") or models.Event.PUBLIC
+        if event_type not in dict(models.Event.EVENT_TYPE_CHOICES):
+            raise RowError(f"event_type {event_type} is invalid")
+        return models.Event(
+            name=_name(row),
+            date=date,
+            room_id=_integer(row, "room"),
+            event_type=event_type,
+        )
+
+    def validate(self, objects):
+        rooms = models.Room.objects.in_bulk(
+            {event.room_id for event in objects.values()}
+        )
+        # one room may hold one event per date, in the database and the batch
+        taken = set(
+            models.Event.objects.filter(
+                room_id__in=rooms, date__in={event.date for event in objects.values()}
+            ).values_list("room_id", "date")
+        )
+
+        errors = {}
+        for position, event in objects.items():
+            room = rooms.get(event.room_id)
+            if room is None:
+                errors[position] = "room does not exist"
+            elif (event.room_id, event.date) in taken:
+                errors[position] = f"room already has an event on {event.date}"
+            else:
+                taken.add((event.room_id, event.date))
+                # bulk_create doesn't send the pre_save signal
+                event.has_free_seats = room.capacity > 0
+        return errors
+
+
+class BookImporter(Importer):
+    model = models.Book
+
+    def parse(self, row):
+        book = models.Book(event_id=_integer(row, "event"))
+        if row.get("customer"):
+            book.customer_id = _integer(row, "customer")
+        elif row.get("email"):
+            # resolved in `validate`
+            book.email = row["email"]
+        else:
+            raise RowError("customer or email is required")
+        return book
+
+    def validate(self, objects):
+        """Also take the seats of the valid books, like `BookBulkCreateApiView`."""
+        events = models.Event.objects.select_related("room").in_bulk(
+            {book.event_id for book in objects.values()}
+        )
+        customer_ids = set(
+            models.User.objects.filter(
+                pk__in={
+                    book.customer_id
+                    for book in objects.values()
+                    if book.customer_id is not None
+                }
+            ).values_list("pk", flat=True)
+        )
+        customer_ids_by_email = dict(
+            models.User.objects.filter(
+                email__in={
+                    book.email for book in objects.values() if book.customer_id is None
+                }
+            ).values_list("email", "pk")
+        )
+        customer_ids.update(customer_ids_by_email.values())
+
+        errors, positions_by_event = {}, {}
+        for position, book in objects.items():
+            if book.customer_id is None:
+                book.customer_id = customer_ids_by_email.get(book.email)
+            event = events.get(book.event_id)
+            if event is None:
+                errors[position] = "event does not exist"
+            elif book.customer_id not in customer_ids:
+                errors[position] = "customer does not exist"
+            elif event.event_type != models.Event.PUBLIC:
+                errors[position] = "event must be public"
+            else:
+                positions_by_event.setdefault(book.event_id, []).append(position)
+
+        for event_id, positions in positions_by_event.items():
+            event = events[event_id]
+            free = max(event.room.capacity - event.seats_taken, 0)
+            for position in positions[free:]:
+                errors[position] = "event room capacity is allocated"
+            positions = positions[:free]
+            # conditional update, fails if seats were booked meanwhile
+            if positions and not models.Event.objects.take_seats(
+                event_id, len(positions)
+            ):
+                for position in positions:
+                    errors[position] = "event room capacity is allocated"
+        return errors
+
+
+class UserImporter(Importer):
+    model = models.User
+
+    def import_batch(self, rows):
+        """Provision the users, see `booking.provisioning`."""
+        _, errors = provisioning.provision(rows, workers=provisioning.hash_workers())
+        return errors
+
+
+IMPORTERS = {
+    "users": UserImporter,
+    "rooms": RoomImporter,
+    "events": EventImporter,
+    "books": BookImporter,
+}
@@ -0,0 +1,103 @@
+"""
+Queries loading what the JSON:API `include` and `fields[type]` ask for.
+
+Included resources are rendered from the related objects, which costs a
+query per resource unless they are joined, while sparse fieldsets only
+shrink the document but still read every column. `optimize` turns the
+included to-one relationships into `select_related`, the others into
+`prefetch_related`, and the sparse fieldsets into `only`.
+"""
+import inflection
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework_json_api import utils
+
+
+def _plan(serializer_class, request, includes, prefix, plan):
+    # the serializer drops the fields left out by a sparse fieldset
+    serializer = serializer_class(context={"request": request})
+    model = serializer.Meta.model
+    resource_type = utils.get_resource_type_from_serializer(serializer)
+    if f"fields[{resource_type}]" in request.query_params:
+        plan["sparse"] = True
+        columns = [
+            field.source
+            for field in serializer.fields.values()
+            if getattr(_model_field(model, field.source), "concrete", False)
+        ]
+    else:
+        columns = [field.name for field in model._meta.concrete_fields]
+    plan["only"] += [prefix + column for column in columns]
+
+    nested = {}
+    for path in includes:
+        name, _, rest = inflection.underscore(path).partition(".")
+        nested.setdefault(name, []).extend([rest] if rest else [])
+    included_serializers = getattr(serializer, "included_serializers", {})
+    for name, rest in nested.items():
+        field = serializer.fields.get(name)
+        if field is None or name not in included_serializers:
+            continue
+        model_field = _model_field(model, field.source)
+        if model_field is None or not (
+            model_field.many_to_one or model_field.one_to_one
+        ):
+            # sparse fieldsets don't apply below a prefetch
+            plan["prefetch"].append(prefix + field.source)
+            plan["prefetch"] += [
+                f"{prefix}{field.source}__{inflection.underscore(path).replace('.', '__')}"
+                for path in rest
+            ]
+            continue
+        plan["select"].append(prefix + field.source)
+        _plan(
+            included_serializers[name], request, rest, f"{prefix}{field.source}__", plan
+        )
+
+
+def _model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def optimize(queryset, serializer_class, request, ordering=()):
+    """
+    Return `queryset` loading the resources included by the request.
+
+    Columns are limited to the fields of the sparse fieldsets, the primary
+    key, the foreign keys of joined relationships and the `ordering` used
+    by the pagination.
+    """
+    plan = {"select": [], "prefetch": [], "only": [], "sparse": False}
+    _plan(
+        serializer_class,
+        request,
+        utils.get_included_resources(request, serializer_class),
+        "",
+        plan,
+    )
+    if plan["select"]:
+        queryset = queryset.select_related(*plan["select"])
+    if plan["prefetch"]:
+        queryset = queryset.prefetch_related(*plan["prefetch"])
+    if plan["sparse"]:
+        queryset = queryset.only(
+            *plan["only"], *(field.lstrip("-") for field in ordering)
+        )
+    return queryset
+
+
+class IncludeQueryMixin:
+    """Load what `include` and `fields[type]` ask for, see `optimize`."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in ("GET", "HEAD"):
+            return queryset
+        return optimize(
+            queryset,
+            self.get_serializer_class(),
+            self.request,
+            getattr(self.paginator, "ordering", ()),
+        )
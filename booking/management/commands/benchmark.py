@@ -0,0 +1,67 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the booking flows and compare latency, throughput and "
+        "query counts with a stored baseline. Seed the database first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=benchmarks.SCENARIOS,
+            help="Scenario to run, may be repeated (default: all).",
+        )
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--baseline", default=".benchmarks/baseline.json")
+        parser.add_argument(
+            "--save",
+            action="store_true",
+            help="Store the results as new baseline.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["scenario"] or list(benchmarks.SCENARIOS)
+        try:
+            results = benchmarks.run(names, options["requests"])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        baseline = {}
+        if os.path.exists(options["baseline"]):
+            with open(options["baseline"]) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        regressed = []
+        for name, result in results.items():
+            self.stdout.write(self.format(name, result, baseline.get(name)))
+            if name in baseline and result["queries"] > baseline[name]["queries"]:
+                regressed.append(name)
+
+        if options["save"]:
+            os.makedirs(os.path.dirname(options["baseline"]) or ".", exist_ok=True)
+            with open(options["baseline"], "w") as baseline_file:
+                json.dump({**baseline, **results}, baseline_file, indent=2)
+        elif regressed:
+            raise CommandError(f"query count regressed: {', '.join(regressed)}")
+
+    @staticmethod
+    def format(name, result, baseline):
+        line = (
+            f"{name}: {result['throughput']:.1f} req/s, "
+            f"p50 {result['p50']:.1f}ms, p95 {result['p95']:.1f}ms, "
+            f"p99 {result['p99']:.1f}ms, {result['queries']} queries"
+        )
+        if baseline is None:
+            return line
+        return line + (
+            f" (baseline {baseline['throughput']:.1f} req/s, "
+            f"p99 {baseline['p99']:.1f}ms, {baseline['queries']} queries)"
+        )
@@ -0,0 +1,123 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from booking import benchmarks, urls
+from booking.models import User
+from booking.tokens import RefreshToken
+
+
+def get_urlconf(asynchronous):
+    """Register a URLconf serving the API by sync or async views."""
+    name = f"booking.benchmark_urls_{'async' if asynchronous else 'sync'}"
+    module = types.ModuleType(name)
+    module.urlpatterns = [path("api/v1/", include(urls.get_urlpatterns(asynchronous)))]
+    sys.modules[name] = module
+    return name
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of the sync views served by WSGI "
+        "threads with the async views served by ASGI on the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user to authenticate as.")
+        parser.add_argument("--path", default="/api/v1/events")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Threads serving WSGI requests in this process, sharing the GIL "
+            "unlike the uWSGI processes.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Requests in flight against the ASGI application.",
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Serve listings from the response cache instead of the database.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options["email"])
+        except User.DoesNotExist:
+            raise CommandError(f"user {options['email']} does not exist")
+        self.authorization = f"Bearer {RefreshToken.for_user(user).access_token}"
+        self.path = options["path"]
+
+        timeout = settings.RESPONSE_CACHE_TIMEOUT if options["cache"] else 0
+        for name, run, concurrency in (
+            ("wsgi", self.run_wsgi, options["workers"]),
+            ("asgi", self.run_asgi, options["concurrency"]),
+        ):
+            urlconf = get_urlconf(asynchronous=name == "asgi")
+            with override_settings(
+                ROOT_URLCONF=urlconf, RESPONSE_CACHE_TIMEOUT=timeout
+            ):
+                self.report(name, *run(options["requests"], concurrency))
+
+    def report(self, name, elapsed, durations, failures):
+        self.stdout.write(
+            f"{name}: {len(durations)} requests in {elapsed:.2f}s, "
+            f"{len(durations) / elapsed:.1f} req/s, "
+            f"p50 {benchmarks.percentile(durations, 50) * 1000:.1f}ms, "
+            f"p99 {benchmarks.percentile(durations, 99) * 1000:.1f}ms, "
+            f"{failures} failed"
+        )
+
+    def run_wsgi(self, requests, workers):
+        local = threading.local()
+
+        def get(_):
+            if not hasattr(local, "client"):
+                local.client = Client(HTTP_AUTHORIZATION=self.authorization)
+            start = time.perf_counter()
+            response = local.client.get(self.path)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            results = list(executor.map(get, range(requests)))
+        return self.summarize(time.perf_counter() - start, results)
+
+    def run_asgi(self, requests, concurrency):
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def get():
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(
+                        self.path, authorization=self.authorization
+                    )
+                    return time.perf_counter() - start, response.status_code
+
+            return await asyncio.gather(*(get() for _ in range(requests)))
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        return self.summarize(time.perf_counter() - start, results)
+
+    @staticmethod
+    def summarize(elapsed, results):
+        durations = [duration for duration, _ in results]
+        failures = sum(status_code != 200 for _, status_code in results)
+        return elapsed, durations, failures
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from booking import exports, filters, models
+
+EXPORTS = {
+    "books": (models.Book, filters.BookExportFilterSet, exports.BOOK_COLUMNS),
+    "events": (models.Event, filters.EventExportFilterSet, exports.EVENT_COLUMNS),
+}
+FILTERS = ("event", "room", "date_from", "date_to")
+
+
+class Command(BaseCommand):
+    help = "Stream all books or events as CSV or NDJSON, e.g. for nightly dumps."
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=EXPORTS)
+        parser.add_argument("--format", choices=exports.FORMATS, default="ndjson")
+        parser.add_argument("--output", help="File to write to (default: stdout).")
+        parser.add_argument("--event", type=int, help="Only books of this event.")
+        parser.add_argument("--room", type=int, help="Only events in this room.")
+        parser.add_argument("--date-from", help="Only events from this date on.")
+        parser.add_argument("--date-to", help="Only events until this date.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        model, filterset_class, columns = EXPORTS[options["resource"]]
+        data = {}
+        for name in FILTERS:
+            if options[name] is None:
+                continue
+            if name not in filterset_class.base_filters:
+                raise CommandError(
+                    f"{options['resource']} can't be filtered by {name.replace('_', '-')}"
+                )
+            data[name] = options[name]
+
+        filterset = filterset_class(data, queryset=model.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        chunks = exports.export(
+            filterset.qs, columns, options["format"], options["chunk_size"]
+        )
+        if options["output"] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as output:
+            output.writelines(chunks)
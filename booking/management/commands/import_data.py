@@ -0,0 +1,108 @@
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from booking import cache, importers, models
+
+FORMATS = ("csv", "jsonl")
+
+
+def _csv_rows(lines):
+    yield from csv.DictReader(lines)
+
+
+def _jsonl_rows(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # rejected by the importer, keeps the row numbers
+            yield None
+
+
+class Command(BaseCommand):
+    help = (
+        "Import rooms, events or books from a CSV or JSON lines file in "
+        "batches. Running it again on the same file resumes after the last "
+        "imported batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=importers.IMPORTERS)
+        parser.add_argument("input", help="File to read, '-' for stdin.")
+        parser.add_argument(
+            "--format", choices=FORMATS, help="Default: from the file extension."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Import the file from the first row, even if it was imported before.",
+        )
+
+    def handle(self, *args, **options):
+        input_format = options["format"]
+        if input_format is None:
+            extension = os.path.splitext(options["input"])[1].lstrip(".")
+            input_format = "jsonl" if extension in ("jsonl", "ndjson") else extension
+        if input_format not in FORMATS:
+            raise CommandError("format must be given as --format csv or jsonl")
+
+        if options["input"] == "-":
+            # stdin can't be read again, so it isn't resumed
+            self.import_rows(sys.stdin, input_format, options, progress=None, skip=0)
+        else:
+            source = f"{options['resource']}:{os.path.abspath(options['input'])}"
+            progress, _ = models.ImportProgress.objects.get_or_create(source=source)
+            skip = 0 if options["restart"] else progress.rows
+            if skip:
+                self.stdout.write(f"Resuming after row {skip}")
+            try:
+                lines = open(options["input"], newline="", encoding="utf-8")
+            except OSError as exc:
+                raise CommandError(exc)
+            with lines:
+                self.import_rows(lines, input_format, options, progress, skip)
+
+    def import_rows(self, lines, input_format, options, progress, skip):
+        importer = importers.IMPORTERS[options["resource"]]()
+        rows = _csv_rows(lines) if input_format == "csv" else _jsonl_rows(lines)
+        rows = itertools.islice(rows, skip, None)
+
+        row_number, imported, rejected = skip, 0, 0
+        start = time.perf_counter()
+        for batch in importers.batched(rows, options["batch_size"]):
+            # the batch and the checkpoint are committed together
+            with transaction.atomic():
+                errors = importer.import_batch(batch)
+                if progress is not None:
+                    progress.rows = row_number + len(batch)
+                    progress.save(update_fields=["rows"])
+
+            for position, error in sorted(errors.items()):
+                self.stderr.write(f"row {row_number + position + 1}: {error}")
+            row_number += len(batch)
+            imported += len(batch) - len(errors)
+            rejected += len(errors)
+            self.stdout.write(
+                f"{row_number} rows read, {imported} imported, {rejected} rejected"
+            )
+
+        # bulk_create doesn't send the signals invalidating the cache
+        if imported:
+            cache.bump_version()
+
+        duration = time.perf_counter() - start
+        rate = (imported + rejected) / duration if duration else 0
+        self.stdout.write(
+            f"Imported {imported} {options['resource']}, rejected {rejected} "
+            f"rows in {duration:.1f}s ({rate:.0f} rows/s)"
+        )
@@ -0,0 +1,62 @@
+import glob
+import json
+import os
+import pstats
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate the requests profiled by `booking.profiling` into a report "
+        "of the hottest functions and queries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=settings.PROFILE_DIR)
+        parser.add_argument("--view", help="Only aggregate requests of this view.")
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=("cumulative", "tottime", "ncalls"),
+        )
+        parser.add_argument("--limit", type=int, default=30)
+
+    def handle(self, *args, **options):
+        traces = []
+        for name in sorted(glob.glob(os.path.join(options["dir"], "*.json"))):
+            with open(name) as trace_file:
+                trace = json.load(trace_file)
+            if options["view"] in (None, trace["view"]):
+                traces.append((name[: -len(".json")] + ".prof", trace))
+        if not traces:
+            raise CommandError(f"no profiled requests in {options['dir']}")
+
+        durations = sorted(trace["duration"] for _, trace in traces)
+        self.stdout.write(
+            f"{len(traces)} requests, median {durations[len(durations) // 2] * 1000:.1f}ms, "
+            f"max {durations[-1] * 1000:.1f}ms\n"
+        )
+
+        stats = pstats.Stats(*(prof for prof, _ in traces), stream=self.stdout)
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["limit"])
+
+        self.stdout.write("calls  total ms  query")
+        for sql, (calls, duration) in self.aggregate_queries(traces)[
+            : options["limit"]
+        ]:
+            self.stdout.write(f"{calls:5d}  {duration * 1000:8.1f}  {sql}")
+
+    @staticmethod
+    def aggregate_queries(traces):
+        """Sum queries differing only in their number of parameters."""
+        queries = defaultdict(lambda: [0, 0.0])
+        for _, trace in traces:
+            for query in trace["queries"]:
+                sql = re.sub(r"%s(, %s)+", "%s, ...", query["sql"])
+                queries[sql][0] += 1
+                queries[sql][1] += query["duration"]
+        return sorted(queries.items(), key=lambda item: item[1][1], reverse=True)
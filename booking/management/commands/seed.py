@@ -0,0 +1,138 @@
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from booking import cache, models
+from booking.importers import batched
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with reproducible rooms, events, customers "
+        "and books, e.g. for the benchmarks. All users log in with 'secret'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=50)
+        parser.add_argument(
+            "--days", type=int, default=365, help="Days with an event in every room."
+        )
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument(
+            "--books",
+            type=int,
+            default=100000,
+            help="Approximate number of books, limited by the capacity of the events.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if models.Event.objects.exists():
+            raise CommandError("database already contains events")
+        if options["books"] and not options["customers"]:
+            raise CommandError("books need at least one customer")
+
+        self.random = random.Random(options["seed"])
+        self.fake = Faker()
+        self.fake.seed_instance(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            customer_ids = self.create_users(options["customers"])
+            rooms = self.create_rooms(options["rooms"])
+            self.create_events(rooms, options["days"], options["books"])
+            books = self.create_books(customer_ids)
+            cache.bump_version()
+
+        self.stdout.write(
+            f"Created {len(customer_ids)} customers, {len(rooms)} rooms, "
+            f"{len(rooms) * options['days']} events and {books} books"
+        )
+
+    def bulk_create(self, model, objects):
+        for batch in batched(objects, self.batch_size):
+            model.objects.bulk_create(batch)
+
+    def create_users(self, count):
+        password = make_password("secret")
+        models.User.objects.create(
+            email="business@example.com", role=models.User.BUSINESS, password=password
+        )
+        self.bulk_create(
+            models.User,
+            (
+                models.User(
+                    email=f"customer{index}@example.com",
+                    first_name=self.fake.first_name(),
+                    role=models.User.CUSTOMER,
+                    password=password,
+                )
+                for index in range(count)
+            ),
+        )
+        return list(
+            models.User.objects.filter(role=models.User.CUSTOMER).values_list(
+                "pk", flat=True
+            )
+        )
+
+    def create_rooms(self, count):
+        self.bulk_create(
+            models.Room,
+            (
+                models.Room(
+                    name=self.fake.company()[:64], capacity=self.random.randint(10, 200)
+                )
+                for _ in range(count)
+            ),
+        )
+        return list(models.Room.objects.order_by("pk"))
+
+    def create_events(self, rooms, days, books):
+        # fill every public event to the same share of its capacity on
+        # average, the seats are booked by `create_books`
+        capacity = sum(room.capacity for room in rooms) * days
+        share = min(books / capacity, 1) if capacity else 0
+        start = timezone.localdate()
+
+        def events():
+            for day, room in itertools.product(range(days), rooms):
+                event_type = models.Event.PUBLIC
+                seats_taken = min(
+                    round(room.capacity * share * self.random.uniform(0.5, 1.5)),
+                    room.capacity,
+                )
+                if self.random.random() < 0.1:
+                    event_type, seats_taken = models.Event.PRIVATE, 0
+                yield models.Event(
+                    name=self.fake.catch_phrase()[:64],
+                    date=start + datetime.timedelta(days=day),
+                    room=room,
+                    event_type=event_type,
+                    seats_taken=seats_taken,
+                    has_free_seats=seats_taken < room.capacity,
+                )
+
+        self.bulk_create(models.Event, events())
+
+    def create_books(self, customer_ids):
+        seats = models.Event.objects.filter(seats_taken__gt=0).values_list(
+            "pk", "seats_taken"
+        )
+
+        def books():
+            for event_id, seats_taken in seats.iterator():
+                for _ in range(seats_taken):
+                    yield models.Book(
+                        event_id=event_id, customer_id=self.random.choice(customer_ids)
+                    )
+
+        self.bulk_create(models.Book, books())
+        return models.Book.objects.count()
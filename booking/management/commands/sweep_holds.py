@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from booking import cache, models
+
+
+class Command(BaseCommand):
+    help = (
+        "Give the seats of expired holds and the seats left in hold shards "
+        "back to their events, in batches of holds. Run it regularly, see "
+        "uwsgi.ini."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        released = models.Hold.objects.sweep(batch_size=options["batch_size"])
+        if released:
+            cache.bump_version()
+        self.stdout.write(f"Released {released} seats")
@@ -0,0 +1,155 @@
+"""
+Per-request timing and SQL instrumentation.
+
+Metrics are kept with `prometheus_client`. uWSGI workers are separate
+processes, so set `PROMETHEUS_MULTIPROC_DIR` to a directory shared by
+them and wiped on start for `/metrics` to aggregate all workers.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("view", "method")
+
+request_duration = Histogram(
+    "booking_request_duration_seconds", "Duration of requests per view.", LABELS
+)
+request_queries = Histogram(
+    "booking_request_queries",
+    "SQL queries per request per view.",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, float("inf")),
+)
+request_db_duration = Histogram(
+    "booking_request_db_duration_seconds",
+    "Time spent in SQL queries per request per view.",
+    LABELS,
+)
+requests_shed = Counter(
+    "booking_requests_shed",
+    "Requests rejected by the load shedder per reason.",
+    ("reason",),
+)
+
+_queries = contextvars.ContextVar("queries")
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper recording the duration of every query."""
+    queries = _queries.get(None)
+    if queries is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.append((time.perf_counter() - start, sql))
+
+
+def install_query_recorder(connection):
+    """Install `record_query` on a new connection, see `booking.signals`."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count and SQL time of every request.
+
+    The figures are added to the response as `Server-Timing` header and
+    requests slower than `SLOW_REQUEST_THRESHOLD` milliseconds are logged
+    with their slowest queries. Queries are collected in a context
+    variable, so queries run by async views in a thread are counted too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        queries, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        return self.finish(request, response, queries, start)
+
+    async def __acall__(self, request):
+        queries, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        return self.finish(request, response, queries, start)
+
+    @staticmethod
+    def start():
+        queries = []
+        return queries, _queries.set(queries), time.perf_counter()
+
+    def finish(self, request, response, queries, start):
+        duration = time.perf_counter() - start
+        db_duration = sum(query_duration for query_duration, _ in queries)
+        match = request.resolver_match
+        labels = (match.view_name if match else "unresolved", request.method)
+
+        request_duration.labels(*labels).observe(duration)
+        request_queries.labels(*labels).observe(len(queries))
+        request_db_duration.labels(*labels).observe(db_duration)
+
+        response["Server-Timing"] = (
+            f"app;dur={duration * 1000:.1f}, "
+            f'db;dur={db_duration * 1000:.1f};desc="{len(queries)} queries"'
+        )
+        if duration * 1000 >= settings.SLOW_REQUEST_THRESHOLD:
+            self.log_slow_request(request, duration, db_duration, queries)
+        return response
+
+    @staticmethod
+    def log_slow_request(request, duration, db_duration, queries):
+        slowest = sorted(queries, key=lambda query: query[0], reverse=True)
+        logger.warning(
+            "slow request %s %s took %.1fms, %d queries took %.1fms%s",
+            request.method,
+            request.get_full_path(),
+            duration * 1000,
+            len(queries),
+            db_duration * 1000,
+            "".join(
+                f"\n  {query_duration * 1000:.1f}ms {sql}"
+                for query_duration, sql in slowest[: settings.SLOW_REQUEST_QUERIES]
+            ),
+        )
+
+
+def metrics_view(request):
+    """Expose the metrics of all workers in the Prometheus text format."""
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
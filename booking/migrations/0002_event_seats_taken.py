@@ -0,0 +1,35 @@
+# Generated by Django 4.1.2 on 2026-10-18 18:46
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_seats_taken(apps, schema_editor):
+    Event = apps.get_model("booking", "Event")
+    Book = apps.get_model("booking", "Book")
+    seats_taken = (
+        Book.objects.filter(event=models.OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+    Event.objects.update(seats_taken=Coalesce(models.Subquery(seats_taken), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="seats_taken",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="seats taken"
+            ),
+        ),
+        migrations.RunPython(count_seats_taken, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.1.2 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+def set_has_free_seats(apps, schema_editor):
+    Event = apps.get_model("booking", "Event")
+    Event.objects.filter(seats_taken__gte=models.F("room__capacity")).update(
+        has_free_seats=False
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0002_event_seats_taken"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="has_free_seats",
+            field=models.BooleanField(
+                default=True, editable=False, verbose_name="has free seats"
+            ),
+        ),
+        migrations.RunPython(set_has_free_seats, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["event_type", "has_free_seats", "date"],
+                name="booking_eve_event_t_7b10eb_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.1.2 on 2026-10-18 18:57
+
+from django.db import migrations, models
+
+
+def check_duplicates(apps, schema_editor):
+    # events booked twice by the racy check of the old api, which only
+    # their owners can resolve, e.g. by moving one to another date or room
+    Event = apps.get_model("booking", "Event")
+    duplicates = (
+        Event.objects.using(schema_editor.connection.alias)
+        .values("room_id", "date")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .order_by("room_id", "date")
+    )
+    lines = [
+        f"room {duplicate['room_id']} on {duplicate['date']}: events "
+        + ", ".join(
+            str(pk)
+            for pk in Event.objects.using(schema_editor.connection.alias)
+            .filter(room_id=duplicate["room_id"], date=duplicate["date"])
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        for duplicate in duplicates
+    ]
+    if lines:
+        raise RuntimeError(
+            "Rooms with more than one event on a date, resolve these before "
+            "migrating:\n" + "\n".join(lines)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0003_event_has_free_seats"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="room",
+            name="capacity",
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, verbose_name="capacity"
+            ),
+        ),
+        migrations.RunPython(check_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="event",
+            constraint=models.UniqueConstraint(
+                fields=("room", "date"), name="unique_room_date"
+            ),
+        ),
+    ]
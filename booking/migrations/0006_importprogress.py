@@ -0,0 +1,37 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0005_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportProgress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="source"
+                    ),
+                ),
+                (
+                    "rows",
+                    models.PositiveBigIntegerField(default=0, verbose_name="rows"),
+                ),
+            ],
+        ),
+    ]
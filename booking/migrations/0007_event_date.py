@@ -0,0 +1,17 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0006_importprogress"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["date"], name="event_date"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0007_event_date"),
+    ]
+
+    operations = [
+        # the new index covers customer lookups before the old one is dropped
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["customer", "event"], name="book_customer_event"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="book",
+            name="customer",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="books",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="customer",
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0008_book_customer_event"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HoldShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField(verbose_name="shard")),
+                ("seats", models.PositiveIntegerField(default=0, verbose_name="seats")),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hold_shards",
+                        to="booking.event",
+                        verbose_name="event",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Hold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "expires",
+                    models.DateTimeField(db_index=True, verbose_name="expires"),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holds",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="customer",
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holds",
+                        to="booking.event",
+                        verbose_name="event",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="holdshard",
+            constraint=models.UniqueConstraint(
+                fields=("event", "shard"), name="unique_hold_shard"
+            ),
+        ),
+    ]
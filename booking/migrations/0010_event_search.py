@@ -0,0 +1,60 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+SQLITE = [
+    # external content table, only the index is stored
+    "CREATE VIRTUAL TABLE booking_event_search USING fts5("
+    "name, content='booking_event', content_rowid='id')",
+    "CREATE TRIGGER booking_event_search_insert AFTER INSERT ON booking_event BEGIN "
+    "INSERT INTO booking_event_search(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER booking_event_search_delete AFTER DELETE ON booking_event BEGIN "
+    "INSERT INTO booking_event_search(booking_event_search, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER booking_event_search_update AFTER UPDATE OF name ON booking_event "
+    "BEGIN "
+    "INSERT INTO booking_event_search(booking_event_search, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    "INSERT INTO booking_event_search(rowid, name) VALUES (new.id, new.name); END",
+    "INSERT INTO booking_event_search(booking_event_search) VALUES ('rebuild')",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER booking_event_search_update",
+    "DROP TRIGGER booking_event_search_delete",
+    "DROP TRIGGER booking_event_search_insert",
+    "DROP TABLE booking_event_search",
+]
+POSTGRESQL = [
+    "CREATE INDEX booking_event_search ON booking_event "
+    "USING gin (to_tsvector('simple', name))",
+]
+POSTGRESQL_REVERSE = ["DROP INDEX booking_event_search"]
+
+
+def run(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0009_hold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["has_free_seats", "date"], name="event_free_seats_date"
+            ),
+        ),
+        # full-text index of the names, other databases search with LIKE
+        migrations.RunPython(
+            run({"sqlite": SQLITE, "postgresql": POSTGRESQL}),
+            run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRESQL_REVERSE}),
+        ),
+    ]
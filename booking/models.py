@@ -1,8 +1,14 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 # from django.db import models
 
 
@@ -60,12 +66,86 @@ class User(AbstractUser):
 
 class Room(models.Model):
     name = models.CharField(verbose_name=_("name"), max_length=64)
-    capacity = models.PositiveIntegerField(_("capacity"), default=0)
+    capacity = models.PositiveIntegerField(_("capacity"), default=0, db_index=True)
 
 
     def __str__(self):
         return f"{self.name} | {self.capacity}"
 
+class EventManager(models.Manager):
+    """
+    Event manager keeping the maintained seats counter consistent.
+
+    All helpers issue a single conditional UPDATE so concurrent bookings
+    serialise on the event row instead of racing a separate COUNT query.
+    The `has_free_seats` flag is derived from the same row in the same
+    statement, so it never disagrees with `seats_taken`.
+    """
+
+    @staticmethod
+    def _room_capacity():
+        return models.Subquery(
+            Room.objects.filter(pk=models.OuterRef("room_id")).values("capacity")
+        )
+
+    @staticmethod
+    def _has_free_seats(**lookups):
+        return models.Case(
+            models.When(then=models.Value(True), **lookups),
+            default=models.Value(False),
+        )
+
+    def visible_to(self, user):
+        """Return the events `user` may list, customers only see bookable ones."""
+        queryset = self.get_queryset()
+        if user and user.role == user.CUSTOMER:
+            return queryset.filter(event_type=self.model.PUBLIC, has_free_seats=True)
+        return queryset
+
+    def take_seats(self, event_id, count=1):
+        """
+        Take `count` seats of the event if its room still has capacity left.
+
+        Return whether the seats were taken.
+        """
+        capacity = self._room_capacity()
+        events = self.filter(pk=event_id, seats_taken__lte=capacity - count)
+        changes = {
+            "seats_taken": models.F("seats_taken") + count,
+            "has_free_seats": self._has_free_seats(seats_taken__lt=capacity - count),
+        }
+        if events.update(**changes):
+            return True
+        # seats left in the shards of holds are free to take, see `HoldManager`
+        return bool(
+            settings.HOLD_SHARDS
+            and Hold.objects.reclaim_shards(event_id)
+            and events.update(**changes)
+        )
+
+    def release_seats(self, event_id, count=1):
+        """
+        Give `count` seats of the event back.
+
+        Return whether the seats were released.
+        """
+        return bool(
+            self.filter(pk=event_id, seats_taken__gte=count).update(
+                seats_taken=models.F("seats_taken") - count,
+                has_free_seats=self._has_free_seats(
+                    seats_taken__lt=self._room_capacity() + count
+                ),
+            )
+        )
+
+    def refresh_free_seats(self, room_id=None, event_id=None):
+        """Recompute `has_free_seats` of all events held in given room or of an event."""
+        events = self.filter(room_id=room_id) if event_id is None else self.filter(pk=event_id)
+        return events.update(
+            has_free_seats=self._has_free_seats(seats_taken__lt=self._room_capacity())
+        )
+
+
 class Event(models.Model):
     PUBLIC = "PUBLIC"
     PRIVATE = "PRIVATE"
@@ -77,14 +157,296 @@ class Event(models.Model):
     date = models.DateField(verbose_name=_("date"))
     room = models.ForeignKey("booking.Room", verbose_name=_("room"), on_delete=models.CASCADE, related_name="events")
     event_type = models.CharField(max_length=10, default=PUBLIC, choices=EVENT_TYPE_CHOICES)
+    seats_taken = models.PositiveIntegerField(_("seats taken"), default=0, editable=False)
+    has_free_seats = models.BooleanField(_("has free seats"), default=True, editable=False)
+    objects = EventManager()
+
+    class Meta:
+        constraints = [
+            # also serves as (room, date) index for availability searches
+            models.UniqueConstraint(fields=["room", "date"], name="unique_room_date"),
+        ]
+        indexes = [
+            models.Index(fields=["event_type", "has_free_seats", "date"]),
+            # date hierarchy of the admin, and date ranges
+            models.Index(fields=["date"], name="event_date"),
+            # free events of any type by date
+            models.Index(fields=["has_free_seats", "date"], name="event_free_seats_date"),
+        ]
+        # names are searched through the full-text index of migration 0010,
+        # kept up to date by triggers on SQLite, which are recreated after
+        # migrations rebuilding the table, see booking.filters
 
     def __str__(self):
         return f"{self.name} | {self.date} ({self.event_type})"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the event without overwriting its seats counter.
+
+        The counter is only changed by the conditional updates of
+        `EventManager`, a counter loaded before concurrent bookings would
+        undo them, so the free seats flag is recomputed from the row.
+        """
+        if self._state.adding or kwargs.get("update_fields") is not None:
+            return super().save(*args, **kwargs)
+        kwargs["update_fields"] = [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in ("seats_taken", "has_free_seats")
+        ]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Event.objects.refresh_free_seats(event_id=self.pk)
+
 
 class Book(models.Model):
     event = models.ForeignKey("booking.Event", verbose_name=_("event"), on_delete=models.CASCADE, related_name="books")
-    customer = models.ForeignKey("booking.User", verbose_name=_("customer"), on_delete=models.CASCADE, related_name="books")
+    # indexed by book_customer_event
+    customer = models.ForeignKey("booking.User", verbose_name=_("customer"), on_delete=models.CASCADE, related_name="books", db_index=False)
+
+    class Meta:
+        indexes = [
+            # books of a customer, and whether they booked an event
+            models.Index(fields=["customer", "event"], name="book_customer_event"),
+        ]
+
+    def __str__(self):
+        return f"{self.event} | {self.customer}"
+
+
+class WaitlistManager(models.Manager):
+    def waiting(self):
+        return self.filter(book__isnull=True)
+
+    def promote(self, event_id):
+        """
+        Book a freed seat of the event for the customer waiting longest.
+
+        Has to run in the transaction freeing the seat. Concurrent
+        promotions skip the entries already locked by each other. Return
+        the promoted entry or `None` if nobody is waiting or no seat is free.
+        """
+        entry = (
+            self.waiting()
+            .filter(event_id=event_id)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        if entry is None or not Event.objects.take_seats(event_id):
+            return None
+        entry.book = Book.objects.create(event_id=event_id, customer_id=entry.customer_id)
+        entry.save(update_fields=["book"])
+        return entry
+
+
+class WaitlistEntry(models.Model):
+    event = models.ForeignKey("booking.Event", verbose_name=_("event"), on_delete=models.CASCADE, related_name="waitlist")
+    customer = models.ForeignKey("booking.User", verbose_name=_("customer"), on_delete=models.CASCADE, related_name="waitlist")
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    # set once a seat was booked for the customer, cancelling that book
+    # removes the entry as well
+    book = models.OneToOneField("booking.Book", verbose_name=_("book"), on_delete=models.CASCADE, null=True, editable=False, related_name="waitlist_entry")
+    objects = WaitlistManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "customer"], name="unique_waitlist_customer"),
+        ]
+        indexes = [
+            # next waiting customer of an event
+            models.Index(fields=["event", "id"], condition=models.Q(book__isnull=True), name="waitlist_waiting"),
+        ]
 
     def __str__(self):
         return f"{self.event} | {self.customer}"
+
+
+class HoldLimitExceeded(Exception):
+    """The customer already holds `HOLD_MAX_SEATS` seats of the event."""
+
+
+class HoldManager(models.Manager):
+    """
+    Hold manager taking and giving back the seats of holds.
+
+    Holds take their seat from the event counter like books. With
+    `HOLD_SHARDS` set they take it from one of that many shards of the
+    event instead, which take `HOLD_SHARD_SEATS` seats of the event at
+    once, so concurrent holds of a hot event spread over several rows
+    rather than all queueing for the event row. Seats left in a shard
+    count as taken until `sweep` gives them back, or until the event is
+    found full when taking seats, which reclaims them right away.
+    """
+
+    def expired(self):
+        return self.filter(expires__lte=timezone.now())
+
+    def _take_seat(self, event_id):
+        if not settings.HOLD_SHARDS:
+            return Event.objects.take_seats(event_id)
+
+        shard = random.randrange(settings.HOLD_SHARDS)
+        shards = HoldShard.objects.filter(event_id=event_id, shard=shard)
+        if shards.filter(seats__gt=0).update(seats=models.F("seats") - 1):
+            return True
+        batch = settings.HOLD_SHARD_SEATS
+        if batch < 2 or not Event.objects.take_seats(event_id, batch):
+            # the last seats of an event are taken one by one
+            return Event.objects.take_seats(event_id)
+        if not shards.update(seats=models.F("seats") + batch - 1):
+            try:
+                with transaction.atomic():
+                    HoldShard.objects.create(event_id=event_id, shard=shard, seats=batch - 1)
+            except IntegrityError:
+                # created by a concurrent hold in the meantime
+                shards.update(seats=models.F("seats") + batch - 1)
+        return True
+
+    def hold(self, event_id, customer_id):
+        """
+        Hold a seat of the event for `HOLD_TTL` seconds.
+
+        The expired holds of a full event are swept right away. Return the
+        hold or `None` if no seat is free, raise `HoldLimitExceeded` if the
+        customer already holds `HOLD_MAX_SEATS` unexpired seats of it.
+        """
+        with transaction.atomic():
+            if not self._take_seat(event_id) and not (
+                self.sweep(event_id) and self._take_seat(event_id)
+            ):
+                return None
+            # counted once the concurrent holds of the customer committed,
+            # the seat taken above is given back by the rollback
+            User.objects.select_for_update().filter(pk=customer_id).exists()
+            held = self.filter(
+                event_id=event_id, customer_id=customer_id, expires__gt=timezone.now()
+            ).count()
+            if held >= settings.HOLD_MAX_SEATS:
+                raise HoldLimitExceeded()
+            return self.create(
+                event_id=event_id,
+                customer_id=customer_id,
+                expires=timezone.now() + timedelta(seconds=settings.HOLD_TTL),
+            )
+
+    def confirm(self, hold):
+        """
+        Book the seat of an unexpired hold.
+
+        Return the book or `None` if the hold expired or is gone.
+        """
+        with transaction.atomic():
+            if not self.filter(pk=hold.pk, expires__gt=timezone.now()).delete()[0]:
+                return None
+            return Book.objects.create(event_id=hold.event_id, customer_id=hold.customer_id)
+
+    def release(self, hold):
+        """Give the seat of a hold back, return whether it was still held."""
+        with transaction.atomic():
+            if not self.filter(pk=hold.pk).delete()[0]:
+                return False
+            self._release_seats({hold.event_id: 1})
+        return True
+
+    @staticmethod
+    def _empty_shards(shards):
+        """Empty the shards not locked by others, return their seats by event."""
+        seats_by_event = Counter()
+        with transaction.atomic():
+            locked = shards.select_for_update(skip_locked=True).values_list(
+                "pk", "event_id", "seats"
+            )
+            for pk, event_id, seats in locked:
+                HoldShard.objects.filter(pk=pk).update(seats=0)
+                seats_by_event[event_id] += seats
+        return seats_by_event
+
+    def reclaim_shards(self, event_id):
+        """Give the seats left in the shards of the event back, return them."""
+        seats = self._empty_shards(
+            HoldShard.objects.filter(event_id=event_id, seats__gt=0)
+        )[event_id]
+        if seats:
+            Event.objects.release_seats(event_id, seats)
+        return seats
+
+    @staticmethod
+    def _release_seats(seats_by_event):
+        for event_id, seats in seats_by_event.items():
+            Event.objects.release_seats(event_id, seats)
+            for _ in range(seats):
+                if WaitlistEntry.objects.promote(event_id) is None:
+                    break
+
+    def sweep(self, event_id=None, batch_size=1000):
+        """
+        Give the seats of expired holds and those left in shards back.
+
+        Expired holds are deleted by `batch_size` with one query, their
+        seats released with one update per event. Holds and shards locked
+        by concurrent sweeps are skipped. Return the number of seats.
+        """
+        holds = self.expired().order_by("expires")
+        shards = HoldShard.objects.filter(seats__gt=0)
+        if event_id is not None:
+            holds = holds.filter(event_id=event_id)
+            shards = shards.filter(event_id=event_id)
+
+        released = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    holds.select_for_update(skip_locked=True).values_list(
+                        "pk", "event_id"
+                    )[:batch_size]
+                )
+                if not batch:
+                    break
+                self.filter(pk__in=[pk for pk, _ in batch]).delete()
+                self._release_seats(Counter(held for _, held in batch))
+            released += len(batch)
+
+        with transaction.atomic():
+            seats_by_event = self._empty_shards(shards)
+            self._release_seats(seats_by_event)
+        return released + sum(seats_by_event.values())
+
+
+class Hold(models.Model):
+    """Seat of an event held for a customer until `expires`."""
+
+    event = models.ForeignKey("booking.Event", verbose_name=_("event"), on_delete=models.CASCADE, related_name="holds")
+    customer = models.ForeignKey("booking.User", verbose_name=_("customer"), on_delete=models.CASCADE, related_name="holds")
+    expires = models.DateTimeField(_("expires"), db_index=True)
+    objects = HoldManager()
+
+    def __str__(self):
+        return f"{self.event} | {self.customer} | {self.expires}"
+
+
+class HoldShard(models.Model):
+    """Seats of an event taken at once for holds, see `HoldManager`."""
+
+    event = models.ForeignKey("booking.Event", verbose_name=_("event"), on_delete=models.CASCADE, related_name="hold_shards")
+    shard = models.PositiveSmallIntegerField(_("shard"))
+    seats = models.PositiveIntegerField(_("seats"), default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "shard"], name="unique_hold_shard"),
+        ]
+
+    def __str__(self):
+        return f"{self.event} | {self.shard}: {self.seats}"
+
+
+class ImportProgress(models.Model):
+    """Rows of an input already imported by the `import_data` command."""
+
+    source = models.CharField(_("source"), max_length=255, unique=True)
+    rows = models.PositiveBigIntegerField(_("rows"), default=0)
+
+    def __str__(self):
+        return f"{self.source} | {self.rows}"
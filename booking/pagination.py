@@ -0,0 +1,191 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _reverse_ordering(ordering):
+    return tuple(
+        field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+    )
+
+
+class JsonApiCursorPagination(CursorPagination):
+    """
+    A JSON:API compatible keyset pagination.
+
+    The opaque cursor holds the ordering values of the row the page starts
+    after, so fetching any page is a range scan over the ordering columns
+    instead of an OFFSET, and no total count is computed. The ordering
+    has to be unique; a descending `sort` on its leading field reverses
+    it, any other `sort` is replaced by it.
+
+    .. code::
+
+        http://api.example.org/events?page[size]=50
+        http://api.example.org/events?page[size]=50&page[cursor]=<links.next>
+    """
+
+    cursor_query_param = "page[cursor]"
+    page_size_query_param = "page[size]"
+    page_size = 100
+    max_page_size = 100
+    ordering = ("id",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the queryset fetching the requested page and one more row.
+
+        Split from `paginate_queryset` so async views can evaluate it with
+        the async ORM before passing the rows to `set_page`.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.cursor_query_param
+        )
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.position, self.reverse = self.decode_cursor(request)
+        ordering = _reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(
+                    self.get_position_filter(ordering, self.position)
+                )
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        requested = queryset.query.order_by
+        if requested and requested[0] == f"-{self.ordering[0]}":
+            return _reverse_ordering(self.ordering)
+        return tuple(self.ordering)
+
+    @staticmethod
+    def get_position_filter(ordering, position):
+        """
+        Build the row value comparison `(a, b) > (x, y)` for given ordering.
+
+        Expanded to `a > x OR (a = x AND b > y)` as not every database
+        supports row values.
+        """
+        condition, equal = Q(), {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def get_position(self, instance):
+        if isinstance(instance, dict):
+            # rows of the fast path, see `booking.renderers`
+            return [instance[field.lstrip("-")] for field in self.ordering]
+        return [getattr(instance, field.lstrip("-")) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            position, reverse = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position is not None and (
+            not isinstance(position, list) or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def encode_cursor(self, position, reverse=False):
+        cursor = json.dumps([position, reverse], cls=DjangoJSONEncoder)
+        encoded = urlsafe_b64encode(cursor.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "results": data,
+                "meta": {"pagination": OrderedDict([("size", self.page_size)])},
+                "links": OrderedDict(
+                    [
+                        ("first", self.base_url),
+                        ("last", self.encode_cursor(None, reverse=True)),
+                        ("next", self.get_next_link()),
+                        ("prev", self.get_previous_link()),
+                    ]
+                ),
+            }
+        )
+
+
+class EventCursorPagination(JsonApiCursorPagination):
+    ordering = ("date", "id")
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator using the planner statistics as count of whole tables.
+
+    An exact `COUNT(*)` reads the whole table on PostgreSQL. The estimate
+    maintained by autovacuum is used instead for unfiltered querysets of
+    tables with more than `ADMIN_ESTIMATED_COUNT_THRESHOLD` rows, which
+    is precise enough for the page links of the admin. Filtered querysets
+    and other databases are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql" or queryset.query.where:
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # tables never analyzed have an estimate of -1
+        if row is None or row[0] < settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return int(row[0])
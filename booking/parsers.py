@@ -0,0 +1,60 @@
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+from rest_framework_json_api import exceptions
+from rest_framework_json_api.parsers import JSONParser
+from rest_framework_json_api.utils import get_resource_name
+
+
+class BulkJSONParser(JSONParser):
+    """
+    Parse a JSON:API document whose primary data is an array of resources.
+
+    Every resource object is flattened the same way `JSONParser` flattens a
+    single one. The result is a dict with the flattened resources in `data`
+    and the top level meta of the document in `_meta`, whose `meta_flags`
+    have to be booleans.
+    """
+
+    meta_flags = ("atomic", "tokens")
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        result = parsers.JSONParser.parse(
+            self, stream, media_type=media_type, parser_context=parser_context
+        )
+
+        if not isinstance(result, dict) or not isinstance(result.get("data"), list):
+            raise ParseError(
+                "Received document does not contain an array of primary data"
+            )
+
+        resource_name = get_resource_name(parser_context or {})
+        parsed_data = []
+        for data in result["data"]:
+            if not isinstance(data, dict):
+                raise ParseError(
+                    "Received data contains one or more malformed JSON:API "
+                    "Resource Object(s)"
+                )
+            if data.get("type") != resource_name:
+                raise exceptions.Conflict(
+                    "The resource object's type ({data_type}) is not the type that "
+                    "constitute the collection represented by the endpoint "
+                    "({resource_type}).".format(
+                        data_type=data.get("type"), resource_type=resource_name
+                    )
+                )
+            resource = {"type": data["type"]}
+            resource.update(self.parse_attributes(data))
+            resource.update(self.parse_relationships(data))
+            parsed_data.append(resource)
+
+        meta = result.get("meta")
+        if meta is None:
+            meta = {}
+        if not isinstance(meta, dict):
+            raise ParseError("Received document meta is not an object")
+        for flag in self.meta_flags:
+            if flag in meta and not isinstance(meta[flag], bool):
+                raise ParseError(f"Received document meta {flag} is not a boolean")
+
+        return {"data": parsed_data, "_meta": meta}
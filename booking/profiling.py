@@ -0,0 +1,106 @@
+"""
+Opt-in profiling of single requests in the running process.
+
+A request is run under cProfile when it is sampled at `PROFILE_SAMPLE_RATE`
+or, with `PROFILE_HEADER` enabled, when a staff user sends `X-Profile: 1`.
+The stats and the SQL trace of each profiled request are written to
+`PROFILE_DIR`, which only keeps the `PROFILE_KEEP` latest requests.
+Aggregate them with the `profile_report` management command.
+"""
+import cProfile
+import json
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.exceptions import APIException
+
+from booking.authentication import JWTClaimsAuthentication
+
+HEADER = "HTTP_X_PROFILE"
+
+
+class QueryTrace(list):
+    """Database execute wrapper collecting duration and SQL of all queries."""
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.append({"duration": time.perf_counter() - start, "sql": sql})
+
+
+class ProfilingMiddleware:
+    authentication = JWTClaimsAuthentication()
+
+    def __init__(self, get_response):
+        if not settings.PROFILE_SAMPLE_RATE and not settings.PROFILE_HEADER:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler, queries = cProfile.Profile(), QueryTrace()
+        start = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = profiler.runcall(self.get_response, request)
+        self.dump(request, response, profiler, queries, time.perf_counter() - start)
+        return response
+
+    def should_profile(self, request):
+        if random.random() < settings.PROFILE_SAMPLE_RATE:
+            return True
+        if not settings.PROFILE_HEADER or request.META.get(HEADER) != "1":
+            return False
+        try:
+            user_auth = self.authentication.authenticate(request)
+        except APIException:
+            return False
+        return user_auth is not None and user_auth[0].is_staff
+
+    def dump(self, request, response, profiler, queries, duration):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        # sortable by time, unique across worker processes
+        name = os.path.join(
+            settings.PROFILE_DIR, f"{time.time_ns()}-{os.getpid()}-{view}"
+        )
+        profiler.dump_stats(f"{name}.prof")
+        with open(f"{name}.json", "w") as trace:
+            json.dump(
+                {
+                    "view": view,
+                    "method": request.method,
+                    "path": request.get_full_path(),
+                    "status": response.status_code,
+                    "duration": duration,
+                    "queries": queries,
+                },
+                trace,
+            )
+        self.rotate()
+
+    @staticmethod
+    def rotate():
+        # 0 keeps every dump
+        if settings.PROFILE_KEEP <= 0:
+            return
+        dumps = sorted(
+            name[: -len(".prof")]
+            for name in os.listdir(settings.PROFILE_DIR)
+            if name.endswith(".prof")
+        )
+        for name in dumps[: -settings.PROFILE_KEEP]:
+            for extension in (".prof", ".json"):
+                try:
+                    os.remove(os.path.join(settings.PROFILE_DIR, name + extension))
+                except FileNotFoundError:
+                    # removed by another worker
+                    pass
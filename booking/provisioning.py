@@ -0,0 +1,147 @@
+"""
+Creation of many users at once.
+
+Hashing a password costs tens of milliseconds of CPU on purpose, which
+dominates creating users one by one. `provision` checks all emails of a
+batch with one query, hashes the passwords, on a process pool using
+`PASSWORD_HASH_WORKERS` cores for the import command, and inserts the
+users with one `bulk_create`.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from booking import models
+
+_pool = None
+
+
+def hash_workers():
+    """Return the processes hashing passwords for the import command."""
+    return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool(workers):
+    # started on first use, only by the import command, as the children
+    # of api workers would be orphaned when uwsgi kills their parent
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def hash_passwords(passwords, workers=1):
+    """
+    Return the hashes of `passwords` in order, `None` gets an unusable one.
+
+    With more than one of `workers` they are hashed on a process pool.
+    """
+    if workers == 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(len(passwords) // (workers * 4), 1)
+    return list(_get_pool(workers).map(make_password, passwords, chunksize=chunksize))
+
+
+def _parse(row, role):
+    """Return the unsaved user and the raw password of a row."""
+    email = models.User.objects.normalize_email(row.get("email") or "")
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ValueError("email is invalid")
+
+    role = role or row.get("role") or models.User.CUSTOMER
+    if role not in dict(models.User.ROLE_CHOICES):
+        raise ValueError(f"role {role} is invalid")
+
+    user = models.User(email=email, first_name=row.get("name") or "", role=role)
+    password = row.get("password") or None
+    if password is not None:
+        try:
+            validate_password(password, user)
+        except ValidationError as exc:
+            raise ValueError(" ".join(exc.messages))
+    return user, password
+
+
+def _registered(users):
+    return set(
+        models.User.objects.filter(
+            email__in={user.email for user in users}
+        ).values_list("email", flat=True)
+    )
+
+
+def provision(rows, role=None, atomic=False, on_create=None, workers=1):
+    """
+    Create a user of every valid row and return the users and the errors.
+
+    Rows hold `email`, optionally `name`, `password` and `role`; a given
+    `role` overrides that of the rows. Users without password get an
+    unusable one. Errors are returned by row position and the users
+    are `None` at their position. With `atomic` no user is created if
+    any row is invalid. `on_create` is called with the created users in
+    the transaction inserting them. Passwords are hashed by `workers`
+    processes.
+    """
+    parsed, errors = {}, {}
+    for position, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[position] = "row must be an object"
+            continue
+        try:
+            parsed[position] = _parse(row, role)
+        except ValueError as exc:
+            errors[position] = str(exc)
+
+    registered = _registered(user for user, _ in parsed.values())
+    seen = set()
+    for position, (user, _) in parsed.items():
+        if user.email in registered:
+            errors[position] = "email is already registered"
+        elif user.email in seen:
+            errors[position] = "email is given more than once"
+        seen.add(user.email)
+
+    users = [None] * len(rows)
+    if atomic and errors:
+        return users, errors
+
+    valid = [position for position in parsed if position not in errors]
+    hashes = hash_passwords([parsed[position][1] for position in valid], workers)
+    for position, password in zip(valid, hashes):
+        parsed[position][0].password = password
+
+    while True:
+        try:
+            with transaction.atomic():
+                created = models.User.objects.bulk_create(
+                    parsed[position][0] for position in valid
+                )
+                if on_create is not None and created:
+                    on_create(created)
+            break
+        except IntegrityError:
+            # registered concurrently since the emails were checked
+            registered = _registered(parsed[position][0] for position in valid)
+            if not registered:
+                raise
+            for position in valid:
+                if parsed[position][0].email in registered:
+                    errors[position] = "email is already registered"
+            if atomic:
+                return users, errors
+            valid = [position for position in valid if position not in errors]
+            for position in valid:
+                # may be set by batches inserted before the rollback
+                parsed[position][0].pk = None
+
+    for position in valid:
+        users[position] = parsed[position][0]
+    return users, errors
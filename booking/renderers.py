@@ -0,0 +1,288 @@
+"""
+Fast path rendering the JSON:API documents of the busiest listings.
+
+The JSON:API renderer builds every resource from serialized model
+instances, inspecting every field and formatting every field name once
+per resource, and encodes the document with the `json` module.
+`CompiledSerializer` does the inspection once per serializer class and
+builds the resources straight from `.values()` rows, `FastPathMixin`
+lists them that way as a `Document`, which `JSONRenderer` encodes with
+orjson when it's installed. The documents are byte for byte those of the
+JSON:API renderer; requests with `include`, sparse fieldsets or for plain
+JSON take the regular path, as do all requests if `JSON_API_FAST_PATH`
+is off.
+"""
+import functools
+import json
+import types
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import fields, renderers, serializers
+from rest_framework.response import Response
+from rest_framework_json_api import renderers as json_api_renderers
+from rest_framework_json_api import utils
+from rest_framework_json_api.relations import ResourceRelatedField, SkipDataMixin
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# fields whose representation of a column value is the value itself
+PLAIN_FIELDS = (
+    fields.BooleanField,
+    fields.CharField,
+    fields.EmailField,
+    fields.IntegerField,
+)
+
+ATTRIBUTE, RELATIONSHIP, METHOD, NESTED = range(4)
+
+
+def dumps(data):
+    """Encode `data` like the compact unicode `JSONRenderer` of DRF."""
+    content = None
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data)
+        except orjson.JSONEncodeError:
+            # e.g. lone surrogates, which the json module passes through
+            pass
+    if content is None:
+        content = json.dumps(
+            data, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+    # escaped by DRF to keep the output valid javascript
+    return content.replace("\u2028".encode(), b"\\u2028").replace(
+        "\u2029".encode(), b"\\u2029"
+    )
+
+
+class Document(dict):
+    """JSON:API document built by the fast path, rendered as it is."""
+
+
+class JSONRenderer(json_api_renderers.JSONRenderer):
+    """JSON:API renderer encoding a `Document` right away."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, Document):
+            return super().render(data, accepted_media_type, renderer_context)
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent or self.ensure_ascii or not self.compact:
+            return renderers.JSONRenderer.render(
+                self, data, accepted_media_type, renderer_context
+            )
+        return dumps(data)
+
+
+class CompiledSerializer:
+    """
+    Fields of a serializer class inspected once to serialize `.values()` rows.
+
+    Supports fields of model columns, to-one `ResourceRelatedField`s
+    without links, method fields, which get an object holding the row
+    values, and nested serializers of many, whose rows are given by the
+    view. The resources named by `JSONAPIMeta.included_resources` are read
+    from the same row through their relationship.
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        model = serializer.Meta.model
+        self.resource_type = utils.get_resource_type_from_serializer(serializer)
+        self.pk = model._meta.pk.name
+        self.fields = []
+        self.columns = [self.pk]
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            kind, target = self.compile_field(model, name, field)
+            formatted = utils.format_field_name(name)
+            self.fields.append((name, formatted, kind, field.source, target))
+            if kind in (ATTRIBUTE, RELATIONSHIP) and field.source not in self.columns:
+                self.columns.append(field.source)
+
+        self.included = []
+        for name in utils.get_default_included_resources_from_serializer(
+            serializer_class
+        ):
+            included = compile_serializer(serializer_class.included_serializers[name])
+            if any(field[2] in (METHOD, NESTED) for field in included.fields):
+                raise ImproperlyConfigured(f"Can't include {name} from rows")
+            self.included.append((f"{serializer.fields[name].source}__", included))
+            self.columns += [
+                f"{serializer.fields[name].source}__{column}"
+                for column in included.columns
+            ]
+
+    @staticmethod
+    def compile_field(model, name, field):
+        if isinstance(field, serializers.ListSerializer):
+            return NESTED, compile_serializer(type(field.child))
+        if isinstance(field, fields.SerializerMethodField):
+            return METHOD, field.method_name
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            model_field = None
+        if model_field is not None and model_field.concrete:
+            if isinstance(field, ResourceRelatedField) and not (
+                isinstance(field, SkipDataMixin)
+                or field.self_link_view_name
+                or field.related_link_view_name
+            ):
+                return RELATIONSHIP, utils.get_related_resource_type(field)
+            if not utils.is_relationship_field(field) and not model_field.is_relation:
+                if type(field) in PLAIN_FIELDS:
+                    return ATTRIBUTE, None
+                return ATTRIBUTE, field.to_representation
+        raise ImproperlyConfigured(f"Can't serialize {name} from rows")
+
+    def values(self, queryset, *columns):
+        """Return `queryset` as rows of the columns needed and `columns`."""
+        extra = [column for column in columns if column not in self.columns]
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .values(*self.columns, *extra)
+        )
+
+    def get_value(self, row, prefix, field, serializer, nested):
+        name, _, kind, column, target = field
+        if kind == ATTRIBUTE:
+            value = row[prefix + column]
+            return value if target is None or value is None else target(value)
+        if kind == RELATIONSHIP:
+            pk = row[prefix + column]
+            return None if pk is None else {"type": target, "id": str(pk)}
+        if kind == METHOD:
+            return getattr(serializer, target)(
+                types.SimpleNamespace(pk=row[prefix + self.pk], **row)
+            )
+        child = serializer.fields[name].child if serializer is not None else None
+        return [
+            target.representation(child_row, child)
+            for child_row in nested[name].get(row[self.pk], ())
+        ]
+
+    def representation(self, row, serializer=None, nested=None, prefix=""):
+        """Return the row like the `data` of the serializer."""
+        nested = nested or {}
+        return {
+            field[0]: self.get_value(row, prefix, field, serializer, nested)
+            for field in self.fields
+            if field[2] != NESTED or field[0] in nested
+        }
+
+    def resource(self, row, serializer=None, nested=None, prefix=""):
+        """Return the JSON:API resource object of the row."""
+        nested = nested or {}
+        attributes, relationships = {}, {}
+        for field in self.fields:
+            name, formatted, kind = field[:3]
+            if name == "id" or (kind == NESTED and name not in nested):
+                continue
+            value = self.get_value(row, prefix, field, serializer, nested)
+            if kind == RELATIONSHIP:
+                relationships[formatted] = {"data": value}
+            else:
+                attributes[formatted] = value
+
+        resource = {
+            "type": self.resource_type,
+            "id": str(row[prefix + self.pk]),
+            "attributes": attributes,
+        }
+        if relationships:
+            resource["relationships"] = relationships
+        return resource
+
+    def document(self, rows, serializer=None, nested=None):
+        """
+        Return the document of the rows with their included resources.
+
+        `nested` maps the names of nested serializer fields to the rows of
+        every row by its primary key, the fields left out aren't rendered.
+        """
+        data = [self.resource(row, serializer, nested) for row in rows]
+        document = Document(data=data)
+
+        included = {}
+        for prefix, compiled in self.included:
+            for row in rows:
+                if row[prefix + compiled.pk] is None:
+                    continue
+                resource = compiled.resource(row, prefix=prefix)
+                included.setdefault(resource["type"], {})[resource["id"]] = resource
+        for resource in data:
+            included.get(resource["type"], {}).pop(resource["id"], None)
+        # ordered like the JSON:API renderer does
+        included = [
+            included[resource_type][resource_id]
+            for resource_type in sorted(included)
+            for resource_id in sorted(included[resource_type])
+        ]
+        if included:
+            document["included"] = included
+        return document
+
+
+@functools.lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    return CompiledSerializer(serializer_class)
+
+
+class FastPathMixin:
+    """
+    List from `.values()` rows serialized by `CompiledSerializer`.
+
+    Views with nested serializer fields return their rows from
+    `get_nested_rows`, otherwise those fields are left out.
+    """
+
+    def use_fast_path(self, request):
+        return (
+            settings.JSON_API_FAST_PATH
+            and isinstance(request.accepted_renderer, JSONRenderer)
+            and not any(
+                param == "include" or param.startswith("fields[")
+                for param in request.query_params
+            )
+        )
+
+    def get_nested_rows(self, rows):
+        return {}
+
+    def get_fast_queryset(self, queryset, paginator=None):
+        """Return the rows of the queryset with the paginator ordering."""
+        ordering = getattr(paginator, "ordering", ())
+        return compile_serializer(self.get_serializer_class()).values(
+            queryset, *(field.lstrip("-") for field in ordering)
+        )
+
+    def get_document(self, rows, paginator=None):
+        """Return the document of the rows, with the links of the paginator."""
+        document = compile_serializer(self.get_serializer_class()).document(
+            rows, self.get_serializer(), self.get_nested_rows(rows)
+        )
+        if paginator is None:
+            return document
+
+        paginated = paginator.get_paginated_response(None).data
+        document = Document(links=paginated["links"], **document)
+        document["meta"] = utils.format_field_names(paginated["meta"])
+        return document
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_path(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.get_fast_queryset(
+            self.filter_queryset(self.get_queryset()), self.paginator
+        )
+        rows = self.paginate_queryset(queryset)
+        if rows is None:
+            return Response(self.get_document(list(queryset)))
+        return Response(self.get_document(rows, self.paginator))
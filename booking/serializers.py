@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from rest_framework_json_api import serializers
-from .models import Room, Event, Book
+from rest_framework_simplejwt import serializers as jwt_serializers
+from .models import Room, Event, Book, Hold, WaitlistEntry
+from .tokens import RefreshToken
 
 User = get_user_model()
 
@@ -14,6 +17,14 @@ class UserSerializer(serializers.ModelSerializer):
         fields = get_user_model().REQUIRED_FIELDS + [get_user_model().USERNAME_FIELD, "name"]
 
 
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
 class LogoutSerializer(serializers.Serializer):
     refresh = serializers.CharField()
 
@@ -45,6 +56,7 @@ class RegisterSerializer(serializers.Serializer):
 
 
 class EventSerializer(serializers.ModelSerializer):
+    included_serializers = {"room": "booking.serializers.RoomSerializer"}
 
     class Meta:
         model = Event
@@ -52,14 +64,55 @@ class EventSerializer(serializers.ModelSerializer):
 
 
 class RoomSerializer(serializers.ModelSerializer):
-    events = EventSerializer(many=True, read_only=True)
+    # `RoomViewSet` prefetches a bounded list of upcoming events, all
+    # events of the room are reachable through `events_link`
+    events = EventSerializer(many=True, read_only=True, source="upcoming_events")
+    events_link = serializers.SerializerMethodField()
 
     class Meta:
         model = Room
-        fields = ["id", "name", "capacity", "events"]
+        fields = ["id", "name", "capacity", "events", "events_link"]
+
+    def get_events_link(self, room):
+        url = f"{reverse('event-list')}?filter[room]={room.pk}&sort=date"
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
 
 
 class BookSerializer(serializers.ModelSerializer):
+    included_serializers = {"event": EventSerializer, "customer": UserSerializer}
+
     class Meta:
         model = Book
         fields = ["id", "event", "customer"]
+
+
+class CustomerBookSerializer(BookSerializer):
+    """Book of the requesting customer, which always includes its event."""
+
+    class JSONAPIMeta:
+        included_resources = ["event"]
+
+
+class HoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hold
+        fields = ["id", "event", "customer", "expires"]
+        read_only_fields = ["customer", "expires"]
+
+    def validate_event(self, event):
+        if event.event_type != Event.PUBLIC:
+            raise serializers.ValidationError("event must be public")
+        return event
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = ["id", "event", "customer", "book", "created"]
+        read_only_fields = ["customer"]
+
+    def validate_event(self, event):
+        if event.event_type != Event.PUBLIC:
+            raise serializers.ValidationError("event must be public")
+        return event
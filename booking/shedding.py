@@ -0,0 +1,119 @@
+"""
+Fast rejection of requests the api can't serve in time anymore.
+
+Under a rush requests queue in front of the workers until they are served
+too late for the client or killed by the `harakiri` timeout of uwsgi. The
+`LoadSheddingMiddleware` answers them with `503` and `Retry-After` right
+away instead, once they waited longer than `SHED_MAX_QUEUE_TIME` or the
+process already serves `SHED_MAX_IN_FLIGHT` requests.
+"""
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+from booking import metrics
+
+HEADER = "HTTP_X_REQUEST_START"
+
+
+def queue_time(request):
+    """
+    Return the seconds since the proxy received the request or `None`.
+
+    Read from the `X-Request-Start` header, which is set as `t=<seconds>`
+    by nginx or as milli- or microseconds by other proxies.
+    """
+    value = request.META.get(HEADER, "").removeprefix("t=")
+    try:
+        start = float(value)
+    except ValueError:
+        return None
+    # scale milli- and microseconds since the epoch to seconds
+    while start > 1e11:
+        start /= 1000
+    return max(time.time() - start, 0.0)
+
+
+class LoadSheddingMiddleware:
+    """
+    Reject requests with `503` when the process is overloaded.
+
+    Requests to one of `SHED_EXEMPT_PATHS` are always served. The number
+    of requests in flight only grows beyond one per process when served
+    by ASGI or threads, the queue time needs a proxy in front of uwsgi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SHED_MAX_IN_FLIGHT and not settings.SHED_MAX_QUEUE_TIME:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        rejection = self.enter(request)
+        if rejection is not None:
+            return rejection
+        try:
+            return self.get_response(request)
+        finally:
+            self.leave()
+
+    async def __acall__(self, request):
+        rejection = self.enter(request)
+        if rejection is not None:
+            return rejection
+        try:
+            return await self.get_response(request)
+        finally:
+            self.leave()
+
+    def enter(self, request):
+        """Count the request in or return the response rejecting it."""
+        exempt = request.path.startswith(tuple(settings.SHED_EXEMPT_PATHS))
+        waited = None if exempt else queue_time(request)
+        if (
+            settings.SHED_MAX_QUEUE_TIME
+            and waited is not None
+            and waited * 1000 > settings.SHED_MAX_QUEUE_TIME
+        ):
+            return self.reject("queue_time", "Request waited too long to be served.")
+
+        with self._lock:
+            overloaded = (
+                not exempt
+                and settings.SHED_MAX_IN_FLIGHT
+                and self.in_flight >= settings.SHED_MAX_IN_FLIGHT
+            )
+            if not overloaded:
+                self.in_flight += 1
+        if overloaded:
+            return self.reject("in_flight", "Too many requests in flight.")
+        return None
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @staticmethod
+    def reject(reason, detail):
+        metrics.requests_shed.labels(reason).inc()
+        response = JsonResponse(
+            {"errors": [{"detail": detail, "status": "503"}]},
+            status=503,
+            content_type="application/vnd.api+json",
+        )
+        response["Retry-After"] = str(settings.SHED_RETRY_AFTER)
+        return response
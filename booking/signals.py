@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db import connections
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from booking import cache, filters, metrics, models
+from booking.authentication import user_cache
+
+
+@receiver(pre_save, sender=models.Event)
+def set_has_free_seats(sender, instance, **kwargs):
+    instance.has_free_seats = instance.seats_taken < instance.room.capacity
+
+
+@receiver(post_delete, sender=models.Book)
+def release_seat(sender, instance, **kwargs):
+    # also sent for every book deleted along with its customer or event
+    models.Event.objects.release_seats(instance.event_id)
+
+
+@receiver(post_delete, sender=models.Hold)
+def release_held_seat(sender, instance, origin=None, **kwargs):
+    # `HoldManager` deletes holds by queryset and gives their seats back
+    # itself, others are e.g. deleted along with their customer or event
+    if not (isinstance(origin, QuerySet) and origin.model is models.Hold):
+        models.Event.objects.release_seats(instance.event_id)
+
+
+@receiver(post_save, sender=models.Room)
+def refresh_has_free_seats(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields is not None and "capacity" not in update_fields):
+        return
+    models.Event.objects.refresh_free_seats(room_id=instance.pk)
+
+
+@receiver(post_save, sender=models.Event)
+@receiver(post_delete, sender=models.Event)
+@receiver(post_save, sender=models.Room)
+@receiver(post_delete, sender=models.Room)
+@receiver(post_save, sender=models.Book)
+@receiver(post_delete, sender=models.Book)
+def bump_response_cache_version(sender, **kwargs):
+    cache.bump_version()
+
+
+@receiver(post_save, sender=models.User)
+@receiver(post_delete, sender=models.User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(connection_created)
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    metrics.install_query_recorder(connection)
+
+
+@receiver(post_migrate)
+def ensure_search_triggers(sender, using, **kwargs):
+    if sender.name == "booking":
+        filters.ensure_search_triggers(connections[using])
@@ -0,0 +1,140 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.html import escape
+
+from booking import models
+from booking.pagination import EstimatedCountPaginator
+
+
+@pytest.fixture
+def staff_client(client, admin_user):
+    client.force_login(admin_user)
+    return client
+
+
+def changelist_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.parametrize(
+    "url,factory_name",
+    [
+        ("admin:booking_book_changelist", "book_factory"),
+        ("admin:booking_event_changelist", "event_factory"),
+        ("admin:booking_waitlistentry_changelist", "waitlist_entry_factory"),
+    ],
+)
+def test_admin_changelist_queries_constant(staff_client, request, url, factory_name):
+    factory = request.getfixturevalue(factory_name)
+    factory.create_batch(2)
+    queries = changelist_queries(staff_client, reverse(url))
+
+    factory.create_batch(10)
+
+    assert changelist_queries(staff_client, reverse(url)) == queries
+
+
+def test_admin_book_change_form_autocomplete(staff_client, book_factory):
+    book = book_factory()
+    book_factory.create_batch(3)
+
+    response = staff_client.get(reverse("admin:booking_book_change", args=[book.pk]))
+
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "admin-autocomplete" in content
+    # only the selected customer is rendered, the event is read only
+    assert content.count("<option") == 1
+    assert (
+        f'<option value="{book.customer_id}" selected>{escape(book.customer)}'
+        in content
+    )
+    assert 'name="event"' not in content
+
+
+def test_admin_book_search_email(staff_client, book_factory):
+    book, _ = book_factory.create_batch(2)
+
+    response = staff_client.get(
+        reverse("admin:booking_book_changelist"), {"q": book.customer.email}
+    )
+
+    assert list(response.context["cl"].result_list) == [book]
+
+
+def test_admin_book_add_takes_seat(staff_client, event_factory, user_factory):
+    event = event_factory()
+    customer = user_factory(role=models.User.CUSTOMER)
+
+    response = staff_client.post(
+        reverse("admin:booking_book_add"), {"event": event.pk, "customer": customer.pk}
+    )
+
+    assert response.status_code == 302
+    assert models.Book.objects.filter(event=event, customer=customer).exists()
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+
+
+def test_admin_book_add_full_event(
+    staff_client, room_factory, book_factory, user_factory
+):
+    event = book_factory(event__room=room_factory(capacity=1)).event
+    customer = user_factory(role=models.User.CUSTOMER)
+
+    response = staff_client.post(
+        reverse("admin:booking_book_add"), {"event": event.pk, "customer": customer.pk}
+    )
+
+    assert response.status_code == 200
+    assert "event room capacity is allocated" in response.content.decode()
+    assert not models.Book.objects.filter(customer=customer).exists()
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+
+
+def test_admin_book_delete_releases_seat(staff_client, book_factory):
+    book = book_factory()
+
+    response = staff_client.post(
+        reverse("admin:booking_book_delete", args=[book.pk]), {"post": "yes"}
+    )
+
+    assert response.status_code == 302
+    book.event.refresh_from_db()
+    assert book.event.seats_taken == 0
+
+
+def test_admin_event_search(staff_client, event_factory):
+    event = event_factory(name="Python & Django meetup")
+    event_factory(name="Rust meetup")
+
+    response = staff_client.get(
+        reverse("admin:booking_event_changelist"), {"q": "pyth"}
+    )
+    assert list(response.context["cl"].result_list) == [event]
+
+    response = staff_client.get(
+        reverse("admin:autocomplete"),
+        {
+            "term": "django meet",
+            "app_label": "booking",
+            "model_name": "book",
+            "field_name": "event",
+        },
+    )
+    assert [result["id"] for result in response.json()["results"]] == [str(event.pk)]
+
+
+def test_estimated_count_paginator_exact_on_sqlite(db, room_factory):
+    room_factory.create_batch(3)
+
+    paginator = EstimatedCountPaginator(models.Room.objects.order_by("pk"), 2)
+
+    assert paginator.count == 3
+    assert paginator.num_pages == 2
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from booking import async_views, cache, models
+
+
+def book_data(event, customer):
+    return {
+        "data": {
+            "type": "books",
+            "relationships": {
+                "event": {"data": {"type": "events", "id": str(event.pk)}},
+                "customer": {"data": {"type": "users", "id": str(customer.pk)}},
+            },
+        }
+    }
+
+
+def test_event_list(call, customer, event_factory):
+    events = event_factory.create_batch(3)
+    event_factory(event_type=models.Event.PRIVATE)
+
+    response = call(async_views.EventListView, "get", customer)
+
+    assert response.status_code == status.HTTP_200_OK
+    content = json.loads(response.content)
+    assert [item["id"] for item in content["data"]] == [str(e.pk) for e in events]
+    assert content["data"][0]["relationships"]["room"]["data"]["id"] == str(
+        events[0].room_id
+    )
+    assert response["ETag"]
+
+
+def test_event_list_cache_off_loop(call, customer, event, monkeypatch):
+    calls = []
+
+    def off_loop(function):
+        def wrapper(*args, **kwargs):
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            calls.append(function.__name__)
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    for name in ("get_key", "get_cached_response", "cache_response"):
+        monkeypatch.setattr(cache, name, off_loop(getattr(cache, name)))
+
+    response = call(async_views.EventListView, "get", customer)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert calls == ["get_key", "get_cached_response", "cache_response"]
+
+
+def test_event_list_unauthenticated(call, db):
+    response = call(async_views.EventListView, "get")
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert json.loads(response.content)["errors"]
+
+
+def test_book_create(call, customer, event):
+    response = call(
+        async_views.BookCreateView, "post", customer, book_data(event, customer)
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+    assert models.Book.objects.filter(event=event, customer=customer).exists()
+
+
+def test_book_create_allocated(call, customer, event_factory, room_factory):
+    event = event_factory(room=room_factory(capacity=1))
+    call(async_views.BookCreateView, "post", customer, book_data(event, customer))
+
+    response = call(
+        async_views.BookCreateView, "post", customer, book_data(event, customer)
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert models.Book.objects.filter(event=event).count() == 1
+
+
+def test_book_create_forbidden(call, business, customer, event):
+    response = call(
+        async_views.BookCreateView, "post", business, book_data(event, customer)
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"data": {"type": "books", "relationships": {}}},
+        {
+            "data": {
+                "type": "books",
+                "relationships": {
+                    "event": {"data": {"type": "events", "id": "0"}},
+                    "customer": {"data": {"type": "rooms", "id": "1"}},
+                },
+            }
+        },
+    ],
+)
+def test_book_create_invalid_like_sync(call, customer, customer_client, data):
+    response = call(async_views.BookCreateView, "post", customer, data)
+
+    sync = customer_client.post(reverse("book-create"), data)
+    assert response.status_code == sync.status_code
+    assert json.loads(response.content) == sync.json()
+
+
+def test_book_create_private_like_sync(call, customer, customer_client, event_factory):
+    event = event_factory(event_type=models.Event.PRIVATE)
+
+    response = call(
+        async_views.BookCreateView, "post", customer, book_data(event, customer)
+    )
+
+    sync = customer_client.post(reverse("book-create"), book_data(event, customer))
+    assert response.status_code == sync.status_code == status.HTTP_400_BAD_REQUEST
+    assert json.loads(response.content) == sync.json()
@@ -0,0 +1,95 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from booking import models
+from booking.authentication import user_cache
+
+
+@pytest.fixture
+def login(db):
+    def login(role, email="test@example.com"):
+        models.User.objects.create_user(email, "secret", role=role)
+        response = APIClient().post(
+            reverse("login"), {"email": email, "password": "secret"}, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()["data"]["access"]
+
+    return login
+
+
+@pytest.fixture
+def enabled_user_cache(monkeypatch):
+    monkeypatch.setattr(user_cache, "size", 10)
+    yield user_cache
+    user_cache.clear()
+
+
+def authenticated_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def test_login_claims(login):
+    token = AccessToken(login(models.User.CUSTOMER))
+
+    assert token["email"] == "test@example.com"
+    assert token["role"] == models.User.CUSTOMER
+
+
+def test_claims_authentication(login, django_assert_num_queries):
+    client = authenticated_client(login(models.User.CUSTOMER))
+
+    # only the events, the user is built from the token claims
+    with django_assert_num_queries(1):
+        response = client.get(reverse("event-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_claims_authentication_role(login):
+    client = authenticated_client(login(models.User.CUSTOMER))
+
+    response = client.get(reverse("room-list"))
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_claims_authentication_without_claims(customer, django_assert_num_queries):
+    client = authenticated_client(RefreshToken.for_user(customer).access_token)
+
+    # user and events
+    with django_assert_num_queries(2):
+        response = client.get(reverse("event-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_user_cache(login, enabled_user_cache, django_assert_num_queries):
+    client = authenticated_client(login(models.User.BUSINESS))
+    assert client.get(reverse("room-list")).status_code == status.HTTP_200_OK
+
+    with django_assert_num_queries(0):
+        response = client.get(reverse("room-list"))
+    assert response.status_code == status.HTTP_200_OK
+
+    user = models.User.objects.get(email="test@example.com")
+    user.role = models.User.CUSTOMER
+    user.save()
+
+    assert client.get(reverse("room-list")).status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_user_cache_inactive(login, enabled_user_cache):
+    client = authenticated_client(login(models.User.BUSINESS))
+    assert client.get(reverse("room-list")).status_code == status.HTTP_200_OK
+
+    user = models.User.objects.get(email="test@example.com")
+    user.is_active = False
+    user.save()
+
+    assert client.get(reverse("room-list")).status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,91 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from booking import models
+
+
+def room_ids(response):
+    return {int(room["id"]) for room in response.json()["data"]}
+
+
+@pytest.fixture
+def rooms(room_factory, event_factory):
+    free = room_factory(capacity=20)
+    event_factory(room=free, date=datetime.date(2030, 1, 31))
+    event_factory(room=free, date=datetime.date(2030, 4, 1))
+    booked = room_factory(capacity=20)
+    event_factory(room=booked, date=datetime.date(2030, 2, 14))
+    small = room_factory(capacity=5)
+    return free, booked, small
+
+
+def test_room_availability(business_client, rooms):
+    free, booked, small = rooms
+
+    response = business_client.get(
+        reverse("room-availability"),
+        {
+            "filter[capacity]": 10,
+            "filter[date-from]": "2030-02-01",
+            "filter[date-to]": "2030-03-31",
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert room_ids(response) == {free.pk}
+
+
+def test_room_availability_bounds_inclusive(business_client, rooms):
+    response = business_client.get(
+        reverse("room-availability"),
+        {"filter[date-from]": "2030-01-31", "filter[date-to]": "2030-01-31"},
+    )
+
+    assert room_ids(response) == {rooms[1].pk, rooms[2].pk}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"filter[date-from]": "2030-01-01"},
+        {"filter[date-from]": "2030-02-01", "filter[date-to]": "2030-01-01"},
+        {
+            "filter[date-from]": "2030-02-01",
+            "filter[date-to]": "2030-03-01",
+            "filter[name]": "x",
+        },
+    ],
+)
+def test_room_availability_invalid(business_client, params):
+    response = business_client.get(reverse("room-availability"), params)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_room_availability_customer(customer_client):
+    response = customer_client.get(
+        reverse("room-availability"),
+        {"filter[date-from]": "2030-01-01", "filter[date-to]": "2030-01-01"},
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_event_create_duplicate(business_client, event):
+    data = {
+        "data": {
+            "type": "events",
+            "attributes": {"name": "Meetup", "date": event.date.isoformat()},
+            "relationships": {
+                "room": {"data": {"type": "rooms", "id": str(event.room_id)}}
+            },
+        }
+    }
+
+    response = business_client.post(reverse("event-list"), data)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert models.Event.objects.count() == 1
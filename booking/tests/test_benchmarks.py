@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+
+from booking import benchmarks, models
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert benchmarks.percentile(values, 50) == 50
+    assert benchmarks.percentile(values, 99) == 99
+    assert benchmarks.percentile([3], 99) == 3
+
+
+def test_seed(db):
+    call_command("seed", rooms=3, days=4, customers=5, books=30, batch_size=7)
+
+    assert models.Event.objects.count() == 12
+    assert models.User.objects.filter(role=models.User.CUSTOMER).count() == 5
+    assert models.Book.objects.exists()
+    assert not (
+        models.Event.objects.annotate(books_count=Count("books"))
+        .exclude(books_count=F("seats_taken"))
+        .exists()
+    )
+
+
+def test_seed_not_empty(db, event):
+    with pytest.raises(CommandError):
+        call_command("seed")
+
+
+def test_benchmark(db, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    call_command("benchmark", requests=3, baseline=str(baseline), save=True)
+
+    results = json.loads(baseline.read_text())
+    assert set(results) == set(benchmarks.SCENARIOS)
+    assert results["book"]["queries"] > 0
+    # all changes are rolled back
+    assert not models.Book.objects.exists()
+
+
+def test_benchmark_query_regression(db, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"book": {"throughput": 1, "p99": 1, "queries": 1}}))
+
+    with pytest.raises(CommandError):
+        call_command("benchmark", requests=2, scenario=["book"], baseline=str(baseline))
@@ -0,0 +1,155 @@
+import datetime
+import io
+import uuid
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from booking import blacklist
+from booking.blacklist import BloomFilter, token_blacklist
+from booking.tokens import RefreshToken
+
+
+def refresh(token):
+    return APIClient().post(reverse("refresh"), {"refresh": str(token)}, format="json")
+
+
+def blacklist_lookups(context):
+    # `check_blacklist` joins the outstanding tokens to look up the jti
+    return [
+        query["sql"]
+        for query in context.captured_queries
+        if "token_blacklist_blacklistedtoken" in query["sql"] and "JOIN" in query["sql"]
+    ]
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [uuid.uuid4().hex for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_refresh_rotates_without_blacklist_lookup(customer):
+    token = RefreshToken.for_user(customer)
+    # load the filter
+    assert "unknown" not in token_blacklist
+
+    with CaptureQueriesContext(connection) as context:
+        response = refresh(token)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert not blacklist_lookups(context)
+    rotated = RefreshToken(response.json()["data"]["refresh"])
+    assert rotated["email"] == customer.email
+    assert BlacklistedToken.objects.filter(token__jti=token["jti"]).exists()
+
+    # known to the filter, rejected after a lookup
+    with CaptureQueriesContext(connection) as context:
+        response = refresh(token)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert blacklist_lookups(context)
+
+
+def test_refresh_blacklisted_by_other_worker(customer):
+    token = RefreshToken.for_user(customer)
+    assert "unknown" not in token_blacklist
+    # blacklisted without the filter of this worker knowing
+    BlacklistedToken.objects.create(
+        token=OutstandingToken.objects.get(jti=token["jti"])
+    )
+
+    response = refresh(token)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert OutstandingToken.objects.count() == 1
+
+
+def test_blacklist_synced(settings, customer):
+    settings.TOKEN_BLACKLIST_SYNC_INTERVAL = 0
+    token = RefreshToken.for_user(customer)
+    assert token["jti"] not in token_blacklist
+
+    BlacklistedToken.objects.create(
+        token=OutstandingToken.objects.get(jti=token["jti"])
+    )
+
+    assert token["jti"] in token_blacklist
+
+
+def test_blacklist_over_capacity(settings, customer):
+    settings.TOKEN_BLACKLIST_CAPACITY = 3
+    for _ in range(5):
+        RefreshToken(str(RefreshToken.for_user(customer))).blacklist()
+    token_blacklist.clear()
+    assert "unknown" not in token_blacklist
+
+    with CaptureQueriesContext(connection) as context:
+        assert "unknown" not in token_blacklist
+
+    assert not context.captured_queries
+
+
+def test_refresh_without_rotation_looks_up(monkeypatch, customer):
+    # modules hold on to the `api_settings` of their import
+    for module in (blacklist, jwt_serializers):
+        monkeypatch.setattr(module.api_settings, "ROTATE_REFRESH_TOKENS", False)
+    token = RefreshToken.for_user(customer)
+
+    with CaptureQueriesContext(connection) as context:
+        response = refresh(token)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "refresh" not in response.json()["data"]
+    assert blacklist_lookups(context)
+
+
+def test_logout(customer):
+    token = RefreshToken.for_user(customer)
+    client = APIClient()
+    client.force_authenticate(user=customer)
+
+    response = client.post(reverse("logout"), {"refresh": str(token)}, format="json")
+    assert response.status_code == status.HTTP_205_RESET_CONTENT
+
+    response = client.post(reverse("logout"), {"refresh": str(token)}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert refresh(token).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize("batch_size", [1, 100])
+def test_prune_tokens(db, customer, batch_size):
+    past = timezone.now() - datetime.timedelta(days=1)
+    expired = [
+        OutstandingToken.objects.create(
+            jti=f"expired-{index}", token="", expires_at=past
+        )
+        for index in range(3)
+    ]
+    BlacklistedToken.objects.create(token=expired[0])
+    valid = RefreshToken.for_user(customer)
+    RefreshToken(str(valid)).blacklist()
+
+    stdout = io.StringIO()
+    call_command("prune_tokens", "--batch-size", str(batch_size), stdout=stdout)
+
+    assert "Deleted 3 expired tokens" in stdout.getvalue()
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == [
+        valid["jti"]
+    ]
+    assert BlacklistedToken.objects.count() == 1
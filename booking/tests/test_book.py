@@ -0,0 +1,258 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking import models
+
+
+def book(client, event, customer):
+    data = {
+        "data": {
+            "type": "books",
+            "relationships": {
+                "event": {"data": {"type": "events", "id": str(event.pk)}},
+                "customer": {"data": {"type": "users", "id": str(customer.pk)}},
+            },
+        }
+    }
+    return client.post(reverse("book-create"), data)
+
+
+def test_book_create(customer, customer_client, event):
+    response = book(customer_client, event, customer)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+    assert event.books.get().customer == customer
+
+
+def test_book_create_private(customer, customer_client, event_factory):
+    event = event_factory(event_type=models.Event.PRIVATE)
+
+    response = book(customer_client, event, customer)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not event.books.exists()
+
+
+def test_book_create_full(customer, customer_client, book_factory, event_factory):
+    event = event_factory(room__capacity=1)
+    book_factory(event=event)
+
+    response = book(customer_client, event, customer)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+    assert event.books.count() == 1
+
+
+@pytest.mark.parametrize("seats_taken", [0, 5])
+def test_book_create_num_queries(
+    seats_taken,
+    customer,
+    customer_client,
+    book_factory,
+    event,
+    django_assert_num_queries,
+):
+    book_factory.create_batch(seats_taken, event=event)
+
+    # event and customer lookup, savepoint, seat update, insert, release
+    with django_assert_num_queries(6):
+        response = book(customer_client, event, customer)
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_book_cancel(customer, customer_client, book_factory):
+    instance = book_factory(customer=customer)
+
+    response = customer_client.delete(reverse("book-cancel", args=[instance.pk]))
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    instance.event.refresh_from_db()
+    assert instance.event.seats_taken == 0
+    assert not models.Book.objects.exists()
+
+
+def test_customer_delete_releases_seat(customer, customer_client, book_factory):
+    event = book_factory(event__room__capacity=1).event
+
+    event.books.get().customer.delete()
+
+    event.refresh_from_db()
+    assert (event.seats_taken, event.has_free_seats) == (0, True)
+    assert book(customer_client, event, customer).status_code == 201
+
+
+@pytest.mark.django_db(transaction=True)
+def test_book_create_concurrent(user_factory, event_factory):
+    # in-memory SQLite raises instead of waiting for locks
+    assert not (connection.vendor == "sqlite" and connection.is_in_memory_db())
+
+    event = event_factory(room__capacity=5)
+    customers = user_factory.create_batch(20, role=models.User.CUSTOMER)
+
+    def book_as(customer):
+        client = APIClient()
+        client.force_authenticate(user=customer)
+        try:
+            return book(client, event, customer).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(customers)) as executor:
+        status_codes = list(executor.map(book_as, customers))
+
+    event.refresh_from_db()
+    assert status_codes.count(status.HTTP_201_CREATED) == 5
+    assert status_codes.count(status.HTTP_400_BAD_REQUEST) == 15
+    assert event.seats_taken == event.books.count() == 5
+
+
+def bulk_book(client, bookings, meta=None):
+    data = {
+        "data": [
+            {
+                "type": "books",
+                "relationships": {
+                    "event": {"data": {"type": "events", "id": str(event.pk)}},
+                    "customer": {"data": {"type": "users", "id": str(customer.pk)}},
+                },
+            }
+            for event, customer in bookings
+        ]
+    }
+    if meta is not None:
+        data["meta"] = meta
+    return client.post(
+        reverse("book-bulk"),
+        json.dumps(data),
+        content_type="application/vnd.api+json",
+    )
+
+
+@pytest.mark.parametrize(
+    "meta", [[1], "atomic", {"atomic": "false"}, {"atomic": 0}, {"tokens": None}]
+)
+def test_book_bulk_create_invalid_meta(customer, customer_client, event, meta):
+    response = bulk_book(customer_client, [(event, customer)], meta=meta)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not models.Book.objects.exists()
+
+
+def test_book_bulk_create(
+    customer, customer_client, event_factory, django_assert_num_queries
+):
+    events = event_factory.create_batch(2, room__capacity=5)
+    bookings = [(event, customer) for event in events for _ in range(5)]
+
+    # events, customers, savepoint, two seat updates, insert, release
+    with django_assert_num_queries(7):
+        response = bulk_book(customer_client, bookings)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    json_data = response.json()
+    assert len(json_data["data"]) == 10
+    assert [outcome["status"] for outcome in json_data["meta"]["results"]] == [
+        "201"
+    ] * 10
+    for event in events:
+        event.refresh_from_db()
+        assert event.seats_taken == event.books.count() == 5
+        assert not event.has_free_seats
+
+
+def test_book_bulk_create_atomic(customer, customer_client, event_factory):
+    event = event_factory(room__capacity=2)
+    private = event_factory(event_type=models.Event.PRIVATE)
+
+    response = bulk_book(
+        customer_client,
+        [(event, customer), (private, customer), (event, customer), (event, customer)],
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    errors = response.json()["errors"]
+    assert [error["source"]["pointer"] for error in errors] == ["/data/1", "/data/3"]
+    event.refresh_from_db()
+    assert event.seats_taken == 0
+    assert not models.Book.objects.exists()
+
+
+def test_book_bulk_create_partial(customer, customer_client, event_factory):
+    event = event_factory(room__capacity=2)
+    private = event_factory(event_type=models.Event.PRIVATE)
+
+    response = bulk_book(
+        customer_client,
+        [(event, customer), (private, customer), (event, customer), (event, customer)],
+        meta={"atomic": False},
+    )
+
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    json_data = response.json()
+    assert [outcome["status"] for outcome in json_data["meta"]["results"]] == [
+        "201",
+        "400",
+        "201",
+        "400",
+    ]
+    assert {book["id"] for book in json_data["data"]} == {
+        outcome["id"] for outcome in json_data["meta"]["results"] if "id" in outcome
+    }
+    event.refresh_from_db()
+    assert event.seats_taken == event.books.count() == 2
+
+
+def test_book_bulk_create_invalid_document(customer_client):
+    response = customer_client.post(
+        reverse("book-bulk"),
+        json.dumps({"data": {"type": "books"}}),
+        content_type="application/vnd.api+json",
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_my_books(customer, customer_client, book_factory, django_assert_num_queries):
+    books = book_factory.create_batch(3, customer=customer)
+    book_factory.create_batch(2)
+
+    with django_assert_num_queries(1):
+        response = customer_client.get(reverse("my-book-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    json_data = response.json()
+    assert [book["id"] for book in json_data["data"]] == [
+        str(book.pk) for book in books
+    ]
+    assert {event["id"] for event in json_data["included"]} == {
+        str(book.event_id) for book in books
+    }
+    assert json_data["included"][0]["attributes"]["name"] == books[0].event.name
+
+
+def test_my_books_business_forbidden(business_client):
+    response = business_client.get(reverse("my-book-list"))
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_book_cancel_other_customer(customer_client, book_factory):
+    instance = book_factory()
+
+    response = customer_client.delete(reverse("book-cancel", args=[instance.pk]))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert models.Book.objects.filter(pk=instance.pk).exists()
+    instance.event.refresh_from_db()
+    assert instance.event.seats_taken == 1
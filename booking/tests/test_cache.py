@@ -0,0 +1,100 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.fixture(params=["locmem", "file"])
+def response_cache(request, settings, tmp_path):
+    backends = {
+        "locmem": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "file": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        },
+    }
+    settings.CACHES = {**settings.CACHES, "default": backends[request.param]}
+
+
+def test_cache_event_list(
+    response_cache, customer_client, event, django_assert_num_queries
+):
+    response = customer_client.get(reverse("event-list"))
+
+    with django_assert_num_queries(0):
+        cached = customer_client.get(reverse("event-list"))
+
+    assert cached.status_code == status.HTTP_200_OK
+    assert cached.content == response.content
+    assert cached["ETag"] == response["ETag"]
+
+
+def test_cache_not_modified(response_cache, business_client, room):
+    response = business_client.get(reverse("room-list"))
+
+    not_modified = business_client.get(
+        reverse("room-list"), HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not not_modified.content
+
+
+def test_cache_scope(response_cache, customer_client, business_client, event_factory):
+    event_factory(room__capacity=0)
+
+    assert not customer_client.get(reverse("event-list")).json()["data"]
+    assert business_client.get(reverse("event-list")).json()["data"]
+
+
+def test_cache_query_params(response_cache, business_client, room_factory):
+    room_factory.create_batch(2)
+
+    response = business_client.get(reverse("room-list"), {"page[size]": 1})
+
+    assert len(response.json()["data"]) == 1
+    assert len(business_client.get(reverse("room-list")).json()["data"]) == 2
+
+
+def test_cache_not_shared(settings, customer_client, event, django_assert_num_queries):
+    settings.WORKER_PROCESSES = 4
+    response = customer_client.get(reverse("event-list"))
+
+    with django_assert_num_queries(1):
+        uncached = customer_client.get(reverse("event-list"))
+
+    assert uncached.content == response.content
+    assert uncached["ETag"] == response["ETag"]
+
+
+def test_cache_invalidation(response_cache, customer, customer_client, event_factory):
+    event = event_factory(room__capacity=1)
+    response = customer_client.get(reverse("event-list"))
+
+    book = customer_client.post(
+        reverse("book-create"),
+        {
+            "data": {
+                "type": "books",
+                "relationships": {
+                    "event": {"data": {"type": "events", "id": str(event.pk)}},
+                    "customer": {"data": {"type": "users", "id": str(customer.pk)}},
+                },
+            }
+        },
+    )
+    assert book.status_code == status.HTTP_201_CREATED
+
+    modified = customer_client.get(
+        reverse("event-list"), HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert modified.status_code == status.HTTP_200_OK
+    assert modified["ETag"] != response["ETag"]
+    assert not modified.json()["data"]
+
+
+def test_cache_invalidation_room_delete(response_cache, business_client, room):
+    assert business_client.get(reverse("room-list")).json()["data"]
+
+    business_client.delete(reverse("room-detail", args=[room.pk]))
+
+    assert not business_client.get(reverse("room-list")).json()["data"]
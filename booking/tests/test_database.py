@@ -0,0 +1,44 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite only")
+def test_sqlite_pragmas(db):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+        cursor.execute("PRAGMA busy_timeout")
+        busy_timeout = cursor.fetchone()[0]
+
+    # NORMAL
+    assert synchronous == 1
+    assert busy_timeout == 5000
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unique_room_date_migration_lists_duplicates():
+    executor = MigrationExecutor(connection)
+    executor.migrate([("booking", "0003_event_has_free_seats")])
+    apps = executor.loader.project_state(("booking", "0003_event_has_free_seats")).apps
+    room = apps.get_model("booking", "Room").objects.create(name="Hall")
+    Event = apps.get_model("booking", "Event")
+    events = [
+        Event.objects.create(name="Meetup", date=datetime.date(2030, 1, 1), room=room)
+        for _ in range(2)
+    ]
+
+    executor.loader.build_graph()
+    try:
+        with pytest.raises(RuntimeError) as excinfo:
+            executor.migrate([("booking", "0004_unique_room_date")])
+        assert (
+            f"room {room.pk} on 2030-01-01: events {events[0].pk}, {events[1].pk}"
+            in str(excinfo.value)
+        )
+    finally:
+        Event.objects.all().delete()
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
@@ -0,0 +1,209 @@
+import datetime
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from booking import filters, models, signals
+
+
+def event_ids(response):
+    return {int(event["id"]) for event in response.json()["data"]}
+
+
+def test_event_list_customer(customer_client, event_factory, book_factory):
+    free = event_factory(room__capacity=2)
+    book_factory(event=free)
+    full = event_factory(room__capacity=1)
+    book_factory(event=full)
+    event_factory(event_type=models.Event.PRIVATE)
+
+    response = customer_client.get(reverse("event-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert event_ids(response) == {free.pk}
+
+
+def test_event_list_business(business_client, event_factory, book_factory):
+    events = event_factory.create_batch(2, room__capacity=1)
+    book_factory(event=events[0])
+
+    response = business_client.get(reverse("event-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert event_ids(response) == {event.pk for event in events}
+
+
+def test_event_list_customer_cancel(customer, customer_client, book_factory):
+    book = book_factory(event__room__capacity=1, customer=customer)
+    assert not event_ids(customer_client.get(reverse("event-list")))
+
+    customer_client.delete(reverse("book-cancel", args=[book.pk]))
+
+    assert event_ids(customer_client.get(reverse("event-list"))) == {book.event_id}
+
+
+def test_event_list_customer_capacity(customer_client, book_factory):
+    book = book_factory(event__room__capacity=1)
+    room = book.event.room
+
+    room.capacity = 2
+    room.save()
+    assert event_ids(customer_client.get(reverse("event-list"))) == {book.event_id}
+
+    room.capacity = 1
+    room.save()
+    assert not event_ids(customer_client.get(reverse("event-list")))
+
+
+def test_event_save_keeps_seats_taken(db, event_factory, book_factory):
+    event = event_factory(room__capacity=2)
+    stale = models.Event.objects.get(pk=event.pk)
+    book_factory.create_batch(2, event=event)
+
+    stale.name = "Renamed"
+    stale.save()
+
+    event.refresh_from_db()
+    assert event.name == "Renamed"
+    assert (event.seats_taken, event.has_free_seats) == (2, False)
+
+
+def test_event_create_has_free_seats(business_client, room_factory):
+    room = room_factory(capacity=0)
+    data = {
+        "data": {
+            "type": "events",
+            "attributes": {"name": "Meetup", "date": "2030-01-01"},
+            "relationships": {"room": {"data": {"type": "rooms", "id": str(room.pk)}}},
+        }
+    }
+
+    response = business_client.post(reverse("event-list"), data)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not models.Event.objects.get().has_free_seats
+
+
+@pytest.fixture
+def filtered(event_factory, book_factory):
+    return {
+        "early": event_factory(date=datetime.date(2030, 1, 1), room__capacity=10),
+        "late": event_factory(date=datetime.date(2030, 3, 1), room__capacity=50),
+        "private": event_factory(
+            date=datetime.date(2030, 2, 1),
+            event_type=models.Event.PRIVATE,
+            room__capacity=5,
+        ),
+        "full": book_factory(
+            event__date=datetime.date(2030, 2, 2), event__room__capacity=1
+        ).event,
+    }
+
+
+@pytest.mark.parametrize(
+    "params,expected",
+    [
+        ({"filter[date-from]": "2030-02-01"}, {"late", "private", "full"}),
+        (
+            {"filter[date-from]": "2030-01-01", "filter[date-to]": "2030-02-01"},
+            {"early", "private"},
+        ),
+        ({"filter[capacity]": 10}, {"early", "late"}),
+        ({"filter[event-type]": "PRIVATE"}, {"private"}),
+        ({"filter[has-free-seats]": "false"}, {"full"}),
+        (
+            {"filter[has-free-seats]": "true", "filter[event-type]": "PUBLIC"},
+            {"early", "late"},
+        ),
+    ],
+)
+def test_event_list_filters(business_client, filtered, params, expected):
+    response = business_client.get(reverse("event-list"), params)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert event_ids(response) == {filtered[name].pk for name in expected}
+
+
+def test_event_list_filter_room(business_client, filtered):
+    room = filtered["late"].room
+
+    response = business_client.get(reverse("event-list"), {"filter[room]": room.pk})
+
+    assert event_ids(response) == {filtered["late"].pk}
+
+
+def test_event_list_filter_invalid(business_client, filtered):
+    response = business_client.get(
+        reverse("event-list"), {"filter[event-type]": "SECRET"}
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "search,expected",
+    [
+        ("python", {"python"}),
+        ("PYTH", {"python"}),
+        ("django meet", {"python"}),
+        ("meetup", {"python", "rust"}),
+        ('"meetup" -*', {"python", "rust"}),
+        ("rust python", set()),
+        ("thon", set()),
+    ],
+)
+def test_event_list_search(business_client, event_factory, search, expected):
+    events = {
+        "python": event_factory(name="Python & Django meetup"),
+        "rust": event_factory(name="Rust meetup"),
+    }
+
+    response = business_client.get(reverse("event-list"), {"filter[search]": search})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert event_ids(response) == {events[name].pk for name in expected}
+
+
+def test_search_events_changed_names(db, event_factory):
+    event = event_factory(name="Python meetup")
+    deleted = event_factory(name="Python sprint")
+
+    event.name = "Rust meetup"
+    event.save()
+    deleted.delete()
+
+    assert not filters.search_events(models.Event.objects.all(), "python").exists()
+    assert list(filters.search_events(models.Event.objects.all(), "rust")) == [event]
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite only")
+def test_search_events_uses_index(db):
+    queryset = filters.search_events(models.Event.objects.all(), "python")
+
+    plan = queryset.explain()
+
+    assert "booking_event_search VIRTUAL TABLE INDEX" in plan
+    assert "SCAN booking_event" not in plan.replace("SCAN booking_event_search", "")
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite only")
+def test_search_triggers_after_migrations(db):
+    assert filters.ensure_search_triggers(connection) == []
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite only")
+def test_search_triggers_recreated(db, event_factory):
+    event = event_factory(name="Python meetup")
+    with connection.cursor() as cursor:
+        # as a migration rebuilding the table does
+        cursor.execute("DROP TRIGGER booking_event_search_update")
+    event.name = "Rust meetup"
+    event.save()
+
+    signals.ensure_search_triggers(apps.get_app_config("booking"), connection.alias)
+
+    assert filters.ensure_search_triggers(connection) == []
+    assert list(filters.search_events(models.Event.objects.all(), "rust")) == [event]
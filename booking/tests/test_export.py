@@ -0,0 +1,90 @@
+import csv
+import datetime
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+
+
+def content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.fixture
+def books(db, book_factory, event_factory):
+    event = event_factory(date=datetime.date(2030, 1, 10))
+    other = event_factory(date=datetime.date(2030, 2, 10))
+    return book_factory.create_batch(3, event=event) + [book_factory(event=other)]
+
+
+def test_export_books_ndjson(settings, business_client, books):
+    settings.EXPORT_CHUNK_SIZE = 2
+
+    response = business_client.get(reverse("export-books"), {"format": "ndjson"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert [row["id"] for row in rows] == [book.pk for book in books]
+    assert rows[0]["email"] == books[0].customer.email
+    assert rows[0]["date"] == "2030-01-10"
+    assert rows[0]["room_name"] == books[0].event.room.name
+
+
+def test_export_books_csv_filtered(business_client, books):
+    response = business_client.get(
+        reverse("export-books"),
+        {"format": "csv", "filter[event]": books[0].event_id},
+        HTTP_ACCEPT="text/csv",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Disposition"] == 'attachment; filename="books.csv"'
+    rows = list(csv.DictReader(io.StringIO(content(response))))
+    assert [int(row["id"]) for row in rows] == [book.pk for book in books[:3]]
+
+
+def test_export_events_date_range(business_client, books):
+    response = business_client.get(
+        reverse("export-events"),
+        {"filter[date-from]": "2030-02-01", "filter[date-to]": "2030-02-28"},
+        HTTP_ACCEPT="application/x-ndjson",
+    )
+
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert [row["id"] for row in rows] == [books[-1].event_id]
+    assert rows[0]["seats_taken"] == 1
+
+
+def test_export_customer_forbidden(customer_client, books):
+    response = customer_client.get(reverse("export-books"), {"format": "csv"})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_export_command(books, tmp_path):
+    output = tmp_path / "books.csv"
+
+    call_command(
+        "export", "books", format="csv", output=str(output), date_to="2030-01-31"
+    )
+
+    rows = list(csv.DictReader(output.open()))
+    assert len(rows) == 3
+
+
+def test_export_command_stdout(books):
+    out = io.StringIO()
+
+    call_command("export", "events", stdout=out, chunk_size=1)
+
+    assert len(out.getvalue().splitlines()) == 2
+
+
+def test_export_command_invalid_filter(db):
+    with pytest.raises(CommandError):
+        call_command("export", "events", event=1)
@@ -0,0 +1,258 @@
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from booking import models
+from booking.tests.test_book import book
+
+
+def hold_seat(client, event):
+    data = {
+        "data": {
+            "type": "holds",
+            "relationships": {
+                "event": {"data": {"type": "events", "id": str(event.pk)}},
+            },
+        }
+    }
+    return client.post(reverse("hold-list"), data)
+
+
+def expire(hold):
+    hold.expires = timezone.now() - datetime.timedelta(seconds=1)
+    hold.save(update_fields=["expires"])
+
+
+def test_hold_takes_seat(customer, customer_client, event, settings):
+    settings.HOLD_TTL = 60
+
+    response = hold_seat(customer_client, event)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    hold = models.Hold.objects.get()
+    assert hold.customer == customer
+    assert hold.expires > timezone.now() + datetime.timedelta(seconds=50)
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+
+
+def test_hold_full_event(customer_client, hold_factory, event_factory):
+    event = event_factory(room__capacity=1)
+    hold_factory(event=event)
+
+    response = hold_seat(customer_client, event)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert models.Hold.objects.count() == 1
+
+
+def test_hold_full_event_sweeps_expired(
+    customer, customer_client, hold_factory, event_factory
+):
+    event = event_factory(room__capacity=1)
+    expire(hold_factory(event=event))
+
+    response = hold_seat(customer_client, event)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert models.Hold.objects.get().customer == customer
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+
+
+def test_hold_limit_per_event(
+    settings, customer, customer_client, hold_factory, event_factory
+):
+    settings.HOLD_MAX_SEATS = 2
+    event = event_factory(room__capacity=10)
+    hold_factory.create_batch(2, event=event, customer=customer)
+    expire(hold_factory(event=event, customer=customer))
+
+    response = hold_seat(customer_client, event)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert models.Hold.objects.count() == 3
+    # the seat taken by the rejected hold is given back
+    event.refresh_from_db()
+    assert event.seats_taken == 3
+    assert hold_seat(customer_client, event_factory()).status_code == 201
+
+
+@pytest.mark.parametrize("shards", [0, 1])
+def test_customer_delete_releases_held_seats(
+    settings, customer, hold_factory, event_factory, shards
+):
+    settings.HOLD_SHARDS = shards
+    settings.HOLD_SHARD_SEATS = 3
+    event = event_factory(room__capacity=5)
+    models.Hold.objects.hold(event.pk, customer.pk)
+    models.Hold.objects.hold(event.pk, customer.pk)
+    kept = hold_factory(event=event)
+
+    customer.delete()
+
+    assert list(models.Hold.objects.all()) == [kept]
+    event.refresh_from_db()
+    # the seats left in a shard still count as taken until swept
+    assert event.seats_taken == 1 + (1 if shards else 0)
+
+
+def test_hold_private_event(customer_client, event_factory):
+    event = event_factory(event_type=models.Event.PRIVATE)
+
+    response = hold_seat(customer_client, event)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_hold_confirm(customer, customer_client, hold_factory):
+    hold = hold_factory(customer=customer)
+
+    response = customer_client.post(reverse("hold-confirm", args=[hold.pk]))
+
+    assert response.status_code == status.HTTP_201_CREATED
+    book = models.Book.objects.get()
+    assert response.json()["data"]["id"] == str(book.pk)
+    assert (book.event, book.customer) == (hold.event, customer)
+    assert not models.Hold.objects.exists()
+    hold.event.refresh_from_db()
+    assert hold.event.seats_taken == 1
+
+
+def test_hold_confirm_expired(customer, customer_client, hold_factory):
+    hold = hold_factory(customer=customer)
+    expire(hold)
+
+    response = customer_client.post(reverse("hold-confirm", args=[hold.pk]))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not models.Book.objects.exists()
+    assert not models.Hold.objects.exists()
+    hold.event.refresh_from_db()
+    assert hold.event.seats_taken == 0
+
+
+def test_hold_of_other_customer(customer_client, hold_factory):
+    hold = hold_factory()
+
+    response = customer_client.post(reverse("hold-confirm", args=[hold.pk]))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert (
+        customer_client.delete(reverse("hold-detail", args=[hold.pk])).status_code
+        == status.HTTP_404_NOT_FOUND
+    )
+
+
+def test_hold_release_promotes(
+    customer, customer_client, hold_factory, waitlist_entry_factory, event_factory
+):
+    event = event_factory(room__capacity=1)
+    hold = hold_factory(event=event, customer=customer)
+    entry = waitlist_entry_factory(event=event)
+
+    response = customer_client.delete(reverse("hold-detail", args=[hold.pk]))
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    entry.refresh_from_db()
+    assert entry.book is not None
+    event.refresh_from_db()
+    assert event.seats_taken == 1
+
+
+def test_hold_list_own(customer, customer_client, hold_factory):
+    hold = hold_factory(customer=customer)
+    hold_factory()
+
+    response = customer_client.get(reverse("hold-list"))
+
+    assert [item["id"] for item in response.json()["data"]] == [str(hold.pk)]
+
+
+def sweep_queries(hold_factory, events, holds_per_event):
+    for event in events:
+        for hold in hold_factory.create_batch(holds_per_event, event=event):
+            expire(hold)
+    with CaptureQueriesContext(connection) as context:
+        call_command("sweep_holds", "--batch-size", "100", stdout=io.StringIO())
+    return len(context)
+
+
+def test_sweep_holds(db, hold_factory, event_factory):
+    first, second = event_factory.create_batch(2)
+    kept = hold_factory(event=first)
+
+    queries = sweep_queries(hold_factory, [first, second], 1)
+
+    assert list(models.Hold.objects.all()) == [kept]
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.seats_taken, second.seats_taken) == (1, 0)
+    # one delete and one update per event, regardless of the holds
+    assert sweep_queries(hold_factory, [first, second], 5) == queries
+    first.refresh_from_db()
+    assert first.seats_taken == 1
+
+
+def test_sweep_holds_batches(db, hold_factory):
+    holds = hold_factory.create_batch(5)
+    for hold in holds:
+        expire(hold)
+
+    assert models.Hold.objects.sweep(batch_size=2) == 5
+    assert not models.Hold.objects.exists()
+
+
+@pytest.fixture
+def sharded(settings):
+    settings.HOLD_SHARDS = 1
+    settings.HOLD_SHARD_SEATS = 3
+
+
+def test_hold_sharded(sharded, customer, event_factory):
+    event = event_factory(room__capacity=10)
+
+    for _ in range(4):
+        assert models.Hold.objects.hold(event.pk, customer.pk) is not None
+
+    # one batch of three seats taken from the event, then a second one
+    event.refresh_from_db()
+    assert event.seats_taken == 6
+    assert models.HoldShard.objects.get().seats == 2
+
+    assert models.Hold.objects.sweep() == 2
+    event.refresh_from_db()
+    assert event.seats_taken == 4
+
+
+def test_hold_sharded_last_seats(sharded, customer, event_factory):
+    event = event_factory(room__capacity=2)
+
+    assert models.Hold.objects.hold(event.pk, customer.pk) is not None
+    assert models.Hold.objects.hold(event.pk, customer.pk) is not None
+    assert models.Hold.objects.hold(event.pk, customer.pk) is None
+
+    event.refresh_from_db()
+    assert event.seats_taken == 2
+    assert not event.has_free_seats
+
+
+def test_book_takes_sharded_seats(sharded, customer, customer_client, event_factory):
+    event = event_factory(room__capacity=3)
+    assert models.Hold.objects.hold(event.pk, customer.pk) is not None
+    event.refresh_from_db()
+    assert event.seats_taken == 3
+
+    response = book(customer_client, event, customer)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    event.refresh_from_db()
+    assert event.seats_taken == 2
+    assert models.HoldShard.objects.get().seats == 0
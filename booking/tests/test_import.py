@@ -0,0 +1,160 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from booking import models
+
+
+def import_data(*args):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    call_command("import_data", *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return str(path)
+
+
+def test_import_rooms_csv(db, tmp_path):
+    path = tmp_path / "rooms.csv"
+    path.write_text("name,capacity\nSmall,5\nLarge,100\nBroken,-1\n,3\n")
+
+    stdout, stderr = import_data("rooms", str(path), "--batch-size", "3")
+
+    assert list(models.Room.objects.values_list("name", "capacity")) == [
+        ("Small", 5),
+        ("Large", 100),
+    ]
+    assert stderr.splitlines() == [
+        "row 3: capacity must be at least 0",
+        "row 4: name must have 1 to 64 characters",
+    ]
+    assert "Imported 2 rooms, rejected 2 rows" in stdout
+
+
+def test_import_events_jsonl(db, tmp_path, room_factory, event_factory):
+    room = room_factory(capacity=0)
+    taken = event_factory()
+    path = write_jsonl(
+        tmp_path / "events.jsonl",
+        [
+            {"name": "Opening", "date": "2030-01-01", "room": room.pk},
+            {"name": "Twice", "date": "2030-01-01", "room": room.pk},
+            {"name": "Taken", "date": str(taken.date), "room": taken.room_id},
+            {"name": "Nowhere", "date": "2030-01-01", "room": 0},
+            {
+                "name": "Secret",
+                "date": "2030-01-02",
+                "room": room.pk,
+                "event_type": "PRIVATE",
+            },
+            {
+                "name": "Party",
+                "date": "2030-01-03",
+                "room": room.pk,
+                "event_type": "party",
+            },
+        ],
+    )
+
+    _, stderr = import_data("events", path)
+
+    events = models.Event.objects.exclude(pk=taken.pk).order_by("date")
+    assert [(event.name, event.has_free_seats) for event in events] == [
+        ("Opening", False),
+        ("Secret", False),
+    ]
+    assert stderr.splitlines() == [
+        "row 2: room already has an event on 2030-01-01",
+        f"row 3: room already has an event on {taken.date}",
+        "row 4: room does not exist",
+        "row 6: event_type party is invalid",
+    ]
+
+
+def test_import_books(tmp_path, customer, event_factory, room_factory):
+    event = event_factory(room=room_factory(capacity=2))
+    private = event_factory(event_type=models.Event.PRIVATE)
+    path = write_jsonl(
+        tmp_path / "books.jsonl",
+        [
+            {"event": event.pk, "customer": customer.pk},
+            {"event": event.pk, "email": customer.email},
+            {"event": event.pk, "customer": customer.pk},
+            {"event": private.pk, "customer": customer.pk},
+            {"event": event.pk, "email": "nobody@example.com"},
+            {"event": event.pk},
+        ],
+    )
+    with open(path, "a") as jsonl:
+        jsonl.write("not json\n")
+
+    _, stderr = import_data("books", path)
+
+    assert models.Book.objects.filter(event=event, customer=customer).count() == 2
+    event.refresh_from_db()
+    assert event.seats_taken == 2
+    assert not event.has_free_seats
+    assert stderr.splitlines() == [
+        "row 3: event room capacity is allocated",
+        "row 4: event must be public",
+        "row 5: customer does not exist",
+        "row 6: customer or email is required",
+        "row 7: row must be an object",
+    ]
+
+
+def test_import_resumes(db, tmp_path):
+    rows = [{"name": f"Room {index}", "capacity": index} for index in range(5)]
+    path = write_jsonl(tmp_path / "rooms.jsonl", rows[:3])
+
+    import_data("rooms", path, "--batch-size", "2")
+    write_jsonl(tmp_path / "rooms.jsonl", rows)
+    stdout, _ = import_data("rooms", path, "--batch-size", "2")
+
+    assert "Resuming after row 3" in stdout
+    assert list(models.Room.objects.values_list("capacity", flat=True)) == [
+        0,
+        1,
+        2,
+        3,
+        4,
+    ]
+    assert models.ImportProgress.objects.get().rows == 5
+
+    import_data("rooms", path, "--restart")
+    assert models.Room.objects.count() == 10
+
+
+def test_import_unknown_format(db, tmp_path):
+    path = tmp_path / "rooms.xml"
+    path.write_text("<rooms/>")
+
+    with pytest.raises(CommandError):
+        import_data("rooms", str(path))
+
+
+def test_import_users_csv(settings, db, tmp_path, user_factory):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    settings.PASSWORD_HASH_WORKERS = 1
+    user_factory(email="taken@example.com")
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "email,name,password,role\n"
+        "owner@example.com,Owner,Horse-Battery-1,BUSINESS\n"
+        "guest@example.com,Guest,,\n"
+        "taken@example.com,Taken,,\n"
+    )
+
+    _, stderr = import_data("users", str(path))
+
+    owner = models.User.objects.get(email="owner@example.com")
+    assert owner.role == models.User.BUSINESS
+    assert owner.check_password("Horse-Battery-1")
+    guest = models.User.objects.get(email="guest@example.com")
+    assert guest.role == models.User.CUSTOMER
+    assert not guest.has_usable_password()
+    assert stderr.splitlines() == ["row 3: email is already registered"]
@@ -0,0 +1,110 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+def get(client, url, params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK, response.content
+    return response.json(), context.captured_queries
+
+
+def test_event_include_room(business_client, event_factory):
+    events = event_factory.create_batch(3)
+
+    content, queries = get(business_client, reverse("event-list"), {"include": "room"})
+
+    assert len(queries) == 1
+    assert {(item["type"], item["id"]) for item in content["included"]} == {
+        ("rooms", str(event.room_id)) for event in events
+    }
+    assert "events-link" in content["included"][0]["attributes"]
+
+
+def test_event_include_room_queries_constant(business_client, event_factory):
+    event_factory.create_batch(2)
+    _, queries = get(business_client, reverse("event-list"), {"include": "room"})
+
+    event_factory.create_batch(5)
+
+    assert len(
+        get(business_client, reverse("event-list"), {"include": "room"})[1]
+    ) == len(queries)
+
+
+def test_event_sparse_fields(business_client, event):
+    content, queries = get(
+        business_client, reverse("event-list"), {"fields[events]": "name"}
+    )
+
+    assert content["data"][0]["attributes"] == {"name": event.name}
+    assert "relationships" not in content["data"][0]
+    assert "seats_taken" not in queries[0]["sql"]
+    assert '"booking_event"."room_id"' not in queries[0]["sql"]
+
+
+def test_event_sparse_included_fields(business_client, event):
+    content, queries = get(
+        business_client,
+        reverse("event-list"),
+        {"include": "room", "fields[events]": "name,room", "fields[rooms]": "name"},
+    )
+
+    assert content["included"] == [
+        {
+            "type": "rooms",
+            "id": str(event.room_id),
+            "attributes": {"name": event.room.name},
+        }
+    ]
+    assert len(queries) == 1
+    assert '"booking_room"."capacity"' not in queries[0]["sql"]
+
+
+def test_my_books_include(customer, customer_client, book_factory):
+    books = book_factory.create_batch(3, customer=customer)
+
+    content, queries = get(
+        customer_client, reverse("my-book-list"), {"include": "event.room,customer"}
+    )
+
+    assert len(queries) == 1
+    included = {(item["type"], item["id"]) for item in content["included"]}
+    assert included == (
+        {("events", str(book.event_id)) for book in books}
+        | {("rooms", str(book.event.room_id)) for book in books}
+        | {("users", str(customer.pk))}
+    )
+
+
+def test_my_books_sparse_fields(customer, customer_client, book_factory):
+    book = book_factory(customer=customer)
+
+    content, queries = get(
+        customer_client,
+        reverse("my-book-list"),
+        {"fields[books]": "event", "fields[events]": "date"},
+    )
+
+    assert content["data"][0]["relationships"] == {
+        "event": {"data": {"type": "events", "id": str(book.event_id)}}
+    }
+    assert content["included"][0]["attributes"] == {"date": book.event.date.isoformat()}
+    assert len(queries) == 1
+    assert '"booking_event"."name"' not in queries[0]["sql"]
+
+
+@pytest.mark.parametrize("fields", ["name,capacity", "name,events"])
+def test_room_sparse_fields(business_client, room, event_factory, fields):
+    event_factory(room=room)
+
+    content, queries = get(
+        business_client, reverse("room-list"), {"fields[rooms]": fields}
+    )
+
+    assert set(content["data"][0]["attributes"]) == set(fields.split(","))
+    assert len(queries) == (2 if "events" in fields else 1)
+    assert ('"booking_room"."capacity"' in queries[0]["sql"]) == ("capacity" in fields)
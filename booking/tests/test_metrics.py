@@ -0,0 +1,46 @@
+import logging
+
+from django.urls import reverse
+from rest_framework import status
+
+
+def test_server_timing(customer_client, event):
+    response = customer_client.get(reverse("event-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    app, db = response["Server-Timing"].split(", ")
+    assert app.startswith("app;dur=")
+    assert db.startswith("db;dur=")
+    assert not db.endswith('desc="0 queries"')
+
+
+def test_slow_request_logged(customer_client, event, settings, caplog):
+    settings.SLOW_REQUEST_THRESHOLD = 0
+    settings.SLOW_REQUEST_QUERIES = 1
+
+    with caplog.at_level(logging.WARNING, logger="booking.metrics"):
+        customer_client.get(reverse("event-list"))
+
+    (record,) = caplog.records
+    message = record.getMessage()
+    assert message.startswith("slow request GET /api/v1/events")
+    assert len(message.splitlines()) == 2
+    assert "SELECT" in message
+
+
+def test_metrics(client, customer_client, event):
+    customer_client.get(reverse("event-list"))
+
+    response = client.get(reverse("metrics"))
+
+    assert response.status_code == status.HTTP_200_OK
+    content = response.content.decode()
+    assert (
+        'booking_request_duration_seconds_count{method="GET",view="event-list"}'
+        in content
+    )
+    assert (
+        'booking_request_queries_bucket{le="+Inf",method="GET",view="event-list"}'
+        in content
+    )
+    assert "booking_request_db_duration_seconds_sum" in content
@@ -0,0 +1,108 @@
+import base64
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.fixture
+def events(event_factory):
+    # several events share a date so the id has to break the ties
+    return sorted(
+        (
+            event_factory(
+                date=datetime.date(2030, 1, 1) + datetime.timedelta(days=i // 3)
+            )
+            for i in range(7)
+        ),
+        key=lambda event: (event.date, event.pk),
+    )
+
+
+def event_ids(response):
+    return [int(event["id"]) for event in response.json()["data"]]
+
+
+def test_cursor_pagination_next(business_client, events):
+    url, ids = reverse("event-list") + "?page[size]=3", []
+    while url:
+        response = business_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(event_ids(response))
+        url = response.json()["links"]["next"]
+
+    assert ids == [event.pk for event in events]
+
+
+def test_cursor_pagination_prev(business_client, events):
+    response = business_client.get(reverse("event-list"), {"page[size]": 3})
+    assert response.json()["links"]["prev"] is None
+
+    url, pages = response.json()["links"]["last"], []
+    while url:
+        response = business_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        pages.insert(0, event_ids(response))
+        url = response.json()["links"]["prev"]
+
+    assert pages == [
+        [event.pk for event in events[:1]],
+        [event.pk for event in events[1:4]],
+        [event.pk for event in events[4:]],
+    ]
+
+
+def test_cursor_pagination_sort_descending(business_client, events):
+    response = business_client.get(
+        reverse("event-list"), {"page[size]": 4, "sort": "-date"}
+    )
+    next_response = business_client.get(response.json()["links"]["next"])
+
+    assert event_ids(response) + event_ids(next_response) == [
+        event.pk for event in reversed(events)
+    ]
+
+
+def test_cursor_pagination_no_count(business_client, events):
+    with CaptureQueriesContext(connection) as context:
+        response = business_client.get(reverse("event-list"), {"page[size]": 3})
+
+    assert response.json()["meta"]["pagination"] == {"size": 3}
+    event_queries = [
+        query["sql"]
+        for query in context.captured_queries
+        if 'FROM "booking_event"' in query["sql"]
+    ]
+    assert len(event_queries) == 1
+    assert "COUNT" not in event_queries[0]
+    assert "OFFSET" not in event_queries[0]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "invalid",
+        base64.urlsafe_b64encode(b'[["abc", 1], false]').decode(),
+        base64.urlsafe_b64encode(b"[[1], false]").decode(),
+    ],
+)
+def test_cursor_pagination_invalid(business_client, events, cursor):
+    response = business_client.get(reverse("event-list"), {"page[cursor]": cursor})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_cursor_pagination_rooms(business_client, room_factory):
+    rooms = room_factory.create_batch(3)
+
+    response = business_client.get(reverse("room-list"), {"page[size]": 2})
+    next_response = business_client.get(response.json()["links"]["next"])
+
+    assert [int(room["id"]) for room in response.json()["data"]] == [
+        room.pk for room in rooms[:2]
+    ]
+    assert [int(room["id"]) for room in next_response.json()["data"]] == [rooms[2].pk]
+    assert next_response.json()["links"]["next"] is None
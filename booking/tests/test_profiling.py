@@ -0,0 +1,82 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from booking import models
+from booking.tokens import RefreshToken
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+    return client
+
+
+def dumps(profile_dir):
+    return sorted(os.listdir(profile_dir))
+
+
+def test_profile_sampled(settings, profile_dir, customer_client, event):
+    settings.PROFILE_SAMPLE_RATE = 1
+    settings.PROFILE_KEEP = 2
+
+    for _ in range(3):
+        customer_client.get(reverse("event-list"))
+
+    names = dumps(profile_dir)
+    assert len(names) == 4
+    assert names[0].endswith("-event-list.json")
+    assert names[1].endswith("-event-list.prof")
+
+
+def test_profile_keep_all(settings, profile_dir, customer_client, event):
+    settings.PROFILE_SAMPLE_RATE = 1
+    settings.PROFILE_KEEP = 0
+
+    for _ in range(3):
+        customer_client.get(reverse("event-list"))
+
+    assert len(dumps(profile_dir)) == 6
+
+
+@pytest.mark.parametrize("is_staff,profiled", [(True, True), (False, False)])
+def test_profile_header(
+    db, settings, profile_dir, user_factory, event, is_staff, profiled
+):
+    settings.PROFILE_HEADER = True
+    user = user_factory(role=models.User.CUSTOMER, is_staff=is_staff)
+
+    token_client(user).get(reverse("event-list"), HTTP_X_PROFILE="1")
+
+    assert bool(dumps(profile_dir)) == profiled
+
+
+def test_profile_report(settings, profile_dir, customer_client, event):
+    settings.PROFILE_SAMPLE_RATE = 1
+    customer_client.get(reverse("event-list"))
+    customer_client.get(reverse("room-list"))
+
+    out = StringIO()
+    call_command("profile_report", view="event-list", limit=5, stdout=out)
+
+    report = out.getvalue()
+    assert report.startswith("1 requests")
+    assert "function calls" in report
+    assert "SELECT" in report
+
+
+def test_profile_report_empty(profile_dir):
+    with pytest.raises(CommandError):
+        call_command("profile_report")
@@ -0,0 +1,151 @@
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from booking import async_views, renderers, serializers
+
+
+@pytest.fixture
+def listings(event_factory, book_factory, customer):
+    today = datetime.date.today()
+    events = [
+        event_factory(name='Quote " and \\ backslash', date=today),
+        event_factory(name="Ünïcödé ☃   line separator", date=today),
+        event_factory(name="Control \x01\t\n", room__name="Second room"),
+    ]
+    for event in events:
+        book_factory(event=event, customer=customer)
+    return events
+
+
+@pytest.fixture
+def documents(monkeypatch):
+    """Collect the documents built by the fast path."""
+    built = []
+    document = renderers.CompiledSerializer.document
+
+    def spy(self, *args, **kwargs):
+        built.append(document(self, *args, **kwargs))
+        return built[-1]
+
+    monkeypatch.setattr(renderers.CompiledSerializer, "document", spy)
+    return built
+
+
+def get_both(client, settings, url, params=None):
+    """Return the response of the fast path and the content of the regular one."""
+    settings.JSON_API_FAST_PATH = False
+    regular = client.get(url, params)
+    cache.clear()
+    settings.JSON_API_FAST_PATH = True
+    fast = client.get(url, params)
+    return fast, regular.content
+
+
+@pytest.mark.parametrize(
+    "client_name,url,params",
+    [
+        ("customer_client", "event-list", None),
+        ("business_client", "event-list", {"page[size]": 2}),
+        ("business_client", "event-list", {"sort": "-date"}),
+        ("business_client", "room-list", None),
+        ("business_client", "room-list", {"page[size]": 1}),
+        (
+            "business_client",
+            "room-availability",
+            {"filter[date-from]": "2030-01-01", "filter[date-to]": "2030-01-02"},
+        ),
+        ("customer_client", "my-book-list", None),
+    ],
+)
+def test_fast_path_same_bytes(
+    request, settings, documents, listings, client_name, url, params
+):
+    client = request.getfixturevalue(client_name)
+
+    fast, regular = get_both(client, settings, reverse(url), params)
+
+    assert fast.status_code == 200
+    assert len(documents) == 1
+    assert fast.content == regular
+
+
+def test_fast_path_next_page(settings, business_client, listings):
+    first = business_client.get(reverse("event-list"), {"page[size]": 2})
+
+    fast, regular = get_both(business_client, settings, first.json()["links"]["next"])
+
+    assert fast.content == regular
+    assert len(fast.json()["data"]) == 1
+
+
+@pytest.mark.parametrize(
+    "client_name,url,params",
+    [
+        ("customer_client", "my-book-list", {"include": "event"}),
+        ("business_client", "event-list", {"fields[events]": "name"}),
+    ],
+)
+def test_fast_path_skipped(request, documents, listings, client_name, url, params):
+    client = request.getfixturevalue(client_name)
+
+    response = client.get(reverse(url), params)
+
+    assert response.status_code == 200
+    assert not documents
+
+
+def test_fast_path_plain_json(business_client, documents, listings):
+    response = business_client.get(
+        reverse("event-list"), HTTP_ACCEPT="application/json"
+    )
+
+    assert response.status_code == 200
+    assert not documents
+
+
+def test_fast_path_room_queries(
+    business_client, documents, room_factory, event_factory
+):
+    for room in room_factory.create_batch(3):
+        event_factory.create_batch(2, room=room)
+
+    with CaptureQueriesContext(connection) as context:
+        business_client.get(reverse("room-list"))
+
+    assert len(documents) == 1
+    # rooms and their upcoming events
+    assert len(context) == 2
+
+
+def test_fast_path_async_same_bytes(call, settings, customer, listings):
+    settings.JSON_API_FAST_PATH = False
+    regular = call(async_views.EventListView, "get", customer)
+    cache.clear()
+    settings.JSON_API_FAST_PATH = True
+
+    fast = call(async_views.EventListView, "get", customer)
+
+    assert fast.content == regular.content
+
+
+def test_compiled_serializer_unsupported():
+    class Serializer(serializers.EventSerializer):
+        room_name = serializers.serializers.CharField(source="room.name")
+
+        class Meta(serializers.EventSerializer.Meta):
+            fields = serializers.EventSerializer.Meta.fields + ["room_name"]
+
+    with pytest.raises(renderers.ImproperlyConfigured):
+        renderers.CompiledSerializer(Serializer)
+
+
+def test_dumps_matches_json_renderer():
+    data = {"a": ["\x00\x1f", "  ", "é", 1, None, True], "b": {"c": 1.5}}
+
+    assert renderers.dumps(data) == JSONRenderer().render(data)
@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+
+@pytest.mark.parametrize("rooms", [1, 5])
+def test_room_list_num_queries(
+    rooms, business_client, room_factory, event_factory, django_assert_num_queries
+):
+    for room in room_factory.create_batch(rooms):
+        event_factory.create_batch(3, room=room)
+
+    # rooms and events of all rooms
+    with django_assert_num_queries(2):
+        response = business_client.get(reverse("room-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["data"]) == rooms
+    for room in response.json()["data"]:
+        assert len(room["attributes"]["events"]) == 3
+
+
+def test_room_list_upcoming_events(business_client, room, event_factory):
+    today = timezone.localdate()
+    event_factory(room=room, date=today - datetime.timedelta(days=1))
+    upcoming = [
+        event_factory(room=room, date=today + datetime.timedelta(days=days))
+        for days in range(12, -1, -1)
+    ]
+
+    response = business_client.get(reverse("room-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    attributes = response.json()["data"][0]["attributes"]
+    assert [event["id"] for event in attributes["events"]] == [
+        event.pk for event in reversed(upcoming[-10:])
+    ]
+    assert attributes["events-link"].endswith(
+        f"{reverse('event-list')}?filter[room]={room.pk}&sort=date"
+    )
+
+
+def test_room_list_without_events(
+    business_client, room, event_factory, django_assert_num_queries
+):
+    event_factory(room=room)
+
+    with django_assert_num_queries(1):
+        response = business_client.get(
+            reverse("room-list"), {"fields[rooms]": "name,capacity"}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.json()["data"][0]["attributes"]) == {"name", "capacity"}
+
+
+def test_room_detail(business_client, room, event_factory):
+    event = event_factory(room=room)
+
+    response = business_client.get(reverse("room-detail", args=[room.pk]))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [e["id"] for e in response.json()["data"]["attributes"]["events"]] == [
+        event.pk
+    ]
+
+
+def test_room_events_link(business_client, room, event_factory):
+    event = event_factory(room=room)
+    event_factory()
+
+    response = business_client.get(reverse("event-list"), {"filter[room]": room.pk})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [e["id"] for e in response.json()["data"]] == [str(event.pk)]
+
+
+def test_room_create(business_client):
+    data = {"data": {"type": "rooms", "attributes": {"name": "Hall", "capacity": 5}}}
+
+    response = business_client.post(reverse("room-list"), data)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["data"]["attributes"]["capacity"] == 5
@@ -0,0 +1,203 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking import async_views, shedding, throttling
+from booking.tests.test_book import book
+from booking.tests.test_waitlist import join
+from booking.tokens import RefreshToken
+
+
+@pytest.fixture
+def rates(settings):
+    def rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": rates,
+        }
+
+    return rates
+
+
+def test_book_throttled_per_user(rates, customer, customer_client, event, user_factory):
+    rates(book="2/min")
+
+    assert book(customer_client, event, customer).status_code == 201
+    assert book(customer_client, event, customer).status_code == 201
+    response = book(customer_client, event, customer)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 0 < int(response["Retry-After"]) <= 30
+
+    other = user_factory(role=customer.CUSTOMER)
+    client = APIClient()
+    client.force_authenticate(user=other)
+    assert book(client, event, other).status_code == 201
+
+
+def test_waitlist_join_throttled(rates, customer_client, event_factory, book_factory):
+    rates(book="1/min")
+    first, second = event_factory.create_batch(2, room__capacity=1)
+    book_factory(event=first)
+    book_factory(event=second)
+
+    assert join(customer_client, first).status_code == status.HTTP_201_CREATED
+    response = join(customer_client, second)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_token_bucket_refills(rates, monkeypatch, rf):
+    rates(login="2/min")
+    now = 1000.0
+    monkeypatch.setattr(throttling.time, "time", lambda: now)
+    request = rf.get("/", REMOTE_ADDR="10.0.0.1")
+
+    def allowed():
+        return throttling.LoginThrottle().allow_request(request, None)
+
+    assert [allowed(), allowed(), allowed()] == [True, True, False]
+    # one request refills in 30 seconds
+    now += 30
+    assert [allowed(), allowed()] == [True, False]
+    throttle = throttling.LoginThrottle()
+    assert not throttle.allow_request(request, None)
+    assert throttle.wait() == pytest.approx(30)
+
+
+def test_throttle_cache_shared(settings):
+    settings.WORKER_PROCESSES = 4
+    # the default file cache is shared by the workers
+    throttling.check_cache()
+
+    settings.CACHES = {
+        **settings.CACHES,
+        "throttle": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    with pytest.raises(ImproperlyConfigured):
+        throttling.check_cache()
+
+
+def test_login_throttled_per_ip(db, rates, user_factory):
+    rates(login="1/min")
+    user = user_factory()
+    user.set_password("secret")
+    user.save()
+    client = APIClient()
+
+    def login(remote_addr):
+        return client.post(
+            reverse("login"),
+            {"email": user.email, "password": "secret"},
+            format="json",
+            REMOTE_ADDR=remote_addr,
+        )
+
+    assert login("10.0.0.1").status_code == status.HTTP_200_OK
+    assert login("10.0.0.1").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert login("10.0.0.2").status_code == status.HTTP_200_OK
+
+
+def test_login_throttled_spoofed_forwarded_for(db, rates, rf):
+    rates(login="1/min")
+
+    def allowed(forwarded_for):
+        request = rf.post(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded_for
+        )
+        return throttling.LoginThrottle().allow_request(request, None)
+
+    assert allowed("192.0.2.1")
+    assert not allowed("192.0.2.2")
+
+
+def test_async_book_throttled(rates, customer, event):
+    rates(book="1/min")
+    token = RefreshToken.for_user(customer).access_token
+    data = json.dumps(
+        {
+            "data": {
+                "type": "books",
+                "relationships": {
+                    "event": {"data": {"type": "events", "id": str(event.pk)}},
+                    "customer": {"data": {"type": "users", "id": str(customer.pk)}},
+                },
+            }
+        }
+    )
+
+    def post():
+        request = AsyncRequestFactory().post(
+            "/api/v1/book",
+            data,
+            content_type="application/vnd.api+json",
+            authorization=f"Bearer {token}",
+        )
+        return async_to_sync(async_views.BookCreateView.as_view())(request)
+
+    assert post().status_code == status.HTTP_201_CREATED
+    response = post()
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response["Retry-After"]
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ("t=1699999990.5", 9.5),
+        ("1699999990500", 9.5),
+        ("1699999990500000", 9.5),
+        ("", None),
+        ("t=x", None),
+    ],
+)
+def test_queue_time(monkeypatch, header, expected):
+    monkeypatch.setattr(shedding.time, "time", lambda: 1700000000.0)
+    request = RequestFactory().get("/", HTTP_X_REQUEST_START=header)
+
+    assert shedding.queue_time(request) == expected
+
+
+def test_shed_queued_request(settings, monkeypatch):
+    settings.SHED_MAX_QUEUE_TIME = 2000
+    monkeypatch.setattr(shedding.time, "time", lambda: 1700000000.0)
+    middleware = shedding.LoadSheddingMiddleware(lambda request: HttpResponse())
+
+    response = middleware(
+        RequestFactory().get("/api/v1/events", HTTP_X_REQUEST_START="t=1699999997")
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response["Retry-After"] == "1"
+    assert json.loads(response.content)["errors"][0]["status"] == "503"
+
+    response = middleware(
+        RequestFactory().get("/metrics", HTTP_X_REQUEST_START="t=1699999997")
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = middleware(
+        RequestFactory().get("/api/v1/events", HTTP_X_REQUEST_START="t=1699999999")
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_shed_in_flight(settings):
+    settings.SHED_MAX_IN_FLIGHT = 1
+    responses = []
+
+    def get_response(request):
+        # a second request arriving while the first is served
+        responses.append(middleware(RequestFactory().get("/api/v1/events")))
+        return HttpResponse()
+
+    middleware = shedding.LoadSheddingMiddleware(get_response)
+
+    assert middleware(RequestFactory().get("/api/v1/events")).status_code == 200
+    assert responses[0].status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert middleware.in_flight == 0
@@ -1,5 +1,13 @@
+import json
+
+import pytest
+from django.contrib.auth.hashers import check_password, is_password_usable
 from django.urls import reverse
 from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from booking import models, provisioning
+from booking.tokens import RefreshToken
 
 
 def test_user_detail(admin_user, admin_client):
@@ -12,3 +20,176 @@ def test_user_detail(admin_user, admin_client):
     json = response.json()
     assert json["data"]["id"] == str(admin_user.id)
     assert "password" not in json["data"]["attributes"]
+
+
+@pytest.fixture
+def fast_hasher(settings):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    settings.PASSWORD_HASH_WORKERS = 1
+
+
+def bulk_register(client, users, meta=None):
+    data = {"data": [{"type": "users", "attributes": user} for user in users]}
+    if meta is not None:
+        data["meta"] = meta
+    return client.post(
+        reverse("user-bulk"),
+        json.dumps(data),
+        content_type="application/vnd.api+json",
+    )
+
+
+def test_user_bulk_create(
+    fast_hasher, business_client, user_factory, django_assert_max_num_queries
+):
+    user_factory(email="taken@example.com")
+    users = [
+        {
+            "email": f"customer{index}@example.com",
+            "name": "Customer",
+            "password": f"Horse-Battery-{index}",
+        }
+        for index in range(20)
+    ]
+
+    # registered emails, savepoint, insert, release
+    with django_assert_max_num_queries(4):
+        response = bulk_register(business_client, users)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(response.json()["data"]) == 20
+    created = models.User.objects.filter(email__startswith="customer")
+    assert {user.role for user in created} == {models.User.CUSTOMER}
+    assert created.get(email="customer3@example.com").check_password("Horse-Battery-3")
+
+
+def test_user_bulk_create_atomic(fast_hasher, business_client, user_factory):
+    user_factory(email="taken@example.com")
+
+    response = bulk_register(
+        business_client,
+        [
+            {"email": "new@example.com", "role": models.User.BUSINESS},
+            {"email": "taken@example.com"},
+            {"email": "new@example.com"},
+            {"email": "not an email"},
+            {"email": "weak@example.com", "password": "123"},
+        ],
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    errors = response.json()["errors"]
+    assert [error["source"]["pointer"] for error in errors] == [
+        "/data/1",
+        "/data/2",
+        "/data/3",
+        "/data/4",
+    ]
+    assert errors[0]["detail"] == "email is already registered"
+    assert not models.User.objects.filter(email="new@example.com").exists()
+
+
+def test_user_bulk_create_partial_tokens(fast_hasher, business_client):
+    response = bulk_register(
+        business_client,
+        [
+            {"email": "first@example.com"},
+            {"email": ""},
+            {"email": "second@example.com"},
+        ],
+        meta={"atomic": False, "tokens": True},
+    )
+
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    outcomes = response.json()["meta"]["results"]
+    assert [outcome["status"] for outcome in outcomes] == ["201", "400", "201"]
+    first = models.User.objects.get(email="first@example.com")
+    # role of the business is never granted
+    assert first.role == models.User.CUSTOMER
+    assert not first.has_usable_password()
+    token = RefreshToken(outcomes[0]["refresh"])
+    assert token["user_id"] == first.pk
+    assert token["email"] == "first@example.com"
+    assert OutstandingToken.objects.filter(user=first).count() == 1
+
+
+def test_user_bulk_create_limit(fast_hasher, settings, business_client):
+    settings.PROVISION_MAX_USERS = 1
+
+    response = bulk_register(
+        business_client, [{"email": "a@example.com"}, {"email": "b@example.com"}]
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not models.User.objects.filter(email="a@example.com").exists()
+
+
+def test_user_bulk_create_customer_forbidden(customer_client):
+    response = bulk_register(customer_client, [{"email": "a@example.com"}])
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_hash_passwords_process_pool(settings, monkeypatch):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    monkeypatch.setattr(provisioning, "_pool", None)
+
+    try:
+        hashes = provisioning.hash_passwords(["first", "second", None], workers=2)
+    finally:
+        provisioning._pool.shutdown()
+
+    assert check_password("first", hashes[0])
+    assert check_password("second", hashes[1])
+    assert not is_password_usable(hashes[2])
+
+
+@pytest.fixture
+def registered_concurrently(monkeypatch, user_factory):
+    """Register `taken@example.com` right after the emails were checked."""
+    hash_passwords = provisioning.hash_passwords
+
+    def register(*args, **kwargs):
+        user_factory(email="taken@example.com")
+        return hash_passwords(*args, **kwargs)
+
+    monkeypatch.setattr(provisioning, "hash_passwords", register)
+
+
+def test_user_bulk_create_registered_concurrently(
+    fast_hasher, registered_concurrently, business_client
+):
+    users = [{"email": "taken@example.com"}, {"email": "free@example.com"}]
+
+    response = bulk_register(
+        business_client, users, meta={"atomic": False, "tokens": True}
+    )
+
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    results = response.json()["meta"]["results"]
+    assert results[0] == {"status": "400", "detail": "email is already registered"}
+    assert results[1]["status"] == "201"
+    free = models.User.objects.get(email="free@example.com")
+    assert list(OutstandingToken.objects.values_list("user", flat=True)) == [free.pk]
+
+
+def test_user_bulk_create_registered_concurrently_atomic(
+    fast_hasher, registered_concurrently, business_client
+):
+    users = [{"email": "taken@example.com"}, {"email": "free@example.com"}]
+
+    response = bulk_register(business_client, users)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["errors"][0]["source"] == {"pointer": "/data/0"}
+    assert not models.User.objects.filter(email="free@example.com").exists()
+
+
+def test_provision_tokens_rolled_back(fast_hasher, db):
+    def on_create(users):
+        raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        provisioning.provision([{"email": "new@example.com"}], on_create=on_create)
+
+    assert not models.User.objects.exists()
@@ -0,0 +1,152 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from booking import models
+
+
+def join(client, event):
+    data = {
+        "data": {
+            "type": "waitlist-entries",
+            "relationships": {
+                "event": {"data": {"type": "events", "id": str(event.pk)}},
+            },
+        }
+    }
+    return client.post(reverse("waitlist-list"), data)
+
+
+@pytest.fixture
+def full_event(book_factory, event_factory):
+    event = event_factory(room__capacity=1)
+    book_factory(event=event)
+    return event
+
+
+def test_waitlist_join(customer, customer_client, full_event):
+    response = join(customer_client, full_event)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    data = response.json()["data"]
+    assert data["relationships"]["book"]["data"] is None
+    entry = models.WaitlistEntry.objects.get()
+    assert entry.customer == customer
+    assert entry.book is None
+
+
+def test_waitlist_join_free_seat(customer_client, event):
+    response = join(customer_client, event)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not models.WaitlistEntry.objects.exists()
+    assert not event.books.exists()
+
+
+def test_waitlist_join_booked(customer, customer_client, full_event):
+    book = full_event.books.get()
+    book.customer = customer
+    book.save()
+
+    response = join(customer_client, full_event)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not models.WaitlistEntry.objects.exists()
+
+
+def test_waitlist_join_seat_freed(customer, customer_client, full_event):
+    models.Event.objects.release_seats(full_event.pk)
+    # seen full by the validation, freed before the entry is saved
+    models.Event.objects.filter(pk=full_event.pk).update(has_free_seats=False)
+
+    response = join(customer_client, full_event)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    entry = models.WaitlistEntry.objects.get()
+    assert entry.book.customer == customer
+
+
+def test_waitlist_join_twice(customer_client, full_event):
+    join(customer_client, full_event)
+
+    response = join(customer_client, full_event)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert models.WaitlistEntry.objects.count() == 1
+
+
+def test_waitlist_join_private(customer_client, event_factory):
+    event = event_factory(event_type=models.Event.PRIVATE)
+
+    response = join(customer_client, event)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_waitlist_promote_on_cancel(
+    customer, customer_client, full_event, waitlist_entry_factory
+):
+    first, second = waitlist_entry_factory.create_batch(2, event=full_event)
+    book = full_event.books.get()
+    book.customer = customer
+    book.save()
+
+    response = customer_client.delete(reverse("book-cancel", args=[book.pk]))
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.book.customer == first.customer
+    assert second.book is None
+    full_event.refresh_from_db()
+    assert full_event.seats_taken == 1
+    assert not full_event.has_free_seats
+
+
+@pytest.fixture
+def promoted_entry(customer, book_factory, waitlist_entry_factory):
+    book = book_factory(customer=customer)
+    return waitlist_entry_factory(event=book.event, customer=customer, book=book)
+
+
+def test_waitlist_cancel_promoted_book(customer_client, promoted_entry):
+    response = customer_client.delete(
+        reverse("book-cancel", args=[promoted_entry.book_id])
+    )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not models.WaitlistEntry.objects.exists()
+
+
+def test_waitlist_list(customer, customer_client, waitlist_entry_factory):
+    own = waitlist_entry_factory(customer=customer)
+    waitlist_entry_factory()
+
+    response = customer_client.get(reverse("waitlist-list"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["data"]] == [str(own.pk)]
+
+
+def test_waitlist_leave(customer, customer_client, waitlist_entry_factory):
+    entry = waitlist_entry_factory(customer=customer)
+
+    response = customer_client.delete(reverse("waitlist-detail", args=[entry.pk]))
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not models.WaitlistEntry.objects.exists()
+
+
+def test_waitlist_leave_promoted(customer_client, promoted_entry):
+    response = customer_client.delete(
+        reverse("waitlist-detail", args=[promoted_entry.pk])
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert models.WaitlistEntry.objects.exists()
+
+
+def test_waitlist_business_forbidden(business_client, full_event):
+    response = join(business_client, full_event)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,109 @@
+"""
+Token bucket throttles keeping their state in the cache.
+
+Every client may send a burst of as many requests as the rate of the
+scope allows per period, after which the bucket refills at that rate.
+Rates are configured as `THROTTLE_RATES`, e.g. `book=30/min`. The state
+is kept in the `throttle` cache, which has to be shared by all worker
+processes, or every worker would allow the whole rate.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from booking import cache
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def check_cache():
+    """Refuse to start several workers throttling in their own memory."""
+    if not cache.is_shared("throttle"):
+        raise ImproperlyConfigured(
+            f"{settings.WORKER_PROCESSES} worker processes can't share "
+            "token buckets in a locmem cache, set THROTTLE_CACHE_URL or "
+            "CACHE_URL to a shared cache"
+        )
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket kept as the time it is full again in one cache entry.
+
+    Each request moves that time one refill interval further, a request
+    which would move it more than a period ahead is throttled (GCRA).
+    Concurrent requests of one client race on the entry and may pass a
+    request more than the rate.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.rate = self.parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+        self.wait_seconds = None
+
+    @staticmethod
+    def parse_rate(rate):
+        """Return the requests and seconds of a rate like `30/min`."""
+        if rate is None:
+            return None
+        requests, period = rate.split("/")
+        return int(requests), PERIODS[period[0]]
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+
+        requests, period = self.rate
+        interval = period / requests
+        key = f"throttle:{self.scope}:{ident}"
+        now = time.time()
+        buckets = caches["throttle"]
+        full_at = max(buckets.get(key, now), now) + interval
+        if full_at - now > period:
+            self.wait_seconds = full_at - now - period
+            return False
+        buckets.set(key, full_at, timeout=math.ceil(period))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Bucket per user, per IP address for anonymous requests."""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Bucket per IP address, e.g. for logging in."""
+
+    def get_cache_key(self, request, view):
+        return f"ip:{self.get_ident(request)}"
+
+
+class BookThrottle(UserTokenBucketThrottle):
+    scope = "book"
+
+
+class LoginThrottle(IPTokenBucketThrottle):
+    scope = "login"
+
+
+class RegisterThrottle(IPTokenBucketThrottle):
+    scope = "register"
@@ -0,0 +1,75 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from booking.blacklist import token_blacklist
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token carrying the email, role and staff flag of the user.
+
+    The claims are copied into every access token derived from it, which
+    lets `booking.authentication.JWTClaimsAuthentication` authenticate
+    requests without loading the user. They reflect the user at login.
+
+    The blacklist is checked against the Bloom filter of `booking.blacklist`
+    first when refreshing rotates and blacklists tokens, as blacklisting
+    then fails for a token that already is.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        cls.add_user_claims(token, user)
+        return token
+
+    @classmethod
+    def for_users(cls, users):
+        """
+        Return a token for each of `users`.
+
+        The tokens are recorded as outstanding with one INSERT instead of
+        one per token like `for_user` does.
+        """
+        issued = []
+        for user in users:
+            # skip `BlacklistMixin.for_user` creating the outstanding token
+            token = super(tokens.BlacklistMixin, cls).for_user(user)
+            cls.add_user_claims(token, user)
+            issued.append(token)
+
+        OutstandingToken.objects.bulk_create(
+            OutstandingToken(
+                user=user,
+                jti=token[api_settings.JTI_CLAIM],
+                token=str(token),
+                created_at=token.current_time,
+                expires_at=datetime_from_epoch(token["exp"]),
+            )
+            for user, token in zip(users, issued)
+        )
+        return issued
+
+    @staticmethod
+    def add_user_claims(token, user):
+        token["email"] = user.email
+        token["role"] = user.role
+        token["is_staff"] = user.is_staff
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if token_blacklist.is_exact_on_refresh() and jti not in token_blacklist:
+            return
+        super().check_blacklist()
+
+    def blacklist(self):
+        """Blacklist the token, raise `TokenError` if it already is."""
+        blacklisted, created = super().blacklist()
+        if not created:
+            raise TokenError(_("Token is blacklisted"))
+        token_blacklist.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted, created
@@ -1,18 +1,36 @@
+from django.conf import settings
 from rest_framework.routers import SimpleRouter
 
 from django.urls import path, re_path
-from booking import views
+from booking import async_views, views
 
 r = SimpleRouter(trailing_slash=False)
 
 r.register(r"users", views.UserViewSet)
 r.register(r"rooms", views.RoomViewSet)
+r.register(r"waitlist", views.WaitlistViewSet, basename="waitlist")
+r.register(r"holds", views.HoldViewSet, basename="hold")
 
-urlpatterns = [
-    path("events", views.EventListCreateApiView.as_view()),
-    path("book", views.BookCreateApiView.as_view()),
-    path("book/<int:id>", views.BookCancelApiView.as_view())
-]
 
+def get_urlpatterns(asynchronous=False):
+    """Return the routes, serving the hot paths by async views if asked to."""
+    if asynchronous:
+        event_list = async_views.EventListView.as_view()
+        book_create = async_views.BookCreateView.as_view()
+    else:
+        event_list = views.EventListCreateApiView.as_view()
+        book_create = views.BookCreateApiView.as_view()
 
-urlpatterns += r.urls
+    return [
+        path("events", event_list, name="event-list"),
+        path("book", book_create, name="book-create"),
+        path("users/bulk", views.UserBulkCreateApiView.as_view(), name="user-bulk"),
+        path("book/bulk", views.BookBulkCreateApiView.as_view(), name="book-bulk"),
+        path("book/<int:id>", views.BookCancelApiView.as_view(), name="book-cancel"),
+        path("me/books", views.CustomerBookListApiView.as_view(), name="my-book-list"),
+        path("export/books", views.BookExportApiView.as_view(), name="export-books"),
+        path("export/events", views.EventExportApiView.as_view(), name="export-events"),
+    ] + r.urls
+
+
+urlpatterns = get_urlpatterns(settings.ASYNC_VIEWS)
@@ -1,15 +1,25 @@
+import logging
+
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_json_api import views
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_json_api.django_filters import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 import requests
-from django.db.models import Count, F
-from booking import models, serializers, permissions
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from booking import cache, exports, filters, includes, models, pagination, parsers, provisioning, renderers, serializers, permissions, throttling
+from booking.tokens import RefreshToken
 from drf_yasg import openapi
 
+logger = logging.getLogger(__name__)
+
 
 class UserViewSet(views.ModelViewSet):
     serializer_class = serializers.UserSerializer
@@ -21,10 +31,56 @@ class UserViewSet(views.ModelViewSet):
         return queryset.filter(id=user.id)
 
 
-class RoomViewSet(views.ModelViewSet):
+class RoomViewSet(cache.ResponseCacheMixin, renderers.FastPathMixin, includes.IncludeQueryMixin, views.ModelViewSet):
     permission_classes = (permissions.IsBusiness, )
     serializer_class = serializers.RoomSerializer
     queryset = models.Room.objects.all()
+    filterset_class = None
+    upcoming_events_limit = 10
+
+    def includes_events(self):
+        if self.action == "availability":
+            return False
+        fieldset = self.request.query_params.get("fields[rooms]")
+        return fieldset is None or "events" in fieldset.split(",")
+
+    def get_upcoming_events(self):
+        # limit the events per room within a single query
+        upcoming = models.Event.objects.filter(
+            date__gte=timezone.localdate()
+        ).order_by("date", "id")
+        limited = upcoming.filter(room=OuterRef("room")).values("pk")[
+            : self.upcoming_events_limit
+        ]
+        return upcoming.filter(pk__in=Subquery(limited))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.includes_events():
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch(
+                "events",
+                queryset=self.get_upcoming_events(),
+                to_attr="upcoming_events",
+            )
+        )
+
+    def get_nested_rows(self, rows):
+        if not self.includes_events():
+            return {}
+        events = renderers.compile_serializer(serializers.EventSerializer).values(
+            self.get_upcoming_events().filter(room__in=[row["id"] for row in rows])
+        )
+        events_by_room = {}
+        for event in events:
+            events_by_room.setdefault(event["room"], []).append(event)
+        return {"events": events_by_room}
+
+    @action(detail=False, filterset_class=filters.RoomAvailabilityFilterSet)
+    def availability(self, request, *args, **kwargs):
+        """List rooms free between `filter[date-from]` and `filter[date-to]`."""
+        return self.list(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -34,24 +90,18 @@ class RoomViewSet(views.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class EventListCreateApiView(permissions.PermissionMixin, views.generics.ListCreateAPIView):
+class EventListCreateApiView(cache.ResponseCacheMixin, renderers.FastPathMixin, includes.IncludeQueryMixin, permissions.PermissionMixin, views.generics.ListCreateAPIView):
     permission_classes = (IsAuthenticated, )
     permission_classes_per_method = {
         'create': [permissions.IsBusiness, ]
     }
     serializer_class = serializers.EventSerializer
     queryset = models.Event.objects.all()
+    pagination_class = pagination.EventCursorPagination
+    filterset_class = filters.EventFilterSet
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.request.user and self.request.user.role == self.request.user.CUSTOMER:
-            return queryset.annotate(
-                places_booked=Count("books")
-            ).filter(
-                places_booked__lt=F("room__capacity"),
-                event_type=models.Event.PUBLIC
-            )
-        return queryset
+        return models.Event.objects.visible_to(self.request.user)
 
     def create(self, request, *args, **kwargs):
         # data = request.data
@@ -60,48 +110,429 @@ class EventListCreateApiView(permissions.PermissionMixin, views.generics.ListCre
         # data.update({
         #     "room": room
         # })
-        print(request.data)
+        logger.debug("create event %s", request.data)
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         date = serializer.validated_data["date"]
         room = serializer.validated_data["room"]
-        if models.Event.objects.filter(date=date, room=room).exists():
-            
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError:
             return Response(data=f"Error: room {room} already has an event on {date} ", status=status.HTTP_400_BAD_REQUEST)
-    
-        self.perform_create(serializer)
+
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
 class BookCreateApiView(views.generics.CreateAPIView):
     permission_classes = (permissions.IsCustomer, )
+    throttle_classes = (throttling.BookThrottle, )
     serializer_class = serializers.BookSerializer
 
+    @staticmethod
+    def book(serializer):
+        """Book the seat of a valid serializer, return the error or `None`."""
+        event = serializer.validated_data['event']
+        if event.event_type != models.Event.PUBLIC:
+            return "event must be public"
+
+        with transaction.atomic():
+            if not models.Event.objects.take_seats(event.pk):
+                return "event room capacity is allocated"
+            serializer.save()
+        return None
+
     def create(self, request):
         serializer = self.get_serializer(data=request.data)
 
         serializer.is_valid(raise_exception=True)
-        event = serializer.validated_data['event']
-        if event.event_type != models.Event.PUBLIC:
-            return Response(data="event must be public", status=status.HTTP_400_BAD_REQUEST)
-
-        if event.room.capacity - event.books.count() <= 0:
-            return Response(data="event room capacity is allocated", status=status.HTTP_400_BAD_REQUEST)
-        self.perform_create(serializer)
+        error = self.book(serializer)
+        if error is not None:
+            return Response(data=error, status=status.HTTP_400_BAD_REQUEST)
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+class BookBulkCreateApiView(views.generics.GenericAPIView):
+    """
+    Book seats of several events with one request.
+
+    Capacity of all affected events is read with one query and seats are
+    taken with one conditional update per event before all books are
+    inserted at once. Per default a single failing booking rolls back the
+    whole batch; with `"meta": {"atomic": false}` the valid bookings are
+    kept and the outcome of every item is reported in the response meta.
+    """
+
+    permission_classes = (permissions.IsCustomer, )
+    throttle_classes = (throttling.BookThrottle, )
+    serializer_class = serializers.BookSerializer
+    parser_classes = (parsers.BulkJSONParser, )
+    queryset = models.Book.objects.all()
+
+    @staticmethod
+    def get_related_id(item, field, resource_type):
+        related = item.get(field)
+        if not isinstance(related, dict) or related.get("type") != resource_type:
+            return None
+        try:
+            return int(related.get("id"))
+        except (TypeError, ValueError):
+            return None
+
+    def validate_items(self, items):
+        """
+        Validate all items with one query for events and one for customers.
+
+        Return the unsaved books, the errors by item position and the
+        valid item positions grouped by event id.
+        """
+        related_ids = [
+            (
+                self.get_related_id(item, "event", "events"),
+                self.get_related_id(item, "customer", "users"),
+            )
+            for item in items
+        ]
+        events = models.Event.objects.select_related("room").in_bulk(
+            {event_id for event_id, _ in related_ids if event_id is not None}
+        )
+        customers = models.User.objects.in_bulk(
+            {customer_id for _, customer_id in related_ids if customer_id is not None}
+        )
+
+        books, errors, positions_by_event = [], {}, {}
+        for position, (event_id, customer_id) in enumerate(related_ids):
+            event = events.get(event_id)
+            books.append(models.Book(event=event, customer=customers.get(customer_id)))
+            if event is None:
+                errors[position] = "event does not exist"
+            elif customer_id not in customers:
+                errors[position] = "customer does not exist"
+            elif event.event_type != models.Event.PUBLIC:
+                errors[position] = "event must be public"
+            else:
+                positions_by_event.setdefault(event_id, []).append(position)
+
+        for event_id, positions in positions_by_event.items():
+            event = events[event_id]
+            free = max(event.room.capacity - event.seats_taken, 0)
+            for position in positions[free:]:
+                errors[position] = "event room capacity is allocated"
+            positions_by_event[event_id] = positions[:free]
+
+        return books, errors, positions_by_event
+
+    def post(self, request, *args, **kwargs):
+        atomic = request.data["_meta"].get("atomic", True)
+        books, errors, positions_by_event = self.validate_items(request.data["data"])
+
+        if not (atomic and errors):
+            with transaction.atomic():
+                for event_id, positions in positions_by_event.items():
+                    if positions and not models.Event.objects.take_seats(
+                        event_id, len(positions)
+                    ):
+                        for position in positions:
+                            errors[position] = "event room capacity is allocated"
+
+                if atomic and errors:
+                    transaction.set_rollback(True)
+                else:
+                    models.Book.objects.bulk_create(
+                        book
+                        for position, book in enumerate(books)
+                        if position not in errors
+                    )
+                    # bulk_create doesn't send post_save signals
+                    cache.bump_version()
+
+        if atomic and errors:
+            return Response(
+                data=[
+                    {
+                        "detail": detail,
+                        "status": str(status.HTTP_400_BAD_REQUEST),
+                        "source": {"pointer": f"/data/{position}"},
+                    }
+                    for position, detail in sorted(errors.items())
+                ],
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        outcomes = [
+            {"status": str(status.HTTP_400_BAD_REQUEST), "detail": errors[position]}
+            if position in errors
+            else {"status": str(status.HTTP_201_CREATED), "id": str(book.pk)}
+            for position, book in enumerate(books)
+        ]
+        serializer = self.get_serializer(
+            [book for book in books if book.pk is not None], many=True
+        )
+        return Response(
+            {"results": serializer.data, "meta": {"results": outcomes}},
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED,
+        )
+
+
+class UserBulkCreateApiView(views.generics.GenericAPIView):
+    """
+    Register up to `PROVISION_MAX_USERS` customers of a business at once.
+
+    Emails are checked with one query and the users inserted at once, see
+    `booking.provisioning`. Like
+    `BookBulkCreateApiView` a single invalid user fails the whole batch
+    unless `"meta": {"atomic": false}` is given. With
+    `"meta": {"tokens": true}` the outcome of every created user carries
+    a refresh and access token.
+    """
+
+    permission_classes = (permissions.IsBusiness, )
+    serializer_class = serializers.UserSerializer
+    parser_classes = (parsers.BulkJSONParser, )
+    queryset = models.User.objects.all()
+
+    def post(self, request, *args, **kwargs):
+        items = request.data["data"]
+        if len(items) > settings.PROVISION_MAX_USERS:
+            return Response(
+                data=f"Error: at most {settings.PROVISION_MAX_USERS} users per request",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        atomic = request.data["_meta"].get("atomic", True)
+        with_tokens = request.data["_meta"].get("tokens", False)
+        tokens = []
+
+        def create_tokens(created):
+            # recorded as outstanding in the transaction creating the users
+            tokens.extend(RefreshToken.for_users(created))
+
+        users, errors = provisioning.provision(
+            items,
+            role=models.User.CUSTOMER,
+            atomic=atomic,
+            on_create=create_tokens if with_tokens else None,
+        )
+        if atomic and errors:
+            return Response(
+                data=[
+                    {
+                        "detail": detail,
+                        "status": str(status.HTTP_400_BAD_REQUEST),
+                        "source": {"pointer": f"/data/{position}"},
+                    }
+                    for position, detail in sorted(errors.items())
+                ],
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created = [user for user in users if user is not None]
+        tokens = iter(tokens)
+
+        outcomes = []
+        for position, user in enumerate(users):
+            if user is None:
+                outcomes.append(
+                    {"status": str(status.HTTP_400_BAD_REQUEST), "detail": errors[position]}
+                )
+                continue
+            outcome = {"status": str(status.HTTP_201_CREATED), "id": str(user.pk)}
+            if with_tokens:
+                refresh = next(tokens)
+                outcome["refresh"] = str(refresh)
+                outcome["access"] = str(refresh.access_token)
+            outcomes.append(outcome)
+
+        serializer = self.get_serializer(created, many=True)
+        return Response(
+            {"results": serializer.data, "meta": {"results": outcomes}},
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED,
+        )
+
+
+class CustomerBookListApiView(renderers.FastPathMixin, includes.IncludeQueryMixin, views.generics.ListAPIView):
+    """
+    List the books of the requesting customer with their events.
+
+    The books are selected by customer in SQL, which the (customer, event)
+    index serves, and their included events are joined in the same query.
+    """
+
+    permission_classes = (permissions.IsCustomer, )
+    serializer_class = serializers.CustomerBookSerializer
+    queryset = models.Book.objects.all()
+
+    def get_queryset(self):
+        return super().get_queryset().filter(customer_id=self.request.user.id)
+
+
 class BookCancelApiView(views.generics.DestroyAPIView):
     permission_classes = (permissions.IsCustomer, )
+    serializer_class = serializers.BookSerializer
+    queryset = models.Book.objects.all()
+    lookup_url_kwarg = "id"
 
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        if request.user != instance.customer:
-            return Response(status=status.HTTP_401_UNAUTHORIZED)
-        self.perform_destroy(instance)
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    def get_queryset(self):
+        # books of other customers are not found, rather than forbidden
+        return super().get_queryset().filter(customer_id=self.request.user.id)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # the seat is released by `booking.signals.release_seat`
+            instance.delete()
+            models.WaitlistEntry.objects.promote(instance.event_id)
+
+
+class WaitlistViewSet(views.ModelViewSet):
+    """
+    Wait for a seat of a full event instead of polling it.
+
+    Cancelling a book promotes the customer waiting longest in the same
+    transaction, see `WaitlistManager.promote`; a promoted entry links to
+    the book created for the customer. Only waiting entries can be left,
+    promoted ones are gone with their book. Only full events can be
+    joined, by customers without a book of the event, and joining is
+    throttled like booking.
+    """
+
+    permission_classes = (permissions.IsCustomer, )
+    serializer_class = serializers.WaitlistEntrySerializer
+    queryset = models.WaitlistEntry.objects.all()
+    http_method_names = ["get", "post", "delete", "head", "options"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(customer_id=self.request.user.id)
+        if self.action == "destroy":
+            return queryset.filter(book__isnull=True)
+        return queryset
+
+    def get_throttles(self):
+        # joining may book a seat freed meanwhile, see `create`
+        if self.action == "create":
+            return [throttling.BookThrottle()]
+        return []
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data["event"]
+        if event.has_free_seats:
+            return Response(data=f"Error: event {event} has free seats, book one instead", status=status.HTTP_400_BAD_REQUEST)
+        if models.Book.objects.filter(event=event, customer_id=request.user.id).exists():
+            return Response(data=f"Error: already booked event {event}", status=status.HTTP_400_BAD_REQUEST)
+        if models.WaitlistEntry.objects.filter(event=event, customer_id=request.user.id).exists():
+            return Response(data=f"Error: already waiting for event {event}", status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                entry = serializer.save(customer_id=request.user.id)
+                # a seat may have been freed since the event was seen full
+                models.WaitlistEntry.objects.promote(event.pk)
+        except IntegrityError:
+            return Response(data=f"Error: already waiting for event {event}", status=status.HTTP_400_BAD_REQUEST)
+
+        entry.refresh_from_db(fields=["book"])
+        return Response(self.get_serializer(entry).data, status=status.HTTP_201_CREATED)
+
+
+class HoldViewSet(views.ModelViewSet):
+    """
+    Hold a seat while the customer pays and book it on confirmation.
+
+    A hold takes its seat right away and expires after `HOLD_TTL`
+    seconds; the `sweep_holds` command gives the seats of expired holds
+    back in bulk, see `HoldManager`. Releasing a hold gives its seat back
+    at once and promotes the customer waiting longest.
+    """
+
+    permission_classes = (permissions.IsCustomer, )
+    serializer_class = serializers.HoldSerializer
+    queryset = models.Hold.objects.all()
+    http_method_names = ["get", "post", "delete", "head", "options"]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(customer_id=self.request.user.id)
+
+    def get_throttles(self):
+        if self.action == "create":
+            return [throttling.BookThrottle()]
+        return []
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data["event"]
+        try:
+            hold = models.Hold.objects.hold(event.pk, request.user.id)
+        except models.HoldLimitExceeded:
+            return Response(
+                data=f"Error: at most {settings.HOLD_MAX_SEATS} seats of an event can be held",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if hold is None:
+            return Response(data="event room capacity is allocated", status=status.HTTP_400_BAD_REQUEST)
+        cache.bump_version()
+        return Response(self.get_serializer(hold).data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        if models.Hold.objects.release(instance):
+            cache.bump_version()
+
+    @action(detail=True, methods=["post"])
+    def confirm(self, request, pk=None):
+        hold = self.get_object()
+        book = models.Hold.objects.confirm(hold)
+        if book is None:
+            self.perform_destroy(hold)
+            return Response(data="Error: hold expired", status=status.HTTP_400_BAD_REQUEST)
+        serializer = serializers.BookSerializer(book, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ExportApiView(views.generics.GenericAPIView):
+    """
+    Stream all rows matching the filters as CSV or NDJSON.
+
+    The format is picked by `?format=csv` or the Accept header. Rows are
+    fetched in chunks of `EXPORT_CHUNK_SIZE` while the response is sent,
+    see `booking.exports`.
+    """
+
+    permission_classes = (permissions.IsBusiness, )
+    renderer_classes = (exports.NDJSONRenderer, exports.CSVRenderer)
+    filter_backends = (DjangoFilterBackend, )
+    pagination_class = None
+    columns = None
+    filename = None
+
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            exports.export(
+                self.filter_queryset(self.get_queryset()),
+                self.columns,
+                renderer.format,
+                settings.EXPORT_CHUNK_SIZE,
+            ),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{self.filename}.{renderer.format}"'
+        return response
+
+
+class BookExportApiView(ExportApiView):
+    queryset = models.Book.objects.all()
+    filterset_class = filters.BookExportFilterSet
+    columns = exports.BOOK_COLUMNS
+    filename = "books"
+
+
+class EventExportApiView(ExportApiView):
+    queryset = models.Event.objects.all()
+    filterset_class = filters.EventExportFilterSet
+    columns = exports.EVENT_COLUMNS
+    filename = "events"
 
 
 class LogoutView(APIView):
@@ -116,12 +547,13 @@ class LogoutView(APIView):
 
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception as err:
-            print(err)
-            return Response(status=status.HTTP_400_BAD_REQUEST)
+            logger.info("logout failed: %s", err)
+            return Response(data=f"Error: {err}", status=status.HTTP_400_BAD_REQUEST)
 
 
 class RegisterView(APIView):
     permission_classes = ()
+    throttle_classes = (throttling.RegisterThrottle, )
 
     @swagger_auto_schema(request_body=serializers.RegisterSerializer)
     def post(self, request):